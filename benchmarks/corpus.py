@@ -0,0 +1,70 @@
+import json
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+from utils.synthetic import SIZES, synthetic_job, synthetic_resume
+
+LINES_PER_PAGE = 50
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, lines: List[str]) -> None:
+    """Write lines as a minimal text PDF, LINES_PER_PAGE lines to a page"""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    font = 3 + 2 * len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>"]
+    for index, page in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * index} 0 R >>")
+        body = "BT /F1 10 Tf 14 TL 40 760 Td " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in page) + " ET"
+        objects.append(f"<< /Length {len(body.encode('latin-1'))} >>\nstream\n{body}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def generate_corpus(directory: str, count: int = 10, sizes: Optional[List[str]] = None,
+                    seed: int = 0) -> Dict[str, Any]:
+    """Write count resumes (PDF) and job descriptions (text) per size under directory.
+
+    The expected parses are saved next to them in manifest.json, which is also
+    returned: {size: {"resumes": [...], "jobs": [...]}} with path and data, plus
+    the text written for resumes. Job i shares skills with resume i.
+    """
+    rng = random.Random(seed)
+    manifest: Dict[str, Any] = {}
+    for size in sizes or list(SIZES):
+        size_dir = os.path.join(directory, size)
+        os.makedirs(size_dir, exist_ok=True)
+        entry = {"resumes": [], "jobs": []}
+        for index in range(count):
+            lines, resume = synthetic_resume(rng, size)
+            resume_path = os.path.join(size_dir, f"resume_{index:04d}.pdf")
+            write_pdf(resume_path, lines)
+            entry["resumes"].append({"path": resume_path, "text": "\n".join(lines), "data": resume})
+
+            text, job = synthetic_job(rng, size, shared_skills=resume["skills"])
+            job_path = os.path.join(size_dir, f"job_{index:04d}.txt")
+            with open(job_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            entry["jobs"].append({"path": job_path, "data": job})
+        manifest[size] = entry
+
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
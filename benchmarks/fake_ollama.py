@@ -0,0 +1,199 @@
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.synthetic import synthetic_job, synthetic_resume
+
+# Characters per generated token, roughly what llama tokenizers average on English
+CHARS_PER_TOKEN = 4
+
+Responder = Callable[[Dict[str, Any]], str]
+
+
+def templated_responder(templates: Optional[Dict[str, Dict[str, Any]]] = None) -> Responder:
+    """Answer job-description prompts with the "job" template and everything else with "resume" """
+    if templates is None:
+        rng = random.Random(0)
+        resume = synthetic_resume(rng)[1]
+        templates = {"resume": resume, "job": synthetic_job(rng, shared_skills=resume["skills"])[1]}
+    bodies = {kind: json.dumps(value, indent=2) for kind, value in templates.items()}
+
+    def respond(request: Dict[str, Any]) -> str:
+        prompt = request.get("prompt", "")[:300].lower()
+        return bodies["job"] if "job description" in prompt else bodies["resume"]
+
+    return respond
+
+
+def replay_responder(path: str) -> Responder:
+    """Replay recorded Ollama responses (JSONL with a "response" field) round-robin"""
+    with open(path, "r", encoding="utf-8") as f:
+        recorded = [json.loads(line)["response"] for line in f if line.strip()]
+    if not recorded:
+        raise ValueError(f"No recorded responses in {path}")
+    cycle = itertools.cycle(recorded)
+    lock = threading.Lock()
+
+    def respond(request: Dict[str, Any]) -> str:
+        with lock:
+            return next(cycle)
+
+    return respond
+
+
+class FakeOllama:
+    """Local stand-in for Ollama's /api/generate with configurable latency and token rate.
+
+    latency is the delay before the first token and tokens_per_sec the decode
+    speed; both apply to streaming and non-streaming requests. parallel caps
+    concurrent generations like OLLAMA_NUM_PARALLEL (0 for no cap); further
+    requests wait their turn.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 tokens_per_sec: float = 0.0, responder: Optional[Responder] = None, model: str = "llama3.2:3b",
+                 parallel: int = 0):
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.responder = responder or templated_responder()
+        self.model = model
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(parallel) if parallel > 0 else None
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _tokens(self, text: str) -> List[str]:
+        return [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+    def _final(self, request: Dict[str, Any], response: str, tokens: int, started: float) -> Dict[str, Any]:
+        duration = int((time.perf_counter() - started) * 1e9)
+        return {
+            "model": request.get("model", self.model),
+            "response": response,
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": duration,
+            "prompt_eval_count": len(request.get("prompt", "")) // CHARS_PER_TOKEN,
+            "eval_count": tokens,
+            "eval_duration": duration
+        }
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload: Dict[str, Any]):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": fake.model}]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with fake._lock:
+                    fake.requests += 1
+                if fake._slots is None:
+                    self._generate(request)
+                    return
+                with fake._slots:
+                    self._generate(request)
+
+            def _generate(self, request: Dict[str, Any]):
+                started = time.perf_counter()
+                response = fake.responder(request)
+                tokens = fake._tokens(response)
+                delay = 1.0 / fake.tokens_per_sec if fake.tokens_per_sec > 0 else 0.0
+                time.sleep(fake.latency)
+
+                if not request.get("stream", True):
+                    time.sleep(delay * len(tokens))
+                    self._send_json(fake._final(request, response, len(tokens), started))
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for token in tokens:
+                        self._chunk({"model": request.get("model", fake.model), "response": token, "done": False})
+                        if delay:
+                            time.sleep(delay)
+                    self._chunk(fake._final(request, "", len(tokens), started))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client stopped reading early, e.g. once the JSON object closed
+                    self.close_connection = True
+
+            def _chunk(self, payload: Dict[str, Any]):
+                data = (json.dumps(payload) + "\n").encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run a fake Ollama server for benchmarks")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=11434)
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token")
+    arg_parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="Decode speed, 0 for unlimited")
+    arg_parser.add_argument("--replay", help="JSONL file of recorded responses to replay")
+    arg_parser.add_argument("--parallel", type=int, default=0, help="Concurrent generations, 0 for unlimited")
+    args = arg_parser.parse_args()
+
+    responder = replay_responder(args.replay) if args.replay else templated_responder()
+    fake = FakeOllama(args.host, args.port, args.latency, args.tokens_per_sec, responder, parallel=args.parallel)
+    print(f"Fake Ollama listening on {fake.url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
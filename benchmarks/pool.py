@@ -0,0 +1,74 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.run import percentile
+from parser_scripts.ollama_client import OllamaPool
+
+
+def run_pool(backends: int, requests: int, concurrency: int, latency: float, tokens_per_sec: float,
+             parallel: int, slow_factor: float = 1.0, strategy: str = "least_outstanding",
+             hedge: bool = True) -> Dict[str, Any]:
+    """Send requests generations through an OllamaPool over `backends` fake servers.
+
+    Each fake serves `parallel` generations at a time, like a real Ollama box;
+    with slow_factor > 1 the last backend is that many times slower.
+    """
+    fakes = []
+    for index in range(backends):
+        slow = slow_factor if index == backends - 1 and backends > 1 else 1.0
+        fakes.append(FakeOllama(latency=latency * slow, tokens_per_sec=tokens_per_sec / slow,
+                                parallel=parallel).start())
+    pool = OllamaPool([fake.url for fake in fakes], max_concurrency=parallel, strategy=strategy, hedge=hedge,
+                      health_interval=None)
+
+    def one(index: int) -> float:
+        started = time.perf_counter()
+        pool.generate("llama3.2:3b", f"Parse resume {index}", {"temperature": 0.1}, timeout=120)
+        return time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(one, range(requests)))
+        wall = time.perf_counter() - started
+        stats = pool.stats()
+    finally:
+        pool.close()
+        for fake in fakes:
+            fake.stop()
+    return {
+        "backends": backends,
+        "docs_per_sec": round(requests / wall, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "hedges": stats["hedges"],
+        "per_backend": [endpoint["requests"] for endpoint in stats["endpoints"]]
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure OllamaPool throughput against 1..N fake backends")
+    arg_parser.add_argument("--backends", default="1,2,4", help="Comma-separated backend counts to compare")
+    arg_parser.add_argument("--requests", type=int, default=64)
+    arg_parser.add_argument("--concurrency", type=int, default=16, help="Client threads issuing requests")
+    arg_parser.add_argument("--parallel", type=int, default=2, help="Generations each backend serves at once")
+    arg_parser.add_argument("--latency", type=float, default=0.05)
+    arg_parser.add_argument("--tokens-per-sec", type=float, default=2000.0)
+    arg_parser.add_argument("--slow-factor", type=float, default=1.0, help="Make the last backend this much slower")
+    arg_parser.add_argument("--strategy", choices=["least_outstanding", "latency"], default="least_outstanding")
+    arg_parser.add_argument("--no-hedge", action="store_true")
+    args = arg_parser.parse_args()
+
+    print(f"{'backends':>8}{'docs/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'hedges':>8}  per backend")
+    for backends in [int(count) for count in args.backends.split(",")]:
+        result = run_pool(backends, args.requests, args.concurrency, args.latency, args.tokens_per_sec,
+                          args.parallel, args.slow_factor, args.strategy, not args.no_hedge)
+        print(f"{result['backends']:>8}{result['docs_per_sec']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+              f"{result['hedges']:>8}  {result['per_backend']}")
+
+
+if __name__ == "__main__":
+    main()
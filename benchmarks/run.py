@@ -0,0 +1,218 @@
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.corpus import SIZES, generate_corpus
+from benchmarks.fake_ollama import FakeOllama, replay_responder, templated_responder
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metrics where a larger value is a regression; docs_per_sec is the other way round
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "peak_rss_mb")
+
+
+def _parse_resume(entry: Dict[str, Any], index: int, ollama_url: str):
+    from parser_scripts.resume_parser import parse_resume_file
+    parse_resume_file(entry["resumes"][index]["path"], use_cache=False, ollama_url=ollama_url)
+
+
+def _parse_job(entry: Dict[str, Any], index: int, ollama_url: str):
+    from parser_scripts.job_parse import job_parser_from_file
+    job_parser_from_file(entry["jobs"][index]["path"], use_cache=False, ollama_url=ollama_url)
+
+
+def _score(resume: Dict[str, Any], text: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    """evaluator on parser-shaped documents, adapted the way the pipeline adapts them"""
+    from evaluator.eval import evaluator
+    from evaluator.incremental import scoring_job, scoring_resume
+    return evaluator(scoring_resume(resume, text), scoring_job(job))
+
+
+def _evaluate(entry: Dict[str, Any], index: int, ollama_url: str):
+    resume = entry["resumes"][index]
+    result = _score(resume["data"], resume.get("text", ""), entry["jobs"][index]["data"])
+    if not result["skills"]["matched_skills"]:
+        # Every corpus job shares skills with its resume, so an empty match means the skill path did not run
+        raise RuntimeError("evaluator matched no skills; the benchmark would only time experience scoring")
+
+
+def _end_to_end(entry: Dict[str, Any], index: int, ollama_url: str):
+    from parser_scripts.job_parse import job_parser_from_file
+    from parser_scripts.resume_parser import parse_resume_file
+    resume = entry["resumes"][index]
+    parsed_resume = parse_resume_file(resume["path"], use_cache=False, ollama_url=ollama_url)
+    parsed_job_des = job_parser_from_file(entry["jobs"][index]["path"], use_cache=False, ollama_url=ollama_url)
+    _score(parsed_resume, resume.get("text", ""), parsed_job_des)
+
+
+SCENARIOS: Dict[str, Callable[[Dict[str, Any], int, str], None]] = {
+    "parse_resume": _parse_resume,
+    "parse_job": _parse_job,
+    "evaluator": _evaluate,
+    "end_to_end": _end_to_end
+}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_worker(scenario: str, manifest_path: str, size: str, docs: int, warmup: int,
+               ollama_url: str) -> Dict[str, Any]:
+    """Run one scenario in this process and return its raw timings"""
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        entry = json.load(f)[size]
+    run = SCENARIOS[scenario]
+    available = len(entry["resumes"])
+
+    for index in range(warmup):
+        run(entry, index % available, ollama_url)
+
+    latencies = []
+    started = time.perf_counter()
+    for index in range(docs):
+        doc_started = time.perf_counter()
+        run(entry, (warmup + index) % available, ollama_url)
+        latencies.append(time.perf_counter() - doc_started)
+    wall = time.perf_counter() - started
+    return {"latencies": latencies, "wall": wall, "peak_rss_mb": peak_rss_mb()}
+
+
+def summarize(raw: Dict[str, Any]) -> Dict[str, float]:
+    latencies = raw["latencies"]
+    return {
+        "docs": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "docs_per_sec": round(len(latencies) / raw["wall"], 2) if raw["wall"] else 0.0,
+        "peak_rss_mb": round(raw["peak_rss_mb"], 1)
+    }
+
+
+def run_isolated(scenario: str, manifest_path: str, size: str, docs: int, warmup: int,
+                 ollama_url: str) -> Dict[str, float]:
+    """Run a scenario in a fresh interpreter so its peak RSS is its own"""
+    command = [sys.executable, "-m", "benchmarks.run", "--worker", scenario, "--manifest", manifest_path,
+               "--sizes", size, "--docs", str(docs), "--warmup", str(warmup), "--ollama-url", ollama_url]
+    completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Scenario {scenario}/{size} failed:\n{completed.stderr.strip()}")
+    return summarize(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """List every metric that moved past tolerance in the bad direction"""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric, value in metrics.items():
+            if metric == "docs" or not base.get(metric):
+                continue
+            change = (value - base[metric]) / base[metric]
+            if metric not in LOWER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append(f"{name} {metric}: {base[metric]} -> {value} ({change:+.0%} worse)")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]):
+    print(f"{'scenario':<26}{'docs':>6}{'p50 ms':>11}{'p95 ms':>11}{'docs/s':>10}{'rss MB':>10}")
+    for name, metrics in results.items():
+        print(f"{name:<26}{metrics['docs']:>6}{metrics['p50_ms']:>11}{metrics['p95_ms']:>11}"
+              f"{metrics['docs_per_sec']:>10}{metrics['peak_rss_mb']:>10}")
+        base = baseline.get(name)
+        if base:
+            print(f"{'  baseline':<26}{base.get('docs', ''):>6}{base.get('p50_ms', ''):>11}"
+                  f"{base.get('p95_ms', ''):>11}{base.get('docs_per_sec', ''):>10}{base.get('peak_rss_mb', ''):>10}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark parsing and scoring against a fake Ollama")
+    arg_parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                            help=f"Comma-separated subset of {', '.join(SCENARIOS)}")
+    arg_parser.add_argument("--sizes", default="small,medium", help=f"Comma-separated subset of {', '.join(SIZES)}")
+    arg_parser.add_argument("--docs", type=int, default=20, help="Timed documents per scenario")
+    arg_parser.add_argument("--warmup", type=int, default=1, help="Untimed documents run first")
+    arg_parser.add_argument("--corpus", help="Corpus directory, generated into a temp dir when omitted")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--port", type=int, default=0,
+                            help="Fake Ollama port; by default a free one, so a running Ollama is never hit")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="Fake Ollama seconds to first token")
+    arg_parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="Fake Ollama decode speed")
+    arg_parser.add_argument("--replay", help="JSONL of recorded Ollama responses to serve")
+    arg_parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    arg_parser.add_argument("--save-baseline", help="Write these results as a new baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    arg_parser.add_argument("--worker", help=argparse.SUPPRESS)
+    arg_parser.add_argument("--manifest", help=argparse.SUPPRESS)
+    arg_parser.add_argument("--ollama-url", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.manifest, args.sizes, args.docs, args.warmup,
+                                    args.ollama_url)))
+        return
+
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    sizes = [size for size in args.sizes.split(",") if size]
+    unknown = [name for name in scenarios if name not in SCENARIOS] + [size for size in sizes if size not in SIZES]
+    if unknown:
+        arg_parser.error(f"Unknown scenario or size: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus or tmp
+        manifest_path = os.path.join(corpus, "manifest.json")
+        if not os.path.exists(manifest_path):
+            generate_corpus(corpus, count=args.docs + args.warmup, sizes=list(SIZES), seed=args.seed)
+
+        responder = replay_responder(args.replay) if args.replay else templated_responder()
+        results = {}
+        with FakeOllama(port=args.port, latency=args.latency, tokens_per_sec=args.tokens_per_sec,
+                        responder=responder) as fake:
+            for scenario in scenarios:
+                for size in sizes:
+                    results[f"{scenario}/{size}"] = run_isolated(scenario, manifest_path, size,
+                                                                 args.docs, args.warmup, fake.url)
+
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from evaluator.eval import evaluator_many, experience_text, resume_skills_of
+from utils.embedding_cache import encode
+
+# Each resume is stored as one row [raw_text | experience | skills centroid]. A job
+# query is laid out the same way, so a single dot product gives the weighted sum
+# of the three per-field cosine similarities.
+FIELDS = ("raw_text", "experience", "skills")
+DEFAULT_WEIGHTS = {"raw_text": 0.25, "experience": 0.25, "skills": 0.5}
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.where(norms > 0, vectors / np.clip(norms, 1e-12, None), 0.0).astype(np.float32)
+
+
+def _top_k(scores: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        scores, rows = scores[keep], rows[keep]
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
+
+
+class ExactBackend:
+    """Brute-force inner product over the memory-mapped vectors, in blocks"""
+
+    name = "exact"
+
+    def __init__(self, block_size: int = 65536):
+        self.block_size = block_size
+
+    def build(self, index: "CandidateIndex"):
+        pass
+
+    def add(self, index: "CandidateIndex", rows: np.ndarray):
+        pass
+
+    def search(self, index: "CandidateIndex", query: np.ndarray, k: int):
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, index.count, self.block_size):
+            stop = min(start + self.block_size, index.count)
+            live = np.flatnonzero(index.live[start:stop]) + start
+            if not len(live):
+                continue
+            scores = np.asarray(index.vectors[live], dtype=np.float32) @ query
+            best_rows, best_scores = _top_k(np.concatenate([best_scores, scores]),
+                                            np.concatenate([best_rows, live]), k)
+        return best_rows, best_scores
+
+
+class IVFBackend:
+    """Inverted-file search: k-means coarse quantizer, probe the nprobe closest lists"""
+
+    name = "ivf"
+
+    def __init__(self, nlist: int = 256, nprobe: int = 8, train_iterations: int = 10,
+                 min_train_size: int = 10_000, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.min_train_size = min_train_size
+        self.seed = seed
+        self.centroids = None
+        self.lists: List[List[int]] = []
+        self.exact = ExactBackend()
+
+    def _centroids_path(self, index: "CandidateIndex") -> str:
+        return os.path.join(index.directory, "ivf_centroids.npy")
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def build(self, index: "CandidateIndex"):
+        path = self._centroids_path(index)
+        if self.centroids is None and os.path.exists(path):
+            self.centroids = np.load(path)
+        if self.centroids is None:
+            rows = np.flatnonzero(index.live[:index.count])
+            if len(rows) < max(self.min_train_size, self.nlist):
+                return
+            self.train(index, rows)
+        self.lists = [[] for _ in range(len(self.centroids))]
+        self.add(index, np.arange(index.count))
+
+    def train(self, index: "CandidateIndex", rows: np.ndarray):
+        rng = np.random.default_rng(self.seed)
+        sample = rng.choice(rows, size=min(len(rows), self.nlist * 64), replace=False)
+        data = np.asarray(index.vectors[np.sort(sample)], dtype=np.float32)
+        centroids = data[rng.choice(len(data), size=self.nlist, replace=False)]
+        for _ in range(self.train_iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            for c in range(self.nlist):
+                members = data[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+        self.centroids = centroids.astype(np.float32)
+        np.save(self._centroids_path(index), self.centroids)
+
+    def add(self, index: "CandidateIndex", rows: np.ndarray):
+        if self.centroids is None:
+            if index.live[:index.count].sum() >= max(self.min_train_size, self.nlist):
+                self.build(index)
+            return
+        for start in range(0, len(rows), 65536):
+            block = rows[start:start + 65536]
+            for row, c in zip(block, self._assign(np.asarray(index.vectors[block], dtype=np.float32))):
+                self.lists[c].append(int(row))
+
+    def search(self, index: "CandidateIndex", query: np.ndarray, k: int):
+        if self.centroids is None:
+            return self.exact.search(index, query, k)
+        probes = np.argsort(-(self.centroids @ query))[:self.nprobe]
+        rows = np.array(sorted({r for c in probes for r in self.lists[c]}), dtype=np.int64)
+        rows = rows[index.live[rows]] if len(rows) else rows
+        if not len(rows):
+            return rows, np.zeros(0, dtype=np.float32)
+        scores = np.asarray(index.vectors[rows], dtype=np.float32) @ query
+        return _top_k(scores, rows, k)
+
+
+BACKENDS = {"exact": ExactBackend, "ivf": IVFBackend}
+
+
+class CandidateIndex:
+    """On-disk index of resume embeddings for top-k candidate retrieval.
+
+    dim is the embedding model's width. Left as None it is taken from the first
+    batch added, and a reopened index keeps the width it was built with. add,
+    remove, compact and search hold one lock, so threads may share an index;
+    separate processes must not open the same directory for writing.
+    """
+
+    def __init__(self, directory: str, backend="exact", dim: Optional[int] = None,
+                 weights: Optional[Dict[str, float]] = None):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.vectors_path = os.path.join(directory, "vectors.f16")
+        self.backend = BACKENDS[backend]() if isinstance(backend, str) else backend
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.dim = dim
+        self.count = 0
+        self.capacity = 0
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.live = np.zeros(0, dtype=bool)
+        self.vectors = None
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+        self.backend.build(self)
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.count = meta["count"]
+        self.ids = meta["ids"]
+        self.live = np.zeros(self.count, dtype=bool)
+        self.live[meta["live_rows"]] = True
+        self.rows = {resume_id: row for row, resume_id in enumerate(self.ids) if self.live[row]}
+        if self.dim is not None:
+            self._open(max(self.count, 1))
+
+    def _open(self, capacity: int):
+        width = self.dim * len(FIELDS)
+        row_bytes = width * np.dtype(np.float16).itemsize
+        with open(self.vectors_path, "ab") as f:
+            capacity = max(capacity, f.tell() // row_bytes)
+            if f.tell() < capacity * row_bytes:
+                f.truncate(capacity * row_bytes)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r+",
+                                 shape=(capacity, width))
+        self.capacity = capacity
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self.live)] = self.live[:capacity]
+        self.live = live
+
+    def _reserve(self, extra: int):
+        needed = self.count + extra
+        if needed > self.capacity:
+            if self.vectors is not None:
+                self.vectors.flush()
+            self._open(max(needed, self.capacity * 2, 1024))
+
+    def flush(self):
+        """Persist vectors and the id/tombstone metadata"""
+        with self._lock:
+            if self.vectors is not None:
+                self.vectors.flush()
+            tmp_path = self.meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "dim": self.dim,
+                    "count": self.count,
+                    "ids": self.ids,
+                    "live_rows": np.flatnonzero(self.live[:self.count]).tolist()
+                }, f)
+            os.replace(tmp_path, self.meta_path)
+
+    def _check_dim(self, embeddings: np.ndarray):
+        if self.dim is not None and embeddings.shape[1] != self.dim:
+            raise ValueError(f"Embeddings have {embeddings.shape[1]} dimensions but the index "
+                             f"at {self.directory} stores {self.dim}; rebuild it for the new model")
+
+    def resume_vectors(self, resumes: List[Dict[str, Any]]) -> np.ndarray:
+        """Embed raw_text, experience and skills of each resume into one row"""
+        texts = []
+        for resume in resumes:
+            texts.append(resume.get("raw_text", ""))
+            texts.append(experience_text(resume.get("experience", "")))
+            texts.extend(resume_skills_of(resume))
+        if not texts:
+            return np.zeros((0, (self.dim or 0) * len(FIELDS)), np.float32)
+        embeddings = _unit(encode(texts))
+        self._check_dim(embeddings)
+        dim = embeddings.shape[1]
+
+        rows = np.zeros((len(resumes), dim * len(FIELDS)), dtype=np.float32)
+        pos = 0
+        for i, resume in enumerate(resumes):
+            n_skills = len(resume_skills_of(resume))
+            rows[i, :dim] = embeddings[pos]
+            rows[i, dim:2 * dim] = embeddings[pos + 1]
+            if n_skills:
+                rows[i, 2 * dim:] = _unit(embeddings[pos + 2:pos + 2 + n_skills].mean(axis=0))
+            pos += 2 + n_skills
+        return rows
+
+    def job_vector(self, job_des: Dict[str, Any]) -> np.ndarray:
+        """Lay out a parsed job as a weighted query row matching resume_vectors"""
+        responsibilities = job_des.get("responsibilities", [])
+        requirements = job_des.get("requirements", [])
+        query = np.zeros(self.dim * len(FIELDS), dtype=np.float32)
+        if responsibilities:
+            embeddings = _unit(encode(responsibilities))
+            self._check_dim(embeddings)
+            centroid = _unit(embeddings.mean(axis=0))
+            query[:self.dim] = self.weights["raw_text"] * centroid
+            query[self.dim:2 * self.dim] = self.weights["experience"] * centroid
+        if requirements:
+            embeddings = _unit(encode(requirements))
+            self._check_dim(embeddings)
+            query[2 * self.dim:] = self.weights["skills"] * _unit(embeddings.mean(axis=0))
+        return query
+
+    def add(self, resumes: Mapping[str, Dict[str, Any]]):
+        """Add or replace resumes keyed by id"""
+        if not resumes:
+            return
+        ids = list(resumes)
+        vectors = self.resume_vectors([resumes[i] for i in ids])
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1] // len(FIELDS)
+            elif vectors.shape[1] != self.dim * len(FIELDS):
+                raise ValueError(f"Rows have {vectors.shape[1] // len(FIELDS)} dimensions per field "
+                                 f"but the index stores {self.dim}")
+            self.remove(ids, flush=False)
+            self._reserve(len(ids))
+            start = self.count
+            self.vectors[start:start + len(ids)] = vectors
+            for offset, resume_id in enumerate(ids):
+                self.ids.append(resume_id)
+                self.rows[resume_id] = start + offset
+                self.live[start + offset] = True
+            self.count += len(ids)
+            self.backend.add(self, np.arange(start, self.count))
+            self.flush()
+
+    def remove(self, resume_ids: Iterable[str], flush: bool = True):
+        """Tombstone resumes; their rows are reclaimed by compact()"""
+        with self._lock:
+            for resume_id in resume_ids:
+                row = self.rows.pop(resume_id, None)
+                if row is not None:
+                    self.live[row] = False
+            if flush:
+                self.flush()
+
+    def compact(self):
+        """Rewrite the vector file without tombstoned rows and rebuild the backend"""
+        with self._lock:
+            if self.vectors is None:
+                return
+            keep = np.flatnonzero(self.live[:self.count])
+            vectors = np.asarray(self.vectors[keep])
+            self.ids = [self.ids[row] for row in keep]
+            self.rows = {resume_id: row for row, resume_id in enumerate(self.ids)}
+            self.count = len(keep)
+            self.vectors = None
+            self.live = np.ones(self.count, dtype=bool)
+            os.remove(self.vectors_path)
+            self._open(max(self.count, 1))
+            self.vectors[:self.count] = vectors
+            self.flush()
+            self.backend.build(self)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self.rows
+
+    def search(self, job_des: Dict[str, Any], k: int = 50) -> List[Tuple[str, float]]:
+        """Return the top-k (resume id, similarity) pairs for a parsed job description"""
+        if not self.rows or k <= 0:
+            return []
+        query = self.job_vector(job_des)
+        with self._lock:
+            rows, scores = self.backend.search(self, query, k)
+            return [(self.ids[row], float(score)) for row, score in zip(rows, scores)]
+
+    def rank(self, job_des: Dict[str, Any], resumes: Mapping[str, Dict[str, Any]],
+             k: int = 50, candidates: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Retrieve candidates from the index, then refine them with full evaluator scoring"""
+        hits = self.search(job_des, candidates or k * 4)
+        ids = [resume_id for resume_id, _ in hits if resume_id in resumes]
+        if not ids:
+            return []
+        results = evaluator_many([resumes[i] for i in ids], [job_des])["results"]
+        ranked = sorted(zip(ids, (row[0] for row in results)),
+                        key=lambda item: item[1]["final_score"], reverse=True)
+        return ranked[:k]
@@ -1,36 +1,106 @@
-import spacy
-from nltk.sem.chat80 import items
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
 
-nlp = spacy.load("en_core_web_sm", disable=["ner", "parser_scripts"])
-model = SentenceTransformer('all-MiniLM-L12-v2')
+from utils.embedding_cache import DEFAULT_MODEL, encode, get_model, normalize_text
+from utils.instrumentation import stage
+from utils.model_registry import registry
+
+def _load_spacy():
+    import spacy
+    return spacy.load("en_core_web_sm", disable=["ner", "parser"])
+
+registry.register("spacy/en_core_web_sm", _load_spacy)
+
+def __getattr__(name):
+    # Keep the old module-level globals working without loading them at import
+    if name == "nlp":
+        return registry.get("spacy/en_core_web_sm")
+    if name == "model":
+        return get_model(DEFAULT_MODEL)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_encoder = None
+
+def set_encoder(encoder):
+    """Send every encode in this module through encoder(texts); None restores the default"""
+    global _encoder
+    _encoder = encoder
+
+def _encode(texts, batch_size=64):
+    if _encoder is not None:
+        return _encoder(texts)
+    return encode(texts, batch_size=batch_size)
+
+def cos_sim(a, b):
+    a = np.atleast_2d(np.asarray(a, dtype=np.float32))
+    b = np.atleast_2d(np.asarray(b, dtype=np.float32))
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return a @ b.T
+
+KEYWORD_POS = {"NOUN", "PROPN", "VERB", "ADJ"}
+
+def _keyword_lemmas(doc):
+    return [token.lemma_ for token in doc if token.pos_ in KEYWORD_POS and not token.is_stop]
 
 def extract_keywords(txt):
-    doc = nlp(txt.lower())
-    return list({
-        token.lemma_ for token in doc
-        if token.pos_ in {"NOUN", "PROPN", "VERB", "ADJ"} and not token.is_stop
-    })
-
-def experience_scorer(resume, job_des):
-    raw_text = resume.get("raw_text", "")
-    experience = resume.get("experience", "")
-    responsibilities = job_des.get("responsibilities", [])
+    doc = registry.get("spacy/en_core_web_sm")(txt.lower())
+    return list(set(_keyword_lemmas(doc)))
 
-    raw_text_emb = model.encode(raw_text, convert_to_tensor=True)
-    exp_emb = model.encode(experience, convert_to_tensor=True)
-    job_emb = model.encode(responsibilities, convert_to_tensor=True)
+def extract_keywords_many(texts, n_process=1, batch_size=256):
+    """Keyword lemmas of every text, repeats kept, from one batched nlp.pipe"""
+    nlp = registry.get("spacy/en_core_web_sm")
+    docs = nlp.pipe((txt.lower() for txt in texts), n_process=n_process, batch_size=batch_size)
+    return [_keyword_lemmas(doc) for doc in docs]
 
-    matched_experience = []
-    threshold = 0.7
+def experience_text(experience):
+    """Flatten a parsed experience field (string or list of entries) into one text"""
+    if isinstance(experience, str):
+        return experience
+    if isinstance(experience, dict):
+        return " ".join(experience_text(v) for v in experience.values() if v)
+    if isinstance(experience, list):
+        return " ".join(experience_text(v) for v in experience if v)
+    return str(experience) if experience else ""
+
+# Sliding windows in words; MiniLM truncates at 256 word pieces, roughly 180 words
+CHUNK_WINDOW = 128
+CHUNK_STRIDE = 96
+# Chunks encoded and compared per block, bounding memory for very long inputs
+CHUNK_BLOCK = 1024
+
+def chunk_text(text, window=CHUNK_WINDOW, stride=CHUNK_STRIDE):
+    """Split text into overlapping windows of `window` words, `stride` words apart"""
+    if window <= 0 or stride <= 0:
+        raise ValueError("window and stride must be positive")
+    words = str(text).split()
+    if len(words) <= window:
+        return [" ".join(words)]
+    starts = range(0, len(words) - window + stride, stride)
+    return [" ".join(words[start:start + window]) for start in starts]
+
+def resume_chunks(resume, window=CHUNK_WINDOW, stride=CHUNK_STRIDE):
+    """Chunks of the resume's raw text plus chunks of each experience entry on its own"""
+    chunks = chunk_text(resume.get("raw_text", ""), window, stride)
+    experience = resume.get("experience", "")
+    entries = experience if isinstance(experience, list) and experience else [experience]
+    for entry in entries:
+        chunks.extend(chunk_text(experience_text(entry), window, stride))
+    return chunks
+
+def resume_skills_of(resume):
+    """Every skill under resume["skills"], category lists in key order.
 
-    for i, resp_emb in enumerate(job_emb):
-        sim_full = util.cos_sim(raw_text_emb, resp_emb).item()
-        sim_exp = util.cos_sim(exp_emb, resp_emb).item()
-        best_sim = max(sim_full, sim_exp)
-        if best_sim >= threshold:
-            matched_experience.append(responsibilities[i])
+    Covers both the technical_skills/soft_skills shape and the parser's
+    categories (programming_languages, frameworks, ...). ParsedStore's
+    skill_list column is built with this, so stored and live scoring agree.
+    """
+    skills = resume.get("skills")
+    if not isinstance(skills, dict):
+        return []
+    return [skill for values in skills.values() if isinstance(values, list)
+            for skill in values if isinstance(skill, str) and skill.strip()]
 
+def _experience_result(responsibilities, matched_experience):
     missing_experience = list(set(responsibilities) - set(matched_experience))
     score = round(len(matched_experience) / len(responsibilities) * 100, 2) if responsibilities else 0
 
@@ -40,29 +110,7 @@ def experience_scorer(resume, job_des):
         "missing_experience": missing_experience
     }
 
-def skill_scorer(resume, job_des):
-    technical_skills = resume.get("skills", {}).get("technical_skills", [])
-    soft_skills = resume.get("skills", {}).get("soft_skills", [])
-    resume_skills = technical_skills + soft_skills
-    requirements = job_des.get("requirements", [])
-
-    resume_embeddings = model.encode(resume_skills, convert_to_tensor=True)
-    job_embeddings = model.encode(requirements, convert_to_tensor=True)
-
-    matched_skills = set()
-    used_indexes = set()
-    threshold = 0.7
-
-    for i, job_emb in enumerate(job_embeddings):
-        for j, skill_emb in enumerate(resume_embeddings):
-            if j in used_indexes:
-                continue
-            sim_score = util.cos_sim(job_emb, skill_emb).item()
-            if sim_score >= threshold:
-                matched_skills.add(requirements[i])
-                used_indexes.add(j)
-                break
-
+def _skill_result(requirements, matched_skills):
     missing_skills = list(set(requirements) - set(matched_skills))
     score = round(len(matched_skills) / len(requirements) * 100, 2) if requirements else 0
 
@@ -72,10 +120,7 @@ def skill_scorer(resume, job_des):
         "missing_skills": missing_skills
     }
 
-def evaluator(resume, job_des):
-    skill_score = skill_scorer(resume, job_des)
-    experience_score = experience_scorer(resume, job_des)
-
+def _combined_result(skill_score, experience_score):
     final_score = round(
         (0.5 * experience_score['score']) +
         (0.5 * skill_score['score']), 2
@@ -89,4 +134,190 @@ def evaluator(resume, job_des):
         },
         "skills": skill_score,
         "experience": experience_score,
-    }
\ No newline at end of file
+    }
+
+def experience_scorer(resume, job_des, window=CHUNK_WINDOW, stride=CHUNK_STRIDE):
+    responsibilities = job_des.get("responsibilities", [])
+    if not responsibilities:
+        return _experience_result(responsibilities, [])
+
+    chunks = resume_chunks(resume, window, stride)
+    job_emb = _normalized(_encode(responsibilities))
+
+    # Each responsibility scores as its best match over every chunk, one block of chunks at a time
+    best = np.full(len(responsibilities), -1.0, dtype=np.float32)
+    for start in range(0, len(chunks), CHUNK_BLOCK):
+        chunk_emb = _normalized(_encode(chunks[start:start + CHUNK_BLOCK]))
+        with stage("eval.experience_similarity", pairs=len(responsibilities) * len(chunk_emb)):
+            np.maximum(best, (job_emb @ chunk_emb.T).max(axis=1), out=best)
+
+    threshold = 0.7
+    matched_experience = [responsibilities[i] for i in np.flatnonzero(best >= threshold)]
+    return _experience_result(responsibilities, matched_experience)
+
+def assign_matches(sim, threshold=0.7, assignment="greedy"):
+    """Pair rows (requirements) with columns (resume skills) one-to-one.
+
+    ``greedy`` walks requirements in order and takes the first unused skill at
+    or above the threshold, exactly like the original nested loop. ``hungarian``
+    maximises the number of matched requirements, breaking ties by similarity.
+    """
+    sim = np.asarray(sim, dtype=np.float32)
+    if sim.ndim != 2 or 0 in sim.shape:
+        return []
+    mask = sim >= threshold
+
+    if assignment == "greedy":
+        pairs = []
+        available = np.ones(sim.shape[1], dtype=bool)
+        for i in np.flatnonzero(mask.any(axis=1)):
+            candidates = mask[i] & available
+            if candidates.any():
+                j = int(candidates.argmax())
+                available[j] = False
+                pairs.append((int(i), j))
+        return pairs
+
+    if assignment == "hungarian":
+        from scipy.optimize import linear_sum_assignment
+
+        # A match is worth more than any total similarity, so the matching count is maximised first
+        weights = np.where(mask, min(sim.shape) + 1.0 + sim, 0.0)
+        rows, cols = linear_sum_assignment(weights, maximize=True)
+        return sorted((int(i), int(j)) for i, j in zip(rows, cols) if mask[i, j])
+
+    raise ValueError(f"Unknown assignment mode: {assignment}")
+
+def skill_scorer(resume, job_des, assignment="greedy"):
+    resume_skills = resume_skills_of(resume)
+    requirements = job_des.get("requirements", [])
+
+    matched_skills = set()
+    threshold = 0.7
+
+    if resume_skills and requirements:
+        resume_embeddings = _encode(resume_skills)
+        job_embeddings = _encode(requirements)
+        with stage("eval.skill_similarity", pairs=len(requirements) * len(resume_skills)):
+            sim = cos_sim(job_embeddings, resume_embeddings)
+            for i, _ in assign_matches(sim, threshold, assignment):
+                matched_skills.add(requirements[i])
+
+    return _skill_result(requirements, matched_skills)
+
+def evaluator(resume, job_des, assignment="greedy", window=CHUNK_WINDOW, stride=CHUNK_STRIDE):
+    with stage("eval.score"):
+        skill_score = skill_scorer(resume, job_des, assignment)
+        experience_score = experience_scorer(resume, job_des, window, stride)
+        return _combined_result(skill_score, experience_score)
+
+def _normalized(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+def _max_over_chunks(queries, embeddings, chunk_ids, block=CHUNK_BLOCK):
+    """best[q, i]: highest similarity of query q to any chunk of document i.
+
+    Documents are processed in groups of about `block` chunks so the similarity
+    matrix never exceeds len(queries) x block.
+    """
+    best = np.zeros((len(queries), len(chunk_ids)), dtype=np.float32)
+    lengths = [len(ids) for ids in chunk_ids]
+    start = 0
+    while start < len(chunk_ids):
+        stop, total = start, 0
+        while stop < len(chunk_ids) and (stop == start or total + lengths[stop] <= block):
+            total += lengths[stop]
+            stop += 1
+        sim = queries @ embeddings[np.concatenate(chunk_ids[start:stop])].T
+        offsets = np.cumsum([0] + lengths[start:stop - 1])
+        best[:, start:stop] = np.maximum.reduceat(sim, offsets, axis=1)
+        start = stop
+    return best
+
+def evaluator_many(resumes, jobs, assignment="greedy", batch_size=256, window=CHUNK_WINDOW,
+                   stride=CHUNK_STRIDE, resume_skills=None):
+    """Score every resume against every job with one encode pass over unique texts.
+
+    Returns ``results[i][j]`` shaped exactly like ``evaluator(resumes[i], jobs[j])``
+    plus N x M ``scores``, ``skill_scores`` and ``experience_scores`` matrices.
+    ``resume_skills`` optionally supplies the skills as ``(offsets, codes,
+    vocabulary)`` arrays, e.g. ParsedStore.skill_lists, instead of per-resume lists.
+    """
+    threshold = 0.7
+    vocabulary = {}
+
+    def ids_of(texts):
+        return np.array([vocabulary.setdefault(normalize_text(t), len(vocabulary)) for t in texts],
+                        dtype=np.int64)
+
+    if resume_skills is None:
+        skill_ids = [ids_of(resume_skills_of(r)) for r in resumes]
+    else:
+        offsets, codes, skill_vocabulary = resume_skills
+        vocabulary_ids = ids_of(skill_vocabulary)
+        skill_ids = [vocabulary_ids[codes[offsets[i]:offsets[i + 1]]] for i in range(len(resumes))]
+    chunk_ids = [ids_of(resume_chunks(r, window, stride)) for r in resumes]
+    requirement_lists = [job.get("requirements", []) for job in jobs]
+    responsibility_lists = [job.get("responsibilities", []) for job in jobs]
+    requirement_ids = [ids_of(reqs) for reqs in requirement_lists]
+    responsibility_ids = [ids_of(resps) for resps in responsibility_lists]
+
+    texts = list(vocabulary)
+    with stage("eval.batch_encode", texts=len(texts)):
+        embeddings = _normalized(_encode(texts, batch_size=batch_size)) if texts else None
+
+    with stage("eval.batch_similarity", resumes=len(resumes), jobs=len(jobs)):
+        # Experience: one (responsibility x resume) matrix for the whole batch
+        all_resp = np.unique(np.concatenate(responsibility_ids)) if jobs else np.zeros(0, np.int64)
+        resp_row = {int(t): row for row, t in enumerate(all_resp)}
+        if len(all_resp) and len(resumes):
+            resp_matched = _max_over_chunks(embeddings[all_resp], embeddings, chunk_ids) >= threshold
+        else:
+            resp_matched = np.zeros((len(all_resp), len(resumes)), dtype=bool)
+
+        # Skills: one (requirement x skill) matrix, sliced per pair for the assignment
+        all_req = np.unique(np.concatenate(requirement_ids)) if jobs else np.zeros(0, np.int64)
+        all_skill = np.unique(np.concatenate(skill_ids)) if resumes else np.zeros(0, np.int64)
+        if len(all_req) and len(all_skill):
+            req_skill_sim = embeddings[all_req] @ embeddings[all_skill].T
+            req_row = np.full(len(vocabulary), -1, dtype=np.int64)
+            req_row[all_req] = np.arange(len(all_req))
+            skill_col = np.full(len(vocabulary), -1, dtype=np.int64)
+            skill_col[all_skill] = np.arange(len(all_skill))
+        else:
+            req_skill_sim = None
+
+    results = [[] for _ in resumes]
+    scores = np.zeros((len(resumes), len(jobs)), dtype=np.float32)
+    skill_scores = np.zeros_like(scores)
+    experience_scores = np.zeros_like(scores)
+
+    for j, (requirements, responsibilities) in enumerate(zip(requirement_lists, responsibility_lists)):
+        rows = [resp_row[int(t)] for t in responsibility_ids[j]]
+        job_matched = resp_matched[rows] if rows else np.zeros((0, len(resumes)), dtype=bool)
+        job_req_rows = req_row[requirement_ids[j]] if req_skill_sim is not None else None
+
+        for i in range(len(resumes)):
+            matched_experience = [responsibilities[k] for k in np.flatnonzero(job_matched[:, i])]
+            experience_score = _experience_result(responsibilities, matched_experience)
+
+            matched_skills = set()
+            if req_skill_sim is not None and len(requirements) and len(skill_ids[i]):
+                sim = req_skill_sim[np.ix_(job_req_rows, skill_col[skill_ids[i]])]
+                for k, _ in assign_matches(sim, threshold, assignment):
+                    matched_skills.add(requirements[k])
+            skill_score = _skill_result(requirements, matched_skills)
+
+            pair = _combined_result(skill_score, experience_score)
+            results[i].append(pair)
+            scores[i, j] = pair["final_score"]
+            skill_scores[i, j] = skill_score["score"]
+            experience_scores[i, j] = experience_score["score"]
+
+    return {
+        "results": results,
+        "scores": scores,
+        "skill_scores": skill_scores,
+        "experience_scores": experience_scores
+    }
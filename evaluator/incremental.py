@@ -0,0 +1,425 @@
+import difflib
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from evaluator.eval import (CHUNK_STRIDE, CHUNK_WINDOW, _combined_result, _encode, _experience_result,
+                            _max_over_chunks, _normalized, _skill_result, assign_matches, resume_chunks,
+                            resume_skills_of)
+from parser_scripts.job_des_parser import parse_requirements
+from utils.embedding_cache import normalize_text
+
+LIST_FIELDS = ("requirements", "responsibilities")
+
+# Headings that open a bulleted section the incremental path can edit item by item
+LIST_HEADINGS = {
+    "responsibilities": ["responsibilities", "key responsibilities", "duties", "what you will do",
+                         "what you'll do", "your role", "the role", "day to day"],
+    "requirements": ["requirements", "qualifications", "required qualifications", "minimum qualifications",
+                     "what you bring", "what we're looking for", "what we are looking for", "must have",
+                     "required skills"]
+}
+HEADING_LOOKUP = {heading: name for name, headings in LIST_HEADINGS.items() for heading in headings}
+BULLET_RE = re.compile(r"^\s*(?:[-•–—*▪]|\d+[.)])\s+")
+
+FragmentParser = Callable[[str, str], List[str]]
+RequirementsParser = Callable[[str], List[str]]
+
+
+def item_key(text: str) -> str:
+    """Whitespace-insensitive but case-sensitive, since evaluator encodes the text as written"""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _heading(line: str) -> Optional[str]:
+    """List field a heading line opens, '' for any other heading, None for body lines"""
+    stripped = line.strip()
+    if not stripped or BULLET_RE.match(line) or len(stripped) > 50:
+        return None
+    name = stripped.rstrip(":").strip().lower()
+    if name in HEADING_LOOKUP:
+        return HEADING_LOOKUP[name]
+    return "" if stripped.endswith(":") else None
+
+
+def _line_fields(lines: List[str]) -> List[Optional[str]]:
+    fields, current = [], None
+    for line in lines:
+        heading = _heading(line)
+        if heading is not None:
+            current = heading or None
+            fields.append("heading")
+            continue
+        fields.append(current)
+    return fields
+
+
+def default_fragment_parser(field_name: str, line: str) -> List[str]:
+    """Turn one bullet line into items the same way job_parser cleans responsibilities.
+
+    Requirements are keyphrases of the whole section rather than one item per
+    line, so apply_text_edit re-extracts them instead (see requirements_parser).
+    """
+    text = BULLET_RE.sub("", line).lstrip("-•–—").strip()
+    return [text.lower() if field_name == "responsibilities" else text] if text else []
+
+
+def requirement_items(job: Dict[str, Any]) -> List[str]:
+    """Requirements as a flat list, for both job_parser lists and LLM parses' required_skills"""
+    requirements = job.get("requirements", [])
+    if isinstance(requirements, dict):
+        return list(requirements.get("required_skills", []))
+    return list(requirements)
+
+
+def scoring_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job in the shape evaluator expects, from either job_parser or an LLM job parse"""
+    return {"requirements": requirement_items(job), "responsibilities": list(job.get("responsibilities", []))}
+
+
+def scoring_resume(parsed: Dict[str, Any], text: str) -> Dict[str, Any]:
+    """Parsed resume with its raw text, which evaluator chunks for experience matching"""
+    return dict(parsed, raw_text=text)
+
+
+def _with_items(job: Dict[str, Any], field_name: str, items: List[str]) -> Dict[str, Any]:
+    job = dict(job)
+    if field_name == "requirements" and isinstance(job.get("requirements"), dict):
+        job["requirements"] = dict(job["requirements"], required_skills=items)
+    else:
+        job[field_name] = items
+    return job
+
+
+def _field_items(job: Dict[str, Any], field_name: str) -> List[str]:
+    return requirement_items(job) if field_name == "requirements" else list(job.get(field_name, []))
+
+
+def apply_text_edit(job: Dict[str, Any], old_text: str, new_text: str,
+                    fragment_parser: FragmentParser = default_fragment_parser,
+                    requirements_parser: Optional[RequirementsParser] = None) -> Optional[Dict[str, Any]]:
+    """Carry a text edit over to the parsed job without re-parsing the whole description.
+
+    Only bullet lines inside requirements/responsibilities sections are handled:
+    removed responsibility bullets drop the items they produced, added ones are
+    parsed on their own and appended. Edited requirements are re-extracted from
+    the new text with requirements_parser, which must be what built the job's
+    requirements; it defaults to job_parser's keyphrase extraction for
+    job_parser output. Returns None when the edit touches anything else, or
+    requirements of an LLM parse without a requirements_parser, in which case
+    the caller must re-parse the full text.
+    """
+    old_lines, new_lines = old_text.splitlines(), new_text.splitlines()
+    old_fields, new_fields = _line_fields(old_lines), _line_fields(new_lines)
+    removed: Dict[str, List[str]] = {name: [] for name in LIST_FIELDS}
+    added: Dict[str, List[str]] = {name: [] for name in LIST_FIELDS}
+
+    matcher = difflib.SequenceMatcher(a=old_lines, b=new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        for lines, fields, target in ((old_lines[i1:i2], old_fields[i1:i2], removed),
+                                      (new_lines[j1:j2], new_fields[j1:j2], added)):
+            for line, field_name in zip(lines, fields):
+                if not line.strip():
+                    continue
+                if field_name not in LIST_FIELDS or not BULLET_RE.match(line):
+                    return None
+                target[field_name].append(line)
+
+    if removed["requirements"] or added["requirements"]:
+        if requirements_parser is None:
+            if isinstance(job.get("requirements"), dict):
+                # The LLM's atomic required_skills cannot be rebuilt from a bullet on its own
+                return None
+            requirements_parser = parse_requirements
+        job = _with_items(job, "requirements", requirements_parser(new_text))
+
+    normalized_new = normalize_text(new_text).lower()
+    if removed["responsibilities"] or added["responsibilities"]:
+        items = _field_items(job, "responsibilities")
+        for line in removed["responsibilities"]:
+            gone = {item_key(item) for item in fragment_parser("responsibilities", line)}
+            source = normalize_text(line).lower()
+            items = [item for item in items
+                     if item_key(item) not in gone
+                     and not (normalize_text(item).lower() in source
+                              and normalize_text(item).lower() not in normalized_new)]
+        for line in added["responsibilities"]:
+            items.extend(fragment_parser("responsibilities", line))
+        job = _with_items(job, "responsibilities", items)
+    return job
+
+
+@dataclass
+class JobDelta:
+    version: int
+    added: Dict[str, List[str]] = field(default_factory=dict)
+    removed: Dict[str, List[str]] = field(default_factory=dict)
+    reparsed: bool = False
+    encoded: int = 0
+    rescored: int = 0
+    reordered: bool = False
+
+
+class IncrementalScorer:
+    """Evaluator results for a candidate pool against one job, updated per edited item.
+
+    Each requirement/responsibility is keyed by the hash of its text. Candidate
+    chunk and skill embeddings are kept, so an edit only encodes the new items,
+    computes one similarity column per new item over the pool, and re-runs the
+    skill assignment only for candidates that have a skill matching a changed
+    requirement (any requirement, when they were reordered). Results equal
+    evaluator(resume, job, assignment).
+    """
+
+    def __init__(self, job: Dict[str, Any], job_text: Optional[str] = None, assignment: str = "greedy",
+                 threshold: float = 0.7, window: int = CHUNK_WINDOW, stride: int = CHUNK_STRIDE,
+                 dtype=np.float32):
+        self.assignment = assignment
+        self.threshold = threshold
+        self.window = window
+        self.stride = stride
+        self.dtype = dtype
+        self.version = 0
+        self.history: List[JobDelta] = []
+        self.job: Dict[str, Any] = {}
+        self.job_text = job_text
+        self.item_versions: Dict[Tuple[str, str], int] = {}
+
+        self.ids: List[Any] = []
+        self.index: Dict[Any, int] = {}
+        self._chunks = np.zeros((0, 0), dtype=dtype)
+        self._chunk_ids: List[np.ndarray] = []
+        self._skills = np.zeros((0, 0), dtype=dtype)
+        self._skill_ids: List[np.ndarray] = []
+
+        self._item_emb: Dict[str, np.ndarray] = {}
+        self._item_text: Dict[str, str] = {}
+        self._experience_cols: Dict[str, np.ndarray] = {}
+        self._admissible: Dict[str, np.ndarray] = {}
+        self._matched_skills: List[Set[str]] = []
+        self.update_job(job)
+
+    # Job side
+
+    @property
+    def requirements(self) -> List[str]:
+        return requirement_items(self.job)
+
+    @property
+    def responsibilities(self) -> List[str]:
+        return list(self.job.get("responsibilities", []))
+
+    def _encode_items(self, texts: Iterable[str]) -> int:
+        new = {item_key(text): text for text in texts if item_key(text) not in self._item_emb}
+        if new:
+            embeddings = _normalized(_encode(list(new.values())))
+            self._item_emb.update(zip(new, embeddings))
+            self._item_text.update(new)
+        return len(new)
+
+    def _item_matrix(self, texts: List[str]) -> np.ndarray:
+        return np.stack([self._item_emb[item_key(text)] for text in texts])
+
+    def update_job(self, job: Dict[str, Any], reparsed: bool = False) -> JobDelta:
+        """Move to a new parsed version of the job, rescoring only what its items changed"""
+        old = {name: _field_items(self.job, name) for name in LIST_FIELDS}
+        new = {name: _field_items(job, name) for name in LIST_FIELDS}
+        old_keys = {name: {item_key(t): t for t in old[name]} for name in LIST_FIELDS}
+        new_keys = {name: {item_key(t): t for t in new[name]} for name in LIST_FIELDS}
+        self.version += 1 if self.job else 0
+        delta = JobDelta(self.version, reparsed=reparsed)
+        for name in LIST_FIELDS:
+            delta.added[name] = [t for k, t in new_keys[name].items() if k not in old_keys[name]]
+            delta.removed[name] = [t for k, t in old_keys[name].items() if k not in new_keys[name]]
+            for key in new_keys[name]:
+                self.item_versions.setdefault((name, key), self.version)
+            for key in old_keys[name]:
+                if key not in new_keys[name]:
+                    self.item_versions.pop((name, key), None)
+
+        # Greedy assignment walks requirements in order, so a reorder can change anyone's matches
+        kept_old = [key for key in map(item_key, old["requirements"]) if key in new_keys["requirements"]]
+        kept_new = [key for key in map(item_key, new["requirements"]) if key in old_keys["requirements"]]
+        delta.reordered = kept_old != kept_new
+
+        delta.encoded = self._encode_items(delta.added["requirements"] + delta.added["responsibilities"])
+        self.job = job
+
+        self._add_columns(delta.added["responsibilities"], delta.added["requirements"])
+        if self.ids:
+            changed = delta.added["requirements"] + delta.removed["requirements"]
+            if delta.reordered:
+                changed += new["requirements"]
+            affected = np.zeros(len(self.ids), dtype=bool)
+            for text in changed:
+                affected |= self._admissible[item_key(text)]
+            rows = np.flatnonzero(affected)
+            self._assign(rows)
+            delta.rescored = len(rows)
+
+        for name in LIST_FIELDS:
+            for text in delta.removed[name]:
+                if not any(item_key(text) in keys for keys in new_keys.values()):
+                    self._drop_item(item_key(text))
+        self.history.append(delta)
+        return delta
+
+    def update_job_text(self, job_text: str, parse: Optional[Callable[[str], Dict[str, Any]]] = None,
+                        fragment_parser: FragmentParser = default_fragment_parser,
+                        requirements_parser: Optional[RequirementsParser] = None) -> JobDelta:
+        """Apply an edited description, re-parsing the full text only when bullets alone cannot express it"""
+        job = None
+        if self.job_text is not None:
+            job = apply_text_edit(self.job, self.job_text, job_text, fragment_parser, requirements_parser)
+        reparsed = job is None
+        if reparsed:
+            if parse is None:
+                raise ValueError("Edit touches more than requirement/responsibility bullets; a parse function is needed")
+            job = parse(job_text)
+        self.job_text = job_text
+        return self.update_job(job, reparsed=reparsed)
+
+    def _drop_item(self, key: str):
+        self._item_emb.pop(key, None)
+        self._item_text.pop(key, None)
+        self._experience_cols.pop(key, None)
+        self._admissible.pop(key, None)
+
+    # Candidate side
+
+    def add_candidates(self, resumes: Dict[Any, Dict[str, Any]]):
+        """Add or replace candidates, embedding their chunks and skills once"""
+        replaced = [candidate_id for candidate_id in resumes if candidate_id in self.index]
+        if replaced:
+            self.remove_candidates(replaced)
+
+        start = len(self.ids)
+        chunk_texts, skill_texts = [], []
+        chunk_lengths, skill_lengths = [], []
+        for candidate_id, resume in resumes.items():
+            self.index[candidate_id] = len(self.ids)
+            self.ids.append(candidate_id)
+            chunks = resume_chunks(resume, self.window, self.stride)
+            skills = resume_skills_of(resume)
+            chunk_texts.extend(chunks)
+            skill_texts.extend(skills)
+            chunk_lengths.append(len(chunks))
+            skill_lengths.append(len(skills))
+
+        self._chunks, self._chunk_ids = self._append_rows(self._chunks, self._chunk_ids, chunk_texts, chunk_lengths)
+        self._skills, self._skill_ids = self._append_rows(self._skills, self._skill_ids, skill_texts, skill_lengths)
+        rows = np.arange(start, len(self.ids))
+        self._matched_skills.extend(set() for _ in rows)
+
+        for key, column in self._experience_cols.items():
+            self._experience_cols[key] = np.concatenate([column, np.zeros(len(rows), dtype=bool)])
+        for key, column in self._admissible.items():
+            self._admissible[key] = np.concatenate([column, np.zeros(len(rows), dtype=bool)])
+        self._fill_columns(rows, list(self._experience_cols), list(self._admissible))
+        self._assign(rows)
+
+    def remove_candidates(self, ids: Iterable[Any]):
+        drop = {self.index.pop(candidate_id) for candidate_id in ids if candidate_id in self.index}
+        if not drop:
+            return
+        keep = np.array([i for i in range(len(self.ids)) if i not in drop], dtype=np.int64)
+        self.ids = [self.ids[i] for i in keep]
+        self.index = {candidate_id: i for i, candidate_id in enumerate(self.ids)}
+        self._chunks, self._chunk_ids = self._select_rows(self._chunks, self._chunk_ids, keep)
+        self._skills, self._skill_ids = self._select_rows(self._skills, self._skill_ids, keep)
+        self._matched_skills = [self._matched_skills[i] for i in keep]
+        for columns in (self._experience_cols, self._admissible):
+            for key in columns:
+                columns[key] = columns[key][keep]
+
+    def _append_rows(self, matrix: np.ndarray, ids: List[np.ndarray], texts: List[str],
+                     lengths: List[int]) -> Tuple[np.ndarray, List[np.ndarray]]:
+        offset = len(matrix)
+        if texts:
+            embeddings = _normalized(_encode(texts)).astype(self.dtype)
+            matrix = embeddings if not offset else np.concatenate([matrix, embeddings])
+        for length in lengths:
+            ids.append(np.arange(offset, offset + length))
+            offset += length
+        return matrix, ids
+
+    def _select_rows(self, matrix: np.ndarray, ids: List[np.ndarray],
+                     keep: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+        kept = [ids[i] for i in keep]
+        rows = np.concatenate(kept) if kept else np.zeros(0, dtype=np.int64)
+        new_ids, offset = [], 0
+        for row_ids in kept:
+            new_ids.append(np.arange(offset, offset + len(row_ids)))
+            offset += len(row_ids)
+        return matrix[rows], new_ids
+
+    # Scoring
+
+    def _columns(self, texts: List[str], matrix: np.ndarray, ids: List[np.ndarray], rows: np.ndarray) -> np.ndarray:
+        """(items x rows) best similarity of each item to any chunk/skill of each candidate row"""
+        out = np.full((len(texts), len(rows)), -1.0, dtype=np.float32)
+        present = [i for i, row in enumerate(rows) if len(ids[row])]
+        if texts and present:
+            best = _max_over_chunks(self._item_matrix(texts), matrix, [ids[rows[i]] for i in present])
+            out[:, present] = best
+        return out
+
+    def _fill_columns(self, rows: np.ndarray, responsibility_keys: List[str], requirement_keys: List[str]):
+        texts = [self._item_text[key] for key in responsibility_keys]
+        for key, column in zip(responsibility_keys, self._columns(texts, self._chunks, self._chunk_ids, rows)):
+            self._experience_cols[key][rows] = column >= self.threshold
+        texts = [self._item_text[key] for key in requirement_keys]
+        for key, column in zip(requirement_keys, self._columns(texts, self._skills, self._skill_ids, rows)):
+            self._admissible[key][rows] = column >= self.threshold
+
+    def _add_columns(self, responsibilities: List[str], requirements: List[str]):
+        rows = np.arange(len(self.ids))
+        size = len(self.ids)
+        for text in responsibilities:
+            self._experience_cols[item_key(text)] = np.zeros(size, dtype=bool)
+        for text in requirements:
+            self._admissible[item_key(text)] = np.zeros(size, dtype=bool)
+        self._fill_columns(rows, [item_key(t) for t in responsibilities], [item_key(t) for t in requirements])
+
+    def _assign(self, rows: np.ndarray):
+        requirements = self.requirements
+        if not requirements:
+            for row in rows:
+                self._matched_skills[row] = set()
+            return
+        req_emb = self._item_matrix(requirements)
+        admissible = np.stack([self._admissible[item_key(text)] for text in requirements])
+        for row in rows:
+            matched = set()
+            if admissible[:, row].any():
+                sim = req_emb @ self._skills[self._skill_ids[row]].astype(np.float32).T
+                for i, _ in assign_matches(sim, self.threshold, self.assignment):
+                    matched.add(requirements[i])
+            self._matched_skills[row] = matched
+
+    def result(self, candidate_id: Any) -> Dict[str, Any]:
+        """evaluator-shaped result for one candidate under the current job version"""
+        row = self.index[candidate_id]
+        responsibilities = self.responsibilities
+        matched_experience = [text for text in responsibilities if self._experience_cols[item_key(text)][row]]
+        skill_score = _skill_result(self.requirements, set(self._matched_skills[row]))
+        experience_score = _experience_result(responsibilities, matched_experience)
+        return _combined_result(skill_score, experience_score)
+
+    def scores(self) -> Dict[Any, float]:
+        requirements, responsibilities = self.requirements, self.responsibilities
+        experience_counts = np.zeros(len(self.ids), dtype=np.int64)
+        for text in responsibilities:
+            experience_counts += self._experience_cols[item_key(text)]
+        out = {}
+        for row, candidate_id in enumerate(self.ids):
+            skill = round(len(self._matched_skills[row]) / len(requirements) * 100, 2) if requirements else 0
+            experience = (round(int(experience_counts[row]) / len(responsibilities) * 100, 2)
+                          if responsibilities else 0)
+            out[candidate_id] = round(0.5 * experience + 0.5 * skill, 2)
+        return out
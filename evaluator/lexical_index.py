@@ -0,0 +1,198 @@
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from evaluator.eval import (CHUNK_STRIDE, CHUNK_WINDOW, evaluator_many, experience_text, extract_keywords_many,
+                            resume_skills_of)
+from evaluator.incremental import requirement_items
+from utils.instrumentation import stage
+
+DEFAULT_SHORTLIST_SIZE = 100
+RECALL_SIZES = (10, 25, 50, 100, 250, 500, 1000)
+
+
+def resume_text(resume: Dict[str, Any]) -> str:
+    """Text indexed for a resume: its raw text, or the experience entries when there is none"""
+    return resume.get("raw_text") or experience_text(resume.get("experience", ""))
+
+
+def job_query(job: Dict[str, Any]) -> str:
+    return "\n".join(requirement_items(job) + list(job.get("responsibilities", [])))
+
+
+class LexicalIndex:
+    """BM25 inverted index over resume keywords, used to shortlist candidates per job.
+
+    Terms are the lemmas extract_keywords keeps (nouns, proper nouns, verbs,
+    adjectives); skill terms count skill_weight times. Postings are keyed by
+    row, so adding or removing a resume only touches that resume's terms.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, skill_weight: float = 2.0, n_process: int = 1,
+                 batch_size: int = 256, shortlist_size: int = DEFAULT_SHORTLIST_SIZE):
+        self.k1 = k1
+        self.b = b
+        self.skill_weight = skill_weight
+        self.n_process = n_process
+        self.batch_size = batch_size
+        self.shortlist_size = shortlist_size
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.rows: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self.resumes: Dict[str, Dict[str, Any]] = {}
+        self._terms: List[Dict[str, float]] = []
+        self._lengths: List[float] = []
+        self._length_array: Optional[np.ndarray] = None
+        self._free: List[int] = []
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self.rows
+
+    def _keywords(self, texts: List[str]) -> List[List[str]]:
+        return extract_keywords_many(texts, n_process=self.n_process, batch_size=self.batch_size)
+
+    def add(self, ids: Sequence[str], resumes: Sequence[Dict[str, Any]]):
+        """Index resumes under ids, replacing any already indexed under the same id"""
+        if len(ids) != len(resumes):
+            raise ValueError("ids and resumes must have the same length")
+        # A repeated id keeps its last resume, as separate add() calls would
+        latest = dict(zip(ids, resumes))
+        ids, resumes = list(latest), list(latest.values())
+        self.remove([resume_id for resume_id in ids if resume_id in self.rows])
+        texts = []
+        for resume in resumes:
+            texts.append(resume_text(resume))
+            texts.append("\n".join(resume_skills_of(resume)))
+        with stage("lexical.index", docs=len(resumes)):
+            keywords = self._keywords(texts)
+            for index, (resume_id, resume) in enumerate(zip(ids, resumes)):
+                terms: Dict[str, float] = Counter(keywords[2 * index])
+                for term in keywords[2 * index + 1]:
+                    terms[term] = terms.get(term, 0.0) + self.skill_weight
+                self._insert(resume_id, resume, terms)
+        self._length_array = None
+
+    def _insert(self, resume_id: str, resume: Dict[str, Any], terms: Dict[str, float]):
+        length = float(sum(terms.values()))
+        if self._free:
+            row = self._free.pop()
+            self.ids[row], self._terms[row], self._lengths[row] = resume_id, terms, length
+        else:
+            row = len(self.ids)
+            self.ids.append(resume_id)
+            self._terms.append(terms)
+            self._lengths.append(length)
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[row] = tf
+        self.rows[resume_id] = row
+        self.resumes[resume_id] = resume
+        self._total_length += length
+
+    def remove(self, ids: Iterable[str]):
+        for resume_id in ids:
+            row = self.rows.pop(resume_id, None)
+            if row is None:
+                continue
+            for term in self._terms[row]:
+                posting = self.postings[term]
+                del posting[row]
+                if not posting:
+                    del self.postings[term]
+            self._total_length -= self._lengths[row]
+            self.ids[row], self._terms[row], self._lengths[row] = None, {}, 0.0
+            del self.resumes[resume_id]
+            self._free.append(row)
+        self._length_array = None
+
+    def scores(self, terms: Iterable[str]) -> np.ndarray:
+        """BM25 score of every row for the query terms (rows of removed resumes stay 0)"""
+        scores = np.zeros(len(self.ids), dtype=np.float64)
+        n = len(self.rows)
+        if not n:
+            return scores
+        if self._length_array is None:
+            self._length_array = np.asarray(self._lengths, dtype=np.float64)
+        average_length = max(self._total_length / n, 1e-9)
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            rows = np.fromiter(posting.keys(), dtype=np.int64, count=len(posting))
+            tf = np.fromiter(posting.values(), dtype=np.float64, count=len(posting))
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._length_array[rows] / average_length)
+            scores[rows] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def _top(self, scores: np.ndarray, size: int) -> List[Tuple[str, float]]:
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > size:
+            hits = hits[np.argpartition(-scores[hits], size - 1)[:size]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(self.ids[row], float(scores[row])) for row in hits]
+
+    def shortlists(self, jobs: Sequence[Dict[str, Any]], size: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        """Up to size (id, bm25) pairs per job, best first; resumes sharing no term with a job are left out"""
+        size = self.shortlist_size if size is None else size
+        with stage("lexical.search", jobs=len(jobs), docs=len(self.rows)):
+            queries = self._keywords([job_query(job) for job in jobs])
+            return [self._top(self.scores(terms), size) for terms in queries]
+
+    def shortlist(self, job: Dict[str, Any], size: Optional[int] = None) -> List[Tuple[str, float]]:
+        return self.shortlists([job], size)[0]
+
+    def rank(self, jobs: Sequence[Dict[str, Any]], size: Optional[int] = None, assignment: str = "greedy",
+             window: int = CHUNK_WINDOW, stride: int = CHUNK_STRIDE) -> List[List[Dict[str, Any]]]:
+        """Two-stage ranking: BM25 shortlist per job, then evaluator scoring of the shortlist only.
+
+        Each job gets a list of {"id", "lexical_score", "result"} sorted by the
+        result's final_score, where result is shaped like evaluator's output.
+        """
+        ranked = []
+        for job, shortlist in zip(jobs, self.shortlists(jobs, size)):
+            if not shortlist:
+                ranked.append([])
+                continue
+            scored = evaluator_many([self.resumes[resume_id] for resume_id, _ in shortlist], [job], assignment,
+                                    window=window, stride=stride)
+            entries = [
+                {"id": resume_id, "lexical_score": lexical_score, "result": row[0]}
+                for (resume_id, lexical_score), row in zip(shortlist, scored["results"])
+            ]
+            entries.sort(key=lambda entry: -entry["result"]["final_score"])
+            ranked.append(entries)
+        return ranked
+
+    def shortlist_recall(self, jobs: Sequence[Dict[str, Any]], sizes: Sequence[int] = RECALL_SIZES,
+                         top_k: int = 10, assignment: str = "greedy") -> Dict[int, float]:
+        """Mean share of each job's true top_k (full evaluator scoring of every resume) found in its shortlist.
+
+        Scores the whole index against every job, so run it on a sample of jobs.
+        """
+        ids = [resume_id for resume_id in self.ids if resume_id is not None]
+        full = evaluator_many([self.resumes[resume_id] for resume_id in ids], jobs, assignment)["scores"]
+        shortlists = self.shortlists(jobs, max(sizes))
+        recall = {size: [] for size in sizes}
+        for j, shortlist in enumerate(shortlists):
+            order = np.argsort(-full[:, j], kind="stable")[:top_k]
+            relevant = {ids[i] for i in order if full[i, j] > 0}
+            if not relevant:
+                continue
+            ranked = [resume_id for resume_id, _ in shortlist]
+            for size in sizes:
+                recall[size].append(len(relevant.intersection(ranked[:size])) / len(relevant))
+        return {size: float(np.mean(values)) if values else 1.0 for size, values in recall.items()}
+
+    def calibrate(self, jobs: Sequence[Dict[str, Any]], target_recall: float = 0.95, top_k: int = 10,
+                  sizes: Sequence[int] = RECALL_SIZES, assignment: str = "greedy") -> int:
+        """Set shortlist_size to the smallest size whose recall on jobs reaches target_recall"""
+        recall = self.shortlist_recall(jobs, sizes, top_k, assignment)
+        reached = [size for size in sorted(sizes) if recall[size] >= target_recall]
+        self.shortlist_size = reached[0] if reached else max(sizes)
+        return self.shortlist_size
@@ -0,0 +1,122 @@
+import argparse
+import json
+import random
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from evaluator import eval as scoring
+from evaluator.eval import evaluator_many, set_encoder
+from utils.embedding_backends import BACKENDS, DEFAULT_BACKEND
+from utils.embedding_cache import DEFAULT_MODEL, encode
+from utils.synthetic import synthetic_job, synthetic_resume
+
+
+def score_with_backend(resumes: List[Dict[str, Any]], jobs: List[Dict[str, Any]], backend: str,
+                       model_name: str = DEFAULT_MODEL, assignment: str = "greedy") -> Dict[str, Any]:
+    """evaluator_many with every embedding taken from the given backend"""
+    previous = scoring._encoder
+    set_encoder(lambda texts: encode(texts, model_name, backend=backend))
+    try:
+        return evaluator_many(resumes, jobs, assignment)
+    finally:
+        set_encoder(previous)
+
+
+def _top_k(scores: np.ndarray, k: int) -> List[set]:
+    k = min(k, scores.shape[0])
+    return [set(np.argsort(-scores[:, j], kind="stable")[:k].tolist()) for j in range(scores.shape[1])]
+
+
+def parity_check(resumes: List[Dict[str, Any]], jobs: List[Dict[str, Any]], backend: str,
+                 reference_backend: str = DEFAULT_BACKEND, model_name: str = DEFAULT_MODEL,
+                 assignment: str = "greedy", max_score_delta: float = 5.0,
+                 decision_threshold: Optional[float] = 50.0, top_k: int = 10) -> Dict[str, Any]:
+    """Compare a backend's scores and matched sets with the reference backend's.
+
+    The check passes when no pair's final score moves by more than
+    max_score_delta points and no pair crosses decision_threshold, i.e. no
+    shortlist/reject decision made at that cut-off would change.
+    """
+    reference = score_with_backend(resumes, jobs, reference_backend, model_name, assignment)
+    candidate = score_with_backend(resumes, jobs, backend, model_name, assignment)
+
+    delta = np.abs(candidate["scores"] - reference["scores"])
+    pairs = delta.size
+    same_skills = same_experience = 0
+    for ref_row, cand_row in zip(reference["results"], candidate["results"]):
+        for ref, cand in zip(ref_row, cand_row):
+            same_skills += set(ref["skills"]["matched_skills"]) == set(cand["skills"]["matched_skills"])
+            same_experience += (set(ref["experience"]["matched_experience"])
+                                == set(cand["experience"]["matched_experience"]))
+
+    flips = 0
+    if decision_threshold is not None:
+        flips = int(np.sum((reference["scores"] >= decision_threshold) != (candidate["scores"] >= decision_threshold)))
+
+    overlap = [len(a & b) / len(a) for a, b in zip(_top_k(reference["scores"], top_k),
+                                                   _top_k(candidate["scores"], top_k)) if a]
+    report = {
+        "backend": backend,
+        "reference_backend": reference_backend,
+        "pairs": pairs,
+        "max_score_delta": float(delta.max()) if pairs else 0.0,
+        "mean_score_delta": float(delta.mean()) if pairs else 0.0,
+        "matched_skills_agreement": same_skills / pairs if pairs else 1.0,
+        "matched_experience_agreement": same_experience / pairs if pairs else 1.0,
+        "decision_flips": flips,
+        "top_k_overlap": float(np.mean(overlap)) if overlap else 1.0
+    }
+    report["passed"] = report["max_score_delta"] <= max_score_delta and flips == 0
+    return report
+
+
+def verify_backend(resumes: List[Dict[str, Any]], jobs: List[Dict[str, Any]], backend: str, **kwargs) -> Dict[str, Any]:
+    """parity_check that raises instead of letting a drifting backend into service"""
+    report = parity_check(resumes, jobs, backend, **kwargs)
+    if not report["passed"]:
+        raise ValueError(f"Embedding backend {backend} failed the parity check: {json.dumps(report)}")
+    return report
+
+
+def _reference_set(path: Optional[str], count: int):
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data["resumes"], data["jobs"]
+    rng = random.Random(0)
+    resumes, jobs = [], []
+    for index in range(count):
+        size = ("small", "medium", "large")[index % 3]
+        lines, resume = synthetic_resume(rng, size)
+        resume["raw_text"] = "\n".join(lines)
+        resume["skills"] = {"technical_skills": [s for values in resume["skills"].values() for s in values],
+                            "soft_skills": []}
+        resumes.append(resume)
+        job = synthetic_job(rng, size)[1]
+        jobs.append({"requirements": job["requirements"]["required_skills"],
+                     "responsibilities": job["responsibilities"]})
+    return resumes, jobs
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check an embedding backend's scores against fp32")
+    arg_parser.add_argument("--backend", required=True, choices=list(BACKENDS))
+    arg_parser.add_argument("--reference-backend", default=DEFAULT_BACKEND, choices=list(BACKENDS))
+    arg_parser.add_argument("--reference", help='JSON file {"resumes": [...], "jobs": [...]}; synthetic pairs if omitted')
+    arg_parser.add_argument("--count", type=int, default=30, help="Synthetic resumes and jobs when no reference file")
+    arg_parser.add_argument("--model", default=DEFAULT_MODEL)
+    arg_parser.add_argument("--max-score-delta", type=float, default=5.0)
+    arg_parser.add_argument("--decision-threshold", type=float, default=50.0)
+    args = arg_parser.parse_args()
+
+    resumes, jobs = _reference_set(args.reference, args.count)
+    report = parity_check(resumes, jobs, args.backend, args.reference_backend, args.model,
+                          max_score_delta=args.max_score_delta, decision_threshold=args.decision_threshold)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
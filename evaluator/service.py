@@ -0,0 +1,264 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from evaluator.eval import evaluator, evaluator_many, set_encoder
+from utils.embedding_backends import BACKENDS, set_backend
+from utils.embedding_cache import DEFAULT_MODEL, encode, get_embedding_cache, model_key
+from utils.instrumentation import histograms, stage
+from utils.model_registry import registry
+
+# Embedding cache stats that only ever grow; the rest are current sizes
+CACHE_COUNTERS = ("hits", "disk_hits", "misses")
+
+
+class MicroBatcher:
+    """Coalesce concurrent encode calls into batches for one shared model.
+
+    A batch closes once it holds max_batch_size texts or max_wait_ms has passed
+    since its first request; its embeddings are then split back per caller.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def encode(self, texts: Union[str, Sequence[str]]) -> np.ndarray:
+        """Blocking encode with the same shapes as utils.embedding_cache.encode"""
+        if isinstance(texts, str):
+            return self.encode([texts])[0]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self.submit(texts).result()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            closing = False
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._flush(batch)
+            if closing:
+                return
+
+    def _flush(self, batch: List[Tuple[List[str], Future]]):
+        texts = [text for texts, _ in batch for text in texts]
+        self.requests += len(batch)
+        self.batches += 1
+        self.texts += len(texts)
+        try:
+            with stage("service.encode_batch", batch_size=len(texts), requests=len(batch)):
+                embeddings = np.asarray(self.encode_fn(texts))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        offset = 0
+        for texts, future in batch:
+            future.set_result(embeddings[offset:offset + len(texts)])
+            offset += len(texts)
+
+
+def _jsonable(value):
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ScoringService:
+    """Scores resumes against jobs with one model instance shared by all requests"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.model_name = model_name
+        self.batcher = MicroBatcher(lambda texts: encode(texts, model_name, batch_size=max_batch_size),
+                                    max_batch_size, max_wait_ms)
+        self.metrics = histograms()
+        set_encoder(self.batcher.encode)
+
+    def warmup(self) -> Dict[str, float]:
+        load_times = registry.warmup([model_key(self.model_name)])
+        self.batcher.encode(["warmup"])
+        return load_times
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "model": self.model_name,
+            "model_loaded": registry.is_loaded(model_key(self.model_name)),
+            "pending": self.batcher.pending()
+        }
+
+    def score(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """{"resume", "job"} for one pair, or {"resumes", "jobs"} for every pair"""
+        assignment = payload.get("assignment", "greedy")
+        if "resumes" in payload or "jobs" in payload:
+            return evaluator_many(payload.get("resumes", []), payload.get("jobs", []), assignment)
+        if "resume" not in payload or "job" not in payload:
+            raise ValueError("Expected 'resume' and 'job', or 'resumes' and 'jobs'")
+        return evaluator(payload["resume"], payload["job"], assignment)
+
+    def embed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise ValueError("Expected 'texts' as a list of strings")
+        return {"embeddings": self.batcher.encode(texts)}
+
+    def metrics_text(self) -> str:
+        cache = get_embedding_cache(self.model_name).stats()
+        lines = [
+            "# TYPE resumyay_batcher_requests_total counter",
+            f"resumyay_batcher_requests_total {self.batcher.requests}",
+            "# TYPE resumyay_batcher_batches_total counter",
+            f"resumyay_batcher_batches_total {self.batcher.batches}",
+            "# TYPE resumyay_batcher_texts_total counter",
+            f"resumyay_batcher_texts_total {self.batcher.texts}",
+            "# TYPE resumyay_batcher_pending gauge",
+            f"resumyay_batcher_pending {self.batcher.pending()}"
+        ]
+        for name, value in cache.items():
+            if name in CACHE_COUNTERS:
+                metric = f"resumyay_embedding_cache_{name}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            else:
+                metric = f"resumyay_embedding_cache_{name}"
+                lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        return "\n".join(lines) + "\n" + self.metrics.prometheus_text()
+
+    def close(self):
+        set_encoder(None)
+        self.batcher.close()
+
+    def handler(self):
+        service = self
+        routes = {
+            ("POST", "/score"): service.score,
+            ("POST", "/embed"): service.embed,
+            ("POST", "/warmup"): lambda payload: service.warmup(),
+            ("GET", "/health"): lambda payload: service.health()
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _route(self, method: str):
+                if method == "GET" and self.path == "/metrics":
+                    self._send(200, service.metrics_text().encode(), "text/plain; version=0.0.4")
+                    return
+                route = routes.get((method, self.path))
+                if route is None:
+                    self._send(404, b'{"error": "not found"}', "application/json")
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                    if not isinstance(payload, dict):
+                        raise ValueError("Expected a JSON object")
+                    with stage("service.request", chars=length):
+                        result = route(payload)
+                    status = 200
+                except (ValueError, KeyError, TypeError) as e:
+                    result, status = {"error": str(e)}, 400
+                except Exception as e:
+                    result, status = {"error": f"{type(e).__name__}: {e}"}, 500
+                self._send(status, json.dumps(result, default=_jsonable).encode(), "application/json")
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_POST(self):
+                self._route("POST")
+
+        return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, model_name: str = DEFAULT_MODEL,
+          max_batch_size: int = 64, max_wait_ms: float = 5.0, warmup: bool = False):
+    service = ScoringService(model_name, max_batch_size, max_wait_ms)
+    if warmup:
+        service.warmup()
+    server = ThreadingHTTPServer((host, port), service.handler())
+    server.daemon_threads = True
+    print(f"Scoring service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="HTTP resume scoring service with micro-batched encoding")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    arg_parser.add_argument("--model", default=DEFAULT_MODEL)
+    arg_parser.add_argument("--max-batch-size", type=int, default=64)
+    arg_parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    arg_parser.add_argument("--backend", choices=list(BACKENDS), help="Embedding backend (default fp32)")
+    arg_parser.add_argument("--warmup", action="store_true", help="Load the model before accepting requests")
+    args = arg_parser.parse_args()
+    if args.backend:
+        set_backend(args.backend)
+    serve(args.host, args.port, args.model, args.max_batch_size, args.max_wait_ms, args.warmup)
+
+
+if __name__ == "__main__":
+    main()
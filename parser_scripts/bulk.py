@@ -0,0 +1,172 @@
+import asyncio
+import functools
+import glob
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from parser_scripts.job_parse import JobDescriptionParser
+from parser_scripts.ollama_client import OllamaClient
+from parser_scripts.parse_cache import default_cache
+from parser_scripts.pdf_extract import BULK_MAX_CHARS, BULK_MAX_PAGES, extract_pdf_text, extract_pdf_text_split
+from parser_scripts.resume_parser import ResumeParser
+from utils.dedup import DedupParser, Deduplicator
+
+
+@dataclass
+class BulkResult:
+    index: int
+    path: str
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def iter_parse(paths: Iterable[str], extract: Callable[[str], str],
+                     parse: Callable[[str], Dict[str, Any]], concurrency: int = 4,
+                     extract_workers: int = 2, ordered: bool = False,
+                     extract_executor: Optional[Executor] = None) -> AsyncIterator[BulkResult]:
+    """Extract and parse documents with at most `concurrency` LLM requests in flight.
+
+    Extraction runs on its own pool and overlaps with in-flight LLM requests.
+    Bounded queues between the stages apply backpressure, and a failure in one
+    document is reported in its BulkResult without stopping the others.
+    """
+    paths = list(paths)
+    loop = asyncio.get_running_loop()
+    texts: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    owns_extract_pool = extract_executor is None
+    extract_pool = extract_executor or ThreadPoolExecutor(max_workers=extract_workers)
+    llm_pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def extract_one(index: int, path: str, slots: asyncio.Semaphore):
+        try:
+            text = await loop.run_in_executor(extract_pool, extract, path)
+            await texts.put((index, path, text, None))
+        except Exception as e:
+            await texts.put((index, path, None, e))
+        finally:
+            slots.release()
+
+    async def producer():
+        slots = asyncio.Semaphore(extract_workers)
+        tasks = []
+        for index, path in enumerate(paths):
+            await slots.acquire()
+            tasks.append(asyncio.create_task(extract_one(index, path, slots)))
+        await asyncio.gather(*tasks)
+        for _ in range(concurrency):
+            await texts.put(None)
+
+    async def worker():
+        while True:
+            item = await texts.get()
+            if item is None:
+                return
+            index, path, text, error = item
+            if error is None:
+                try:
+                    data = await loop.run_in_executor(llm_pool, parse, text)
+                    await results.put(BulkResult(index, path, data=data))
+                    continue
+                except Exception as e:
+                    error = e
+            await results.put(BulkResult(index, path, error=f"{type(error).__name__}: {error}"))
+
+    tasks = [asyncio.create_task(producer())] + [asyncio.create_task(worker()) for _ in range(concurrency)]
+    pending: Dict[int, BulkResult] = {}
+    next_index = 0
+    try:
+        for _ in range(len(paths)):
+            result = await results.get()
+            if not ordered:
+                yield result
+                continue
+            pending[result.index] = result
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if owns_extract_pool:
+            extract_pool.shutdown(wait=False, cancel_futures=True)
+        llm_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _list_files(path: str, pattern: str) -> List[str]:
+    if os.path.isfile(path):
+        return [path]
+    return sorted(glob.glob(os.path.join(path, pattern)))
+
+
+def _read_text(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+async def iter_parse_directory(path: str, parser: Optional[ResumeParser] = None, concurrency: int = 4,
+                               ordered: bool = False, pattern: str = "*.pdf",
+                               extract_workers: int = 2, processes: Optional[int] = None,
+                               dedup: Optional[Deduplicator] = None) -> AsyncIterator[BulkResult]:
+    """Async iterator of parsed resumes for every PDF under path.
+
+    With processes set, PDF extraction runs on a process pool of that size so it
+    does not hold the GIL alongside the LLM request threads, and long documents
+    are split into page ranges extracted in parallel. Without a parser, text is
+    capped at BULK_MAX_PAGES pages and BULK_MAX_CHARS characters. With dedup,
+    each group of duplicate resumes is parsed once.
+    """
+    parser = parser or ResumeParser(cache=default_cache(), client=OllamaClient.pooled(pool_size=concurrency),
+                                    max_pages=BULK_MAX_PAGES, max_chars=BULK_MAX_CHARS)
+    if dedup is not None:
+        parser = DedupParser(parser, dedup)
+    if not processes:
+        extract = functools.partial(extract_pdf_text, max_pages=parser.max_pages, max_chars=parser.max_chars)
+        async for result in iter_parse(_list_files(path, pattern), extract, parser.parse_text,
+                                       concurrency=concurrency, extract_workers=extract_workers,
+                                       ordered=ordered):
+            yield result
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # Extract threads only wait on the page-range tasks, so one per process keeps the pool busy
+        extract = functools.partial(extract_pdf_text_split, executor=pool, max_pages=parser.max_pages,
+                                    max_chars=parser.max_chars)
+        async for result in iter_parse(_list_files(path, pattern), extract, parser.parse_text,
+                                       concurrency=concurrency, extract_workers=processes,
+                                       ordered=ordered):
+            yield result
+
+
+def iter_parse_job_directory(path: str, parser: Optional[JobDescriptionParser] = None,
+                             concurrency: int = 4, ordered: bool = False,
+                             pattern: str = "*.txt", dedup: Optional[Deduplicator] = None
+                             ) -> AsyncIterator[BulkResult]:
+    """Async iterator of parsed job descriptions for every text file under path"""
+    parser = parser or JobDescriptionParser(cache=default_cache(),
+                                            client=OllamaClient.pooled(pool_size=concurrency))
+    if dedup is not None:
+        parser = DedupParser(parser, dedup)
+    return iter_parse(_list_files(path, pattern), _read_text, parser.parse_job_description,
+                      concurrency=concurrency, ordered=ordered)
+
+
+async def _collect(results: AsyncIterator[BulkResult]) -> List[BulkResult]:
+    return [result async for result in results]
+
+
+def parse_directory(path: str, concurrency: int = 4, ordered: bool = True, **kwargs) -> List[BulkResult]:
+    """Blocking wrapper around iter_parse_directory"""
+    return asyncio.run(_collect(iter_parse_directory(path, concurrency=concurrency, ordered=ordered, **kwargs)))
+
+
+def parse_job_directory(path: str, concurrency: int = 4, ordered: bool = True, **kwargs) -> List[BulkResult]:
+    """Blocking wrapper around iter_parse_job_directory"""
+    return asyncio.run(_collect(iter_parse_job_directory(path, concurrency=concurrency, ordered=ordered, **kwargs)))
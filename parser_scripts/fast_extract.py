@@ -0,0 +1,202 @@
+import re
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+from parser_scripts.resume_sections import heading_section
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<!\w)(?:\+?1[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}(?!\w)")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[A-Za-z0-9_-]+/?", re.IGNORECASE)
+GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9_-]+/?", re.IGNORECASE)
+URL_RE = re.compile(r"(?:https?://)?(?:www\.)?[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.(?:com|dev|io|me|net|org|app|site|tech)(?:/[^\s|,]*)?",
+                    re.IGNORECASE)
+SCHEME_URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+
+# Curated skill lexicon: canonical name -> resume skills category. Extend freely.
+SKILL_LEXICON = {
+    "programming_languages": [
+        "Python", "Java", "JavaScript", "TypeScript", "C", "C++", "C#", "Go", "Golang", "Rust", "Ruby",
+        "PHP", "Swift", "Kotlin", "Scala", "R", "MATLAB", "Perl", "Haskell", "Elixir", "Dart", "Lua",
+        "Objective-C", "Bash", "Shell", "PowerShell", "SQL", "HTML", "CSS", "Julia", "Fortran", "COBOL",
+        "Assembly", "Visual Basic", "F#", "Clojure", "Erlang", "Solidity", "VHDL", "Verilog"
+    ],
+    "frameworks_libraries": [
+        "React", "React Native", "Angular", "Vue.js", "Vue", "Svelte", "Next.js", "Nuxt.js", "Django",
+        "Flask", "FastAPI", "Spring", "Spring Boot", "Express.js", "Express", "Node.js", "Bootstrap",
+        "jQuery", "Tailwind CSS", "TensorFlow", "PyTorch", "Keras", "scikit-learn", "Pandas", "NumPy",
+        "SciPy", "Matplotlib", "Seaborn", "OpenCV", "Hugging Face", "Transformers", "LangChain",
+        "Ruby on Rails", "Rails", ".NET", "ASP.NET", "Laravel", "Symfony", "Flutter", "Redux",
+        "GraphQL", "Apollo", "Hibernate", "JUnit", "pytest", "Jest", "Mocha", "Selenium", "Cypress",
+        "Spark", "PySpark", "Hadoop", "Kafka", "Airflow", "Celery", "SQLAlchemy", "XGBoost", "LightGBM",
+        "spaCy", "NLTK", "Qt", "Unity", "Unreal Engine"
+    ],
+    "tools_technologies": [
+        "Git", "GitHub", "GitLab", "Bitbucket", "Docker", "Kubernetes", "Jenkins", "AWS", "Azure",
+        "Google Cloud", "GCP", "VS Code", "Visual Studio", "IntelliJ", "Eclipse", "PyCharm", "JIRA",
+        "Confluence", "Terraform", "Ansible", "Chef", "Puppet", "Linux", "Unix", "Nginx", "Apache",
+        "CircleCI", "Travis CI", "GitHub Actions", "Postman", "Figma", "Tableau", "Power BI", "Excel",
+        "Jupyter", "Vagrant", "Heroku", "Vercel", "Netlify", "Firebase", "Prometheus", "Grafana",
+        "Splunk", "Datadog", "Webpack", "Vite", "npm", "Yarn", "Maven", "Gradle", "CMake", "Slack",
+        "Trello", "Snowflake", "Databricks", "BigQuery", "Redshift", "EC2", "S3", "Lambda",
+        "CloudFormation", "Helm", "OpenShift", "RabbitMQ", "Ollama"
+    ],
+    "databases": [
+        "MySQL", "PostgreSQL", "Postgres", "MongoDB", "Redis", "Oracle", "SQL Server", "SQLite",
+        "MariaDB", "Cassandra", "DynamoDB", "Elasticsearch", "Neo4j", "CouchDB", "Firestore",
+        "Memcached", "InfluxDB", "Supabase", "CockroachDB", "HBase"
+    ],
+    "other_technical_skills": [
+        "Machine Learning", "Deep Learning", "Data Science", "Data Analysis", "Data Engineering",
+        "Natural Language Processing", "NLP", "Computer Vision", "DevOps", "MLOps", "Agile", "Scrum",
+        "Kanban", "CI/CD", "Microservices", "REST", "REST APIs", "RESTful APIs", "Cloud Computing",
+        "Distributed Systems", "Unit Testing", "Test-Driven Development", "TDD", "Object-Oriented Programming",
+        "OOP", "Data Structures", "Algorithms", "Statistics", "Big Data", "ETL", "Web Development",
+        "Mobile Development", "Cybersecurity", "Networking", "System Design", "Reinforcement Learning",
+        "Generative AI", "Large Language Models", "LLM", "Prompt Engineering", "A/B Testing"
+    ]
+}
+
+# Short or common-word skills only count when written with their canonical casing
+CASE_SENSITIVE_SKILLS = {"C", "R", "Go", "Rust", "Swift", "Spring", "Express", "Chef", "Puppet", "Unity",
+                         "Lambda", "Spark", "Excel", "Slack", "Shell", "Assembly", "REST", "Apache",
+                         "Vue", "Rails", "Qt", "S3", "Vite", "Yarn", "Helm"}
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher: one pass over the text finds every pattern"""
+
+    def __init__(self, patterns: Dict[str, Any]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, Any]]] = [[]]
+
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append((len(pattern), value))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0) if state else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, value) for every pattern occurrence in text"""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, value in self.output[state]:
+                yield index - length + 1, index + 1, value
+
+
+def _build_skill_matcher() -> AhoCorasick:
+    patterns = {}
+    for category, skills in SKILL_LEXICON.items():
+        for skill in skills:
+            patterns.setdefault(skill.lower(), (skill, category))
+    return AhoCorasick(patterns)
+
+
+SKILL_MATCHER = _build_skill_matcher()
+
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    # "Node.js." ends a sentence, "C++" must not be read as "C"
+    return not (before.isalnum() or before in "+#") and not (after.isalnum() or after in "+#")
+
+
+def extract_skills(text: str) -> Dict[str, List[str]]:
+    """Find lexicon skills in text, keeping the longest match at each position"""
+    # Blank out addresses so "github.com/jdoe" does not read as the skill GitHub
+    for pattern in (EMAIL_RE, LINKEDIN_RE, GITHUB_RE, SCHEME_URL_RE):
+        text = pattern.sub(lambda m: " " * len(m.group()), text)
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Keep offsets aligned with text when a character lowercases to several
+        lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+    matches = sorted(
+        ((start, end, value) for start, end, value in SKILL_MATCHER.iter_matches(lowered)
+         if _is_word_boundary(lowered, start, end)),
+        key=lambda m: (m[0], -(m[1] - m[0]))
+    )
+
+    skills: Dict[str, List[str]] = {category: [] for category in SKILL_LEXICON}
+    seen = set()
+    covered_until = 0
+    for start, end, (skill, category) in matches:
+        if start < covered_until:
+            continue
+        if skill in CASE_SENSITIVE_SKILLS and text[start:end] != skill:
+            continue
+        covered_until = end
+        if skill not in seen:
+            seen.add(skill)
+            skills[category].append(skill)
+    return skills
+
+
+def _guess_name(text: str) -> str:
+    for line in text.splitlines()[:5]:
+        line = line.strip()
+        if not line or heading_section(line):
+            continue
+        if EMAIL_RE.search(line) or PHONE_RE.search(line) or URL_RE.search(line):
+            continue
+        words = line.split()
+        if 1 < len(words) <= 4 and all(w[:1].isupper() and w.replace("-", "").replace(".", "").replace("'", "").isalpha()
+                                        for w in words):
+            return line
+        return ""
+    return ""
+
+
+def extract_contact(text: str) -> Dict[str, str]:
+    """Regex pass for name, email, phone and profile URLs"""
+    info = {"name": _guess_name(text)}
+
+    email = EMAIL_RE.search(text)
+    phone = PHONE_RE.search(text)
+    linkedin = LINKEDIN_RE.search(text)
+    github = GITHUB_RE.search(text)
+    info["email"] = email.group() if email else ""
+    info["phone"] = phone.group().strip() if phone else ""
+    info["linkedin"] = linkedin.group().rstrip("/") if linkedin else ""
+    info["github"] = github.group().rstrip("/") if github else ""
+
+    info["portfolio"] = ""
+    email_domain = info["email"].split("@")[-1].lower()
+    for match in URL_RE.finditer(text):
+        url = match.group()
+        lowered = url.lower()
+        if any(host in lowered for host in ("linkedin.com", "github.com")) or lowered == email_domain:
+            continue
+        if match.start() > 0 and text[match.start() - 1] == "@":
+            continue
+        info["portfolio"] = url
+        break
+
+    return {key: value for key, value in info.items() if value}
+
+
+def fast_extract(text: str) -> Dict[str, Any]:
+    """Best-effort resume structure from regexes and the skill lexicon, no LLM involved"""
+    return {
+        "personal_info": extract_contact(text),
+        "skills": extract_skills(text)
+    }
@@ -1,17 +1,46 @@
-from keybert import KeyBERT
-import re
+import itertools
 import json
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import PunktSentenceTokenizer
 
-nltk.download('stopwords')
-nltk.download('punkt')
-nltk.download('punkt_tab')
+import numpy as np
 
-stop_words = set(stopwords.words('english'))
-model = KeyBERT(model='all-MiniLM-L12-v2')
-tokenizer = PunktSentenceTokenizer()
+from utils.embedding_cache import encode
+from utils.model_registry import registry
+
+
+def _ensure_nltk_data(resource, package):
+    import nltk
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        nltk.download(package, quiet=True)
+
+
+def _load_stop_words():
+    from nltk.corpus import stopwords
+    _ensure_nltk_data('corpora/stopwords', 'stopwords')
+    return set(stopwords.words('english'))
+
+
+def _load_sentence_tokenizer():
+    from nltk.tokenize import PunktSentenceTokenizer
+    _ensure_nltk_data('tokenizers/punkt', 'punkt')
+    _ensure_nltk_data('tokenizers/punkt_tab', 'punkt_tab')
+    return PunktSentenceTokenizer()
+
+
+registry.register("nltk/stopwords", _load_stop_words)
+registry.register("nltk/punkt", _load_sentence_tokenizer)
+
+
+def __getattr__(name):
+    # Keep the old module-level globals working without loading them at import
+    lazy_globals = {
+        "stop_words": "nltk/stopwords",
+        "tokenizer": "nltk/punkt"
+    }
+    if name in lazy_globals:
+        return registry.get(lazy_globals[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def extract_sections(job_des):
     sections = {
@@ -20,39 +49,134 @@ def extract_sections(job_des):
     }
     job_des = job_des.lower()
 
-    responsibilities = re.search(r"(responsibilities:)(.*?)(requirements:|$)", job_des, re.DOTALL)
-    requirements = re.search(r"(requirements:)(.*)", job_des, re.DOTALL)
-
-    if responsibilities:
-        sections["responsibilities"] = responsibilities.group(2).strip()
-    if requirements:
-        sections["requirements"] = requirements.group(2).strip()
+    # Plain substring scans: responsibilities run up to the first "requirements:"
+    # after them, requirements run to the end of the text
+    start = job_des.find("responsibilities:")
+    if start != -1:
+        start += len("responsibilities:")
+        end = job_des.find("requirements:", start)
+        sections["responsibilities"] = job_des[start:end if end != -1 else len(job_des)].strip()
+    start = job_des.find("requirements:")
+    if start != -1:
+        sections["requirements"] = job_des[start + len("requirements:"):].strip()
 
     return sections
 
-def extract_keywords(txt, top_n = 10):
-    if not txt.strip():
+def _normalized(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+def _max_sum(doc_sim, candidate_sim, top_n, nr_candidates, block=20000):
+    """KeyBERT's max-sum selection with every combination scored in numpy blocks"""
+    if nr_candidates < top_n:
+        raise ValueError("nr_candidates must be at least top_n")
+    if top_n > len(doc_sim):
         return []
-    keywords = model.extract_keywords(
-        txt,
-        keyphrase_ngram_range=(1, 2),
-        stop_words='english',
-        use_maxsum=True,
-        top_n=top_n
-    )
-    return [kw[0] for kw in keywords]
+    pool = np.argsort(doc_sim, kind="stable")[-nr_candidates:]
+    pair_sim = candidate_sim[np.ix_(pool, pool)]
+    np.fill_diagonal(pair_sim, 0.0)
+    best, best_sum = None, np.inf
+    combinations = itertools.combinations(range(len(pool)), top_n)
+    while True:
+        chunk = np.array(list(itertools.islice(combinations, block)), dtype=np.int64)
+        if not len(chunk):
+            break
+        sums = pair_sim[chunk[:, :, None], chunk[:, None, :]].sum(axis=(1, 2))
+        i = int(np.argmin(sums))
+        if sums[i] < best_sum:
+            best, best_sum = chunk[i], sums[i]
+    return [int(pool[i]) for i in best]
+
+def _mmr(doc_sim, candidate_sim, top_n, diversity):
+    """Maximal marginal relevance: each pick trades relevance against similarity to earlier picks"""
+    selected = [int(np.argmax(doc_sim))]
+    remaining = np.ones(len(doc_sim), dtype=bool)
+    remaining[selected[0]] = False
+    closest = candidate_sim[:, selected[0]].copy()
+    for _ in range(min(top_n - 1, len(doc_sim) - 1)):
+        scores = np.where(remaining, (1 - diversity) * doc_sim - diversity * closest, -np.inf)
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        remaining[pick] = False
+        np.maximum(closest, candidate_sim[:, pick], out=closest)
+    return sorted(selected, key=lambda i: -doc_sim[i])
+
+def extract_keywords_many(docs, top_n=10, diversity="maxsum", ngram_range=(1, 2), nr_candidates=20,
+                          mmr_diversity=0.5):
+    """Keyphrases for many documents, with all candidates and documents embedded in shared batches.
+
+    diversity="maxsum" reproduces the KeyBERT use_maxsum selection; "mmr" and
+    "top_n" are much cheaper, since max-sum scores every top_n-sized combination
+    of the nr_candidates best phrases.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    if diversity not in ("maxsum", "mmr", "top_n"):
+        raise ValueError(f"Unknown diversity method: {diversity}")
+    docs = list(docs)
+    keywords = [[] for _ in docs]
+    present = [i for i, doc in enumerate(docs) if doc.strip()]
+    if not present:
+        return keywords
+    try:
+        vectorizer = CountVectorizer(ngram_range=ngram_range, stop_words="english").fit([docs[i] for i in present])
+    except ValueError:
+        # Only stop words: no candidates anywhere
+        return keywords
+    words = vectorizer.get_feature_names_out()
+    counts = vectorizer.transform([docs[i] for i in present]).tocsr()
+
+    used = np.unique(counts.indices)
+    word_emb = _normalized(encode(list(words[used])))
+    doc_emb = _normalized(encode([docs[i] for i in present]))
+    row_of = np.full(len(words), -1, dtype=np.int64)
+    row_of[used] = np.arange(len(used))
+
+    for row, i in enumerate(present):
+        candidates = counts.indices[counts.indptr[row]:counts.indptr[row + 1]]
+        if not len(candidates):
+            continue
+        candidates = np.sort(candidates)
+        emb = word_emb[row_of[candidates]]
+        doc_sim = emb @ doc_emb[row]
+        if diversity == "maxsum" and len(candidates) > 1:
+            picked = _max_sum(doc_sim, emb @ emb.T, top_n, nr_candidates)
+        elif diversity == "mmr" and len(candidates) > 1:
+            picked = _mmr(doc_sim, emb @ emb.T, top_n, mmr_diversity)
+        else:
+            picked = np.argsort(doc_sim, kind="stable")[-top_n:][::-1]
+        keywords[i] = [str(words[candidates[k]]) for k in picked]
+    return keywords
+
+def extract_keywords(txt, top_n = 10, diversity="maxsum"):
+    return extract_keywords_many([txt], top_n=top_n, diversity=diversity)[0]
 
 def extract_sentences(txt):
-    return [s.strip() for s in tokenizer.tokenize(txt) if s.strip()]
+    return [s.strip() for s in registry.get("nltk/punkt").tokenize(txt) if s.strip()]
+
+def _responsibilities(section):
+    return [s.lstrip("-•–—").strip().lower() for s in extract_sentences(section)]
 
-def job_parser(job_des):
+def parse_requirements(job_des, diversity="maxsum", top_n=10):
+    """The requirements list job_parser produces, without the responsibilities"""
+    return extract_keywords(extract_sections(job_des)["requirements"], top_n=top_n, diversity=diversity)
+
+def job_parser(job_des, diversity="maxsum"):
     sections = extract_sections(job_des)
-    responsibilities = extract_sentences(sections["responsibilities"])
-    responsibilities_json = [
-        s.lstrip("-•–—").strip().lower() for s in responsibilities
-    ]
     skills = {
-        "responsibilities" : responsibilities_json,
-        "requirements" : extract_keywords(sections["requirements"], top_n=10)
+        "responsibilities" : _responsibilities(sections["responsibilities"]),
+        "requirements" : parse_requirements(job_des, diversity=diversity)
     }
-    return json.dumps(skills, indent=2)
\ No newline at end of file
+    return json.dumps(skills, indent=2)
+
+def job_parser_many(job_descriptions, diversity="maxsum", top_n=10):
+    """Parse many postings at once; returns the dicts job_parser serialises, in input order"""
+    sections = [extract_sections(job_des) for job_des in job_descriptions]
+    requirements = extract_keywords_many([s["requirements"] for s in sections], top_n=top_n, diversity=diversity)
+    return [
+        {
+            "responsibilities" : _responsibilities(section["responsibilities"]),
+            "requirements" : keywords
+        }
+        for section, keywords in zip(sections, requirements)
+    ]
\ No newline at end of file
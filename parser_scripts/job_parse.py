@@ -1,26 +1,17 @@
 import requests
 import json
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence, Union
 
+from parser_scripts.json_schema import schema_from_example
+from parser_scripts.ollama_client import OllamaClient, SectionCallback, make_client
+from parser_scripts.parse_cache import ParseCache, cached_parse, default_cache
+from utils.dedup import Deduplicator
+from utils.instrumentation import ollama_fields, stage
 
-class JobDescriptionParser:
-    def __init__(self, ollama_url: str = "http://localhost:11434", model: str = "llama3.2:3b"):
-        self.ollama_url = ollama_url
-        self.model = model
-
-    def create_parsing_prompt(self, job_description: str) -> str:
-        """Create the AI prompt for job description parsing"""
-        return f"""
-You are an expert job description parser. Analyze this job description text and extract ALL relevant information. Read carefully and categorize everything properly.
 
-JOB DESCRIPTION TEXT:
-{job_description}
-
-Extract information and return ONLY a valid JSON object in this exact format:
-
-{{
-    "job_info": {{
+JOB_EXAMPLE = {
+    "job_info": {
         "title": "",
         "company": "",
         "location": "",
@@ -28,77 +19,118 @@ Extract information and return ONLY a valid JSON object in this exact format:
         "experience_level": "",
         "salary_range": "",
         "remote_option": ""
-    }},
+    },
     "job_summary": "",
     "responsibilities": [
         "responsibility 1",
         "responsibility 2"
     ],
-    "requirements": {{
+    "requirements": {
         "required_skills": [],
         "preferred_skills": [],
         "education": [],
         "experience_years": "",
         "certifications": []
-    }},
-    "technical_skills": {{
+    },
+    "technical_skills": {
         "programming_languages": [],
         "frameworks_libraries": [],
         "tools_technologies": [],
         "databases": [],
         "cloud_platforms": [],
         "other_technical": []
-    }},
+    },
     "soft_skills": [],
     "benefits": [],
-    "company_info": {{
+    "company_info": {
         "about_company": "",
         "company_size": "",
         "industry": ""
-    }}
-}}
+    }
+}
+
+
+class JobDescriptionParser:
+    # Bump whenever the prompt changes so cached parses are not reused
+    PROMPT_VERSION = "1"
+    GENERATION_OPTIONS = {
+        "temperature": 0.1,
+        "top_p": 0.9
+    }
+
+    def __init__(self, ollama_url: Union[str, Sequence[str]] = "http://localhost:11434",
+                 model: str = "llama3.2:3b",
+                 cache: Optional[ParseCache] = None, bypass_cache: bool = False,
+                 stream: bool = False, on_section: Optional[SectionCallback] = None,
+                 client: Optional[OllamaClient] = None, structured: bool = True):
+        self.ollama_url = ollama_url
+        self.model = model
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        self.stream = stream
+        self.on_section = on_section
+        self.client = client or make_client(ollama_url)
+        self.structured = structured
+
+    def create_parsing_prompt(self, job_description: str) -> str:
+        """Create the AI prompt for job description parsing"""
+        if self.structured:
+            output_format = "Extract information and return ONLY a valid JSON object following the provided schema."
+        else:
+            output_format = f"""Extract information and return ONLY a valid JSON object in this exact format:
+
+{json.dumps(JOB_EXAMPLE, indent=4)}"""
+        return f"""
+You are an expert job description parser. Analyze this job description text and extract ALL relevant information. Read carefully and categorize everything properly.
+
+JOB DESCRIPTION TEXT:
+{job_description}
+
+{output_format}
 
 EXTRACTION GUIDELINES:
 ... [prompt continues as-is with guidelines]
 """
 
     def parse_with_ai(self, job_description: str) -> Dict[str, Any]:
-        """Parse job description using AI"""
-        prompt = self.create_parsing_prompt(job_description)
+        """Parse job description using AI, reusing a cached result for identical input"""
+        version = self.PROMPT_VERSION + ("-schema" if self.structured else "")
+        key = ParseCache.make_key(self.model, version, job_description, self.GENERATION_OPTIONS)
+        return cached_parse(self.cache, key, lambda: self._parse_with_ai(job_description), self.bypass_cache)
+
+    def _parse_with_ai(self, job_description: str) -> Dict[str, Any]:
+        with stage("job.prompt") as span:
+            prompt = self.create_parsing_prompt(job_description)
+            span.set(chars=len(prompt))
 
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,
-                        "top_p": 0.9
-                    }
-                },
-                timeout=180
-            )
-
-            if response.status_code != 200:
-                raise ValueError(f"HTTP {response.status_code}: {response.text}")
-
-            result = response.json()
-            ai_response = result.get("response", "")
+            with stage("job.llm") as span:
+                result = self.client.generate(
+                    self.model,
+                    prompt,
+                    self.GENERATION_OPTIONS,
+                    timeout=180,
+                    stream=self.stream,
+                    on_section=self.on_section,
+                    format=schema_from_example(JOB_EXAMPLE) if self.structured else None
+                )
+                ai_response = result.get("response", "")
+                span.set(chars=len(ai_response), **ollama_fields(result))
 
             if not ai_response.strip():
                 raise ValueError("Empty response from AI")
 
-            parsed_data = self.extract_json_from_response(ai_response)
+            with stage("job.json_recovery"):
+                parsed_data = self.extract_json_from_response(ai_response)
 
             if not parsed_data:
                 raise ValueError("Failed to extract valid JSON from AI response")
 
-            return self.post_process_data(parsed_data)
+            with stage("job.post_process"):
+                return self.post_process_data(parsed_data)
 
         except requests.exceptions.RequestException as e:
-            raise ValueError(f"Failed to connect to Ollama: {e}")
+            raise ValueError(f"Ollama request failed: {e}") from e
 
     def extract_json_from_response(self, ai_response: str) -> Dict[str, Any]:
         """Extract JSON from AI response"""
@@ -195,15 +227,27 @@ EXTRACTION GUIDELINES:
         """Main parsing function"""
         if len(job_description.strip()) < 50:
             raise ValueError("Job description is too short")
-        return self.parse_with_ai(job_description)
+        with stage("job.parse", chars=len(job_description)):
+            return self.parse_with_ai(job_description)
 
 
 # API for external use
-def job_parser_from_text(job_description_text: str) -> Dict[str, Any]:
-    parser = JobDescriptionParser()
-    return parser.parse_job_description(job_description_text)
-
-
-def job_parser_from_file(file_path: str) -> Dict[str, Any]:
+def job_parser_from_text(job_description_text: str, use_cache: bool = True, dedup: Optional[Deduplicator] = None,
+                         ollama_url: Union[str, Sequence[str]] = "http://localhost:11434",
+                         client: Optional[OllamaClient] = None) -> Dict[str, Any]:
+    """Parse a job description; with dedup, reposts of postings it has seen reuse their parse.
+
+    A list of URLs shares one process-wide pool across calls; pass client to
+    use a client or pool of your own instead.
+    """
+    parser = JobDescriptionParser(ollama_url=ollama_url, cache=default_cache() if use_cache else None, client=client)
+    if dedup is None:
+        return parser.parse_job_description(job_description_text)
+    return dedup.run(job_description_text, parser.parse_job_description)
+
+
+def job_parser_from_file(file_path: str, use_cache: bool = True, dedup: Optional[Deduplicator] = None,
+                         ollama_url: Union[str, Sequence[str]] = "http://localhost:11434",
+                         client: Optional[OllamaClient] = None) -> Dict[str, Any]:
     with open(file_path, 'r', encoding='utf-8') as f:
-        return job_parser_from_text(f.read())
+        return job_parser_from_text(f.read(), use_cache, dedup, ollama_url, client)
@@ -0,0 +1,25 @@
+from typing import Any, Dict
+
+
+def schema_from_example(example: Any) -> Dict[str, Any]:
+    """Derive a JSON schema from an example/template value.
+
+    Dicts become closed objects with every key required, a list holding one
+    example item becomes an array of that item's schema, and empty lists or
+    lists of example strings become arrays of strings.
+    """
+    if isinstance(example, dict):
+        return {
+            "type": "object",
+            "properties": {key: schema_from_example(value) for key, value in example.items()},
+            "required": list(example),
+            "additionalProperties": False
+        }
+    if isinstance(example, list):
+        item = example[0] if example else ""
+        return {"type": "array", "items": schema_from_example(item)}
+    if isinstance(example, bool):
+        return {"type": "boolean"}
+    if isinstance(example, (int, float)):
+        return {"type": "number"}
+    return {"type": "string"}
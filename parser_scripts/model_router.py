@@ -0,0 +1,222 @@
+import re
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import requests
+
+from parser_scripts.fast_extract import EMAIL_RE, PHONE_RE, extract_skills
+from parser_scripts.ollama_client import make_client
+from parser_scripts.resume_parser import ResumeParser
+from parser_scripts.resume_sections import split_sections
+from utils.instrumentation import stage
+
+# Fastest first; the README's 1b/3b/7b trade-off
+DEFAULT_TIERS = ("llama3.2:1b", "llama3.2:3b", "llama3.2:7b")
+DEFAULT_THRESHOLD = 0.75
+
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+
+# Confidence lost per signal; confidence is 1 minus the sum, floored at 0
+PENALTIES = {
+    "invalid_type": 0.25,
+    "missing_name": 0.2,
+    "missing_email": 0.3,
+    "unknown_email": 0.15,
+    "missing_phone": 0.1,
+    "missing_experience": 0.3,
+    "experience_without_dates": 0.2,
+    "experience_without_title": 0.15,
+    "missing_education": 0.15,
+    "missing_skills": 0.25,
+    "skill_recall": 0.2
+}
+
+
+class Confidence(NamedTuple):
+    score: float
+    reasons: Dict[str, float]
+
+
+class RoutedParse(NamedTuple):
+    data: Dict[str, Any]
+    model: str
+    confidence: Confidence
+    tried: List[str]
+
+
+def _empty(value: Any) -> bool:
+    return not (value.strip() if isinstance(value, str) else value)
+
+
+def _share_missing(entries: List[Any], fields: Sequence[str]) -> float:
+    entries = [entry for entry in entries if isinstance(entry, dict)]
+    if not entries:
+        return 0.0
+    return sum(any(_empty(entry.get(field)) for field in fields) for entry in entries) / len(entries)
+
+
+def score_confidence(data: Dict[str, Any], text: str, template: Dict[str, Any]) -> Confidence:
+    """How complete and plausible a resume parse looks, judged against its own source text.
+
+    Fields only count as missing when the text shows they exist: an email
+    address, a phone number, an experience or education heading, years next
+    to experience entries, or skills the lexicon recognises.
+    """
+    reasons: Dict[str, float] = {}
+
+    def penalise(reason: str, weight: float = 1.0):
+        if weight > 0:
+            reasons[reason] = round(reasons.get(reason, 0.0) + PENALTIES[reason] * weight, 4)
+
+    for key, expected in template.items():
+        if key in data and not isinstance(data[key], type(expected)):
+            penalise("invalid_type")
+    personal_info = data.get("personal_info") if isinstance(data.get("personal_info"), dict) else {}
+    experience = data.get("experience") if isinstance(data.get("experience"), list) else []
+    education = data.get("education") if isinstance(data.get("education"), list) else []
+    skills = data.get("skills") if isinstance(data.get("skills"), dict) else {}
+
+    if _empty(personal_info.get("name")):
+        penalise("missing_name")
+    emails = {email.lower() for email in EMAIL_RE.findall(text)}
+    email = str(personal_info.get("email") or "").strip().lower()
+    if emails and not email:
+        penalise("missing_email")
+    elif email and email not in emails:
+        penalise("unknown_email")
+    if PHONE_RE.search(text) and _empty(personal_info.get("phone")):
+        penalise("missing_phone")
+
+    sections = split_sections(text)
+    if "experience" in sections and not experience:
+        penalise("missing_experience")
+    if "education" in sections and not education:
+        penalise("missing_education")
+    if experience and YEAR_RE.search(sections.get("experience", text)):
+        penalise("experience_without_dates", _share_missing(experience, ("start_date",)))
+    penalise("experience_without_title", _share_missing(experience, ("job_title", "company")))
+
+    found = {skill.lower() for values in extract_skills(text).values() for skill in values}
+    if len(found) >= 3:
+        parsed = {str(skill).lower() for values in skills.values() if isinstance(values, list) for skill in values}
+        if not parsed:
+            penalise("missing_skills")
+        else:
+            penalise("skill_recall", len(found - parsed) / len(found))
+
+    return Confidence(round(max(0.0, 1.0 - sum(reasons.values())), 4), reasons)
+
+
+def request_failure(error: BaseException) -> bool:
+    """Whether error, or one it was raised from or while handling, is a failed Ollama request.
+
+    Parsers wrap request errors in ValueError, and a pool may re-raise an
+    attempt's error from another thread, so the whole chain is checked.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, requests.exceptions.RequestException):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class ModelRouter:
+    """Parse resumes on the fastest model first and re-parse only low-confidence results on larger ones.
+
+    Each tier is a ResumeParser for one model, all sharing a client and
+    cache. A result is accepted when score_confidence reaches threshold; a
+    parse that fails outright (no recoverable JSON) counts as confidence 0.
+    When no tier is confident the most confident result is returned.
+    Drop-in for ResumeParser in bulk parsing and the pipeline runner.
+    """
+
+    def __init__(self, tiers: Sequence[str] = DEFAULT_TIERS, threshold: float = DEFAULT_THRESHOLD,
+                 **parser_options):
+        if not tiers:
+            raise ValueError("ModelRouter needs at least one model tier")
+        if "client" not in parser_options or parser_options["client"] is None:
+            parser_options["client"] = make_client(parser_options.pop("ollama_url", "http://localhost:11434"))
+        parser_options.pop("model", None)
+        self.tiers = list(tiers)
+        self.threshold = threshold
+        self.parsers = [ResumeParser(model=model, **parser_options) for model in self.tiers]
+        self.template = self.parsers[0].ensure_structure({})
+        self.documents = 0
+        self._stats = [{"attempts": 0, "accepted": 0, "escalated": 0, "failed": 0, "seconds": 0.0}
+                       for _ in self.tiers]
+        self._lock = threading.Lock()
+
+    @property
+    def max_pages(self) -> Optional[int]:
+        return self.parsers[0].max_pages
+
+    @property
+    def max_chars(self) -> Optional[int]:
+        return self.parsers[0].max_chars
+
+    def _record(self, tier: int, outcome: str, seconds: float):
+        with self._lock:
+            self._stats[tier]["attempts"] += 1
+            self._stats[tier][outcome] += 1
+            self._stats[tier]["seconds"] += seconds
+
+    def route(self, resume_text: str) -> RoutedParse:
+        """Parse text up the tiers until one result is confident enough"""
+        if len(resume_text.strip()) < 50:
+            raise ValueError("Extracted text is too short. PDF might be image-based or corrupted.")
+        best: Optional[RoutedParse] = None
+        error: Optional[Exception] = None
+        tried = []
+        for tier, parser in enumerate(self.parsers):
+            tried.append(parser.model)
+            started = time.perf_counter()
+            with stage("resume.route", tier=tier) as span:
+                try:
+                    data = parser.parse_text(resume_text)
+                except ValueError as e:
+                    if request_failure(e):
+                        # Ollama is unreachable, timed out or erroring, not the model being too small
+                        raise
+                    error = e
+                    confidence = Confidence(0.0, {"json_recovery": 1.0})
+                    data = None
+                else:
+                    confidence = score_confidence(data, resume_text, self.template)
+                span.set(confidence=confidence.score)
+            accepted = data is not None and confidence.score >= self.threshold
+            outcome = "accepted" if accepted else ("failed" if data is None else "escalated")
+            self._record(tier, outcome, time.perf_counter() - started)
+            if data is not None and (best is None or confidence.score > best.confidence.score):
+                best = RoutedParse(data, parser.model, confidence, list(tried))
+            if accepted:
+                break
+        with self._lock:
+            self.documents += 1
+        if best is None:
+            raise error or ValueError("No model tier produced a parse")
+        return best._replace(tried=tried)
+
+    def parse_text(self, resume_text: str) -> Dict[str, Any]:
+        return self.route(resume_text).data
+
+    def parse_resume(self, pdf_path: str) -> Dict[str, Any]:
+        return self.parse_text(self.parsers[0].extract_text_from_pdf(pdf_path))
+
+    def stats(self) -> Dict[str, Any]:
+        """Per tier: attempts, results accepted, hit_rate (accepted / attempts) and share of all documents"""
+        with self._lock:
+            documents = self.documents
+            tiers = []
+            for model, counts in zip(self.tiers, self._stats):
+                attempts = counts["attempts"]
+                tiers.append(dict(
+                    counts,
+                    model=model,
+                    hit_rate=counts["accepted"] / attempts if attempts else 0.0,
+                    share=counts["accepted"] / documents if documents else 0.0,
+                    mean_seconds=counts["seconds"] / attempts if attempts else 0.0
+                ))
+        return {"documents": documents, "threshold": self.threshold, "tiers": tiers}
@@ -0,0 +1,442 @@
+import atexit
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SectionCallback = Callable[[str, Any], None]
+
+
+class JsonStreamTracker:
+    """Track brace and string state of a JSON object arriving in chunks.
+
+    Text before the first ``{`` (e.g. a code fence) is ignored. Each completed
+    top-level ``"key": value`` pair is handed to on_section as soon as its value
+    closes, and ``complete`` flips once the outer object is closed.
+    """
+
+    def __init__(self, on_section: Optional[SectionCallback] = None):
+        self.on_section = on_section
+        self.parts = []
+        self.length = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+        self.section_start = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of model output; return True once the object is complete"""
+        for char in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                if char != "{":
+                    continue
+                self.started = True
+
+            self.parts.append(char)
+            self.length += 1
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    self.section_start = self.length
+            elif char in "}]":
+                if self.depth == 1:
+                    self._emit_section()
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+            elif char == "," and self.depth == 1:
+                self._emit_section()
+                self.section_start = self.length
+        return self.complete
+
+    def _emit_section(self):
+        if self.on_section is None or self.section_start is None:
+            return
+        text = self.text
+        segment = text[self.section_start:len(text) - 1].strip()
+        if not segment:
+            return
+        try:
+            section = json.loads("{" + segment + "}")
+        except json.JSONDecodeError:
+            return
+        for key, value in section.items():
+            self.on_section(key, value)
+
+
+def _raise_for_status(response: requests.Response):
+    # A RequestException, like a refused connection or a timeout: the server failed, not the model's output
+    if response.status_code != 200:
+        raise requests.exceptions.HTTPError(f"HTTP {response.status_code}: {response.text}", response=response)
+
+
+class OllamaClient:
+    """Thin wrapper around Ollama's /api/generate with optional streaming"""
+
+    def __init__(self, base_url: str = "http://localhost:11434",
+                 session: Optional[requests.Session] = None):
+        self.base_url = base_url
+        self.session = session or requests.Session()
+
+    @classmethod
+    def pooled(cls, base_url: str = "http://localhost:11434", pool_size: int = 8) -> "OllamaClient":
+        """Client whose session keeps up to pool_size keep-alive connections"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return cls(base_url, session)
+
+    def generate(self, model: str, prompt: str, options: Dict[str, Any], timeout: float,
+                 stream: bool = False, on_section: Optional[SectionCallback] = None,
+                 format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run a generation and return Ollama's final response object.
+
+        A JSON schema passed as format constrains decoding to that schema.
+        """
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options
+        }
+        if format is not None:
+            payload["format"] = format
+        if not stream:
+            response = self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=timeout)
+            _raise_for_status(response)
+            return response.json()
+        return self._generate_stream(payload, timeout, on_section)
+
+    def _generate_stream(self, payload: Dict[str, Any], timeout: float,
+                         on_section: Optional[SectionCallback]) -> Dict[str, Any]:
+        tracker = JsonStreamTracker(on_section)
+        tokens = []
+        result: Dict[str, Any] = {}
+
+        with self.session.post(f"{self.base_url}/api/generate", json=payload,
+                               timeout=timeout, stream=True) as response:
+            _raise_for_status(response)
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise ValueError(f"Ollama error: {chunk['error']}")
+                token = chunk.get("response", "")
+                tokens.append(token)
+                complete = tracker.feed(token)
+                if chunk.get("done"):
+                    result = chunk
+                    break
+                if complete:
+                    # Stop paying for chatter after the closing brace
+                    result = {"done": False, "done_reason": "json_complete"}
+                    break
+
+        result["response"] = tracker.text if tracker.complete else "".join(tokens)
+        result["eval_count"] = result.get("eval_count", len(tokens))
+        return result
+
+
+class Endpoint:
+    """One Ollama server in a pool, with its live load and health"""
+
+    def __init__(self, url: str, max_concurrency: int):
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.client = OllamaClient.pooled(url, pool_size=max_concurrency)
+        self.outstanding = 0
+        self.healthy = True
+        # Consecutive failures, and when an ejected endpoint may take a trial request
+        self.failures = 0
+        self.retry_at = 0.0
+        # Moving average of request seconds, None until the first success
+        self.latency: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+
+    def available(self, now: float) -> bool:
+        if not self.healthy:
+            # Half-open: one trial request at a time once the ejection period is over
+            return now >= self.retry_at and self.outstanding == 0
+        return self.outstanding < self.max_concurrency
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency": self.latency
+        }
+
+
+class OllamaPool:
+    """Spread generations over several Ollama servers; a drop-in for OllamaClient.
+
+    Each request goes to the endpoint with the fewest outstanding requests
+    relative to its cap ("least_outstanding"), or with the lowest expected
+    completion time from its latency average ("latency"). Endpoints are
+    ejected after eject_after consecutive failures or a failed /api/tags
+    health check and re-admitted when a check or trial request succeeds.
+    A request still running after the hedge delay (a fixed hedge_after, or
+    the hedge_quantile of recent latencies) is duplicated on another
+    endpoint and the first answer wins. Failed requests are retried on
+    other endpoints up to retries times.
+    """
+
+    def __init__(self, urls: Sequence[str], max_concurrency: int = 4, strategy: str = "least_outstanding",
+                 retries: int = 2, hedge: bool = True, hedge_after: Optional[float] = None,
+                 hedge_quantile: float = 0.95, eject_after: int = 3, eject_seconds: float = 30.0,
+                 health_interval: Optional[float] = 10.0, health_timeout: float = 2.0,
+                 latency_alpha: float = 0.2):
+        if not urls:
+            raise ValueError("OllamaPool needs at least one endpoint URL")
+        if strategy not in ("least_outstanding", "latency"):
+            raise ValueError(f"Unknown scheduling strategy: {strategy}")
+        self.endpoints = [Endpoint(url.rstrip("/"), max_concurrency) for url in urls]
+        self.strategy = strategy
+        self.retries = retries
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.health_timeout = health_timeout
+        self.latency_alpha = latency_alpha
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: deque = deque(maxlen=256)
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        # One thread per slot: attempts only start once they hold a slot
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency * len(self.endpoints),
+                                            thread_name_prefix="ollama-pool")
+        self._health_thread = None
+        if health_interval:
+            self._health_thread = threading.Thread(target=self._health_loop, args=(health_interval,),
+                                                   name="ollama-pool-health", daemon=True)
+            self._health_thread.start()
+
+    @property
+    def base_url(self) -> str:
+        return self.endpoints[0].url
+
+    # Scheduling
+
+    def _key(self, endpoint: Endpoint):
+        latency = endpoint.latency or 0.0
+        if self.strategy == "latency":
+            return ((endpoint.outstanding + 1) * latency, endpoint.outstanding / endpoint.max_concurrency)
+        return (endpoint.outstanding / endpoint.max_concurrency, latency)
+
+    def _acquire(self, tried: List[Endpoint], deadline: float, block: bool = True) -> Optional[Endpoint]:
+        """Reserve a slot on the best available endpoint, preferring ones this request has not tried"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                candidates = [e for e in self.endpoints if e.available(now)]
+                fresh = [e for e in candidates if e not in tried]
+                if fresh or (candidates and block and len(tried) >= len(self.endpoints)):
+                    endpoint = min(fresh or candidates, key=self._key)
+                    endpoint.outstanding += 1
+                    endpoint.requests += 1
+                    return endpoint
+                if not block or now >= deadline:
+                    return None
+                # Wake when a slot frees or the next ejected endpoint may be tried again
+                retry_at = [e.retry_at for e in self.endpoints if not e.healthy and e.retry_at > now]
+                self._cond.wait(min([deadline] + retry_at) - now)
+
+    def _release(self, endpoint: Endpoint, elapsed: float, error: Optional[BaseException]):
+        with self._cond:
+            endpoint.outstanding -= 1
+            if error is None:
+                endpoint.healthy = True
+                endpoint.failures = 0
+                if endpoint.latency is None:
+                    endpoint.latency = elapsed
+                else:
+                    endpoint.latency += self.latency_alpha * (elapsed - endpoint.latency)
+                self._latencies.append(elapsed)
+            else:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                if not endpoint.healthy or endpoint.failures >= self.eject_after:
+                    self._eject(endpoint)
+            self._cond.notify_all()
+
+    def _eject(self, endpoint: Endpoint):
+        endpoint.healthy = False
+        endpoint.retry_at = time.monotonic() + self.eject_seconds
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        with self._cond:
+            latencies = sorted(self._latencies)
+        if len(latencies) < 20:
+            return None
+        return latencies[min(len(latencies) - 1, int(self.hedge_quantile * len(latencies)))]
+
+    # Requests
+
+    def _attempt(self, endpoint: Endpoint, call: Callable[[OllamaClient], Dict[str, Any]]) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            result = call(endpoint.client)
+        except BaseException as e:
+            self._release(endpoint, time.monotonic() - started, e)
+            raise
+        self._release(endpoint, time.monotonic() - started, None)
+        return result
+
+    def _run(self, endpoint: Endpoint, call: Callable[[OllamaClient], Dict[str, Any]], hedgeable: bool,
+             tried: List[Endpoint], deadline: float) -> Dict[str, Any]:
+        primary = self._executor.submit(self._attempt, endpoint, call)
+        delay = self._hedge_delay() if hedgeable else None
+        if delay is None or wait([primary], timeout=delay).done:
+            return primary.result()
+        backup = self._acquire(tried, deadline, block=False)
+        if backup is None:
+            return primary.result()
+        tried.append(backup)
+        with self._cond:
+            self.hedges += 1
+        hedge = self._executor.submit(self._attempt, backup, call)
+        # The slower request keeps running and releases its slot when it ends
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._cond:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def generate(self, model: str, prompt: str, options: Dict[str, Any], timeout: float,
+                 stream: bool = False, on_section: Optional[SectionCallback] = None,
+                 format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """OllamaClient.generate on the pool; hedging is skipped when on_section would see duplicates"""
+        def call(client: OllamaClient) -> Dict[str, Any]:
+            return client.generate(model, prompt, options, timeout, stream=stream, on_section=on_section,
+                                   format=format)
+
+        deadline = time.monotonic() + timeout
+        tried: List[Endpoint] = []
+        error: Optional[BaseException] = None
+        for _ in range(self.retries + 1):
+            endpoint = self._acquire(tried, deadline)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            try:
+                return self._run(endpoint, call, on_section is None, tried, deadline)
+            except Exception as e:
+                error = e
+        if error is not None:
+            raise error
+        raise requests.exceptions.ConnectionError(f"No healthy Ollama endpoint among {len(self.endpoints)}")
+
+    # Health
+
+    def check(self, endpoint: Endpoint) -> bool:
+        """Probe /api/tags; eject the endpoint on failure, re-admit it on success"""
+        try:
+            ok = endpoint.client.session.get(f"{endpoint.url}/api/tags", timeout=self.health_timeout).status_code == 200
+        except requests.exceptions.RequestException:
+            ok = False
+        with self._cond:
+            if ok:
+                endpoint.healthy = True
+                endpoint.failures = 0
+            else:
+                self._eject(endpoint)
+            self._cond.notify_all()
+        return ok
+
+    def _health_loop(self, interval: float):
+        while not self._closed.wait(interval):
+            for endpoint in self.endpoints:
+                self.check(endpoint)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "endpoints": [endpoint.stats() for endpoint in self.endpoints]
+            }
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def close(self):
+        self._closed.set()
+        self._executor.shutdown(wait=False)
+
+
+# Pools shared by every make_client caller, keyed by endpoint URLs and pool options
+_pools: Dict[Tuple[Tuple[str, ...], Tuple[Tuple[str, Any], ...]], OllamaPool] = {}
+_pools_lock = threading.Lock()
+
+
+def make_client(ollama_url: Union[str, Sequence[str]], **pool_options) -> Union[OllamaClient, OllamaPool]:
+    """OllamaClient for one URL; for a list of them, the process-wide OllamaPool over those URLs.
+
+    Parsers built per call share one pool, so its load and latency state
+    carries over and its health thread is started once. Shared pools are
+    closed at exit; build an OllamaPool directly to own its lifetime.
+    """
+    if isinstance(ollama_url, str):
+        return OllamaClient(ollama_url)
+    key = (tuple(url.rstrip("/") for url in ollama_url), tuple(sorted(pool_options.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = _pools[key] = OllamaPool(list(ollama_url), **pool_options)
+        return pool
+
+
+@atexit.register
+def close_pools():
+    """Close every pool make_client has handed out"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
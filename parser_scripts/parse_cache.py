@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.embedding_cache import normalize_text
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "resumyay", "parse_cache.sqlite3")
+
+
+class ParseCache:
+    """Durable SQLite cache of post-processed LLM parse results"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 100_000,
+                 max_bytes: int = 512 * 1024 * 1024, max_age: float = 30 * 24 * 3600,
+                 evict_every: int = 100):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS parse_cache_accessed ON parse_cache (accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, text: str,
+                 options: Optional[Dict[str, Any]] = None) -> str:
+        """Hash of everything that determines the LLM output"""
+        payload = json.dumps({
+            "model": model,
+            "prompt_version": prompt_version,
+            "text": normalize_text(text),
+            "options": options or {}
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM parse_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                if row is not None:
+                    self._conn.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE parse_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, data: Dict[str, Any]):
+        value = json.dumps(data, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parse_cache (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now)
+            )
+            self._conn.commit()
+            self.writes += 1
+            if self.writes % self.evict_every == 0:
+                self._evict()
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM parse_cache WHERE created < ?", (time.time() - self.max_age,))
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_cache"
+        ).fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            # Drop least recently used entries until both limits hold
+            removed_count, removed_bytes = 0, 0
+            doomed = []
+            for key, size in self._conn.execute("SELECT key, size FROM parse_cache ORDER BY accessed"):
+                if count - removed_count <= self.max_entries and total - removed_bytes <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                removed_count += 1
+                removed_bytes += size
+            self._conn.executemany("DELETE FROM parse_cache WHERE key = ?", doomed)
+        self._conn.commit()
+
+    def evict(self):
+        """Apply the age, entry and size limits now"""
+        with self._lock:
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM parse_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ParseCache:
+    """Process-wide cache at RESUMYAY_PARSE_CACHE (default ~/.cache/resumyay)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache(os.environ.get("RESUMYAY_PARSE_CACHE", DEFAULT_CACHE_PATH))
+        return _default_cache
+
+
+def cached_parse(cache: Optional[ParseCache], key: str, parse, bypass: bool = False) -> Dict[str, Any]:
+    """Return the cached result for key, or run parse() and store its result"""
+    if cache is not None and not bypass:
+        data = cache.get(key)
+        if data is not None:
+            return data
+    data = parse()
+    if cache is not None:
+        cache.put(key, data)
+    return data
@@ -0,0 +1,283 @@
+import argparse
+import glob
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from evaluator.eval import resume_skills_of
+from parser_scripts.job_parse import JOB_EXAMPLE
+from parser_scripts.resume_parser import RESUME_EXAMPLE
+
+# Columns every store has besides the flattened template
+ID_COLUMN = "id"
+RAW_TEXT_COLUMN = "raw_text"
+# All lists under "skills" in one column, so the evaluator gets skills without walking categories
+SKILL_LIST_COLUMN = "skill_list"
+
+
+class Column(NamedTuple):
+    name: str
+    path: Tuple[str, ...]
+    item_path: Optional[Tuple[str, ...]]
+    is_list: bool
+
+    @property
+    def type(self) -> pa.DataType:
+        leaf = pa.list_(pa.string()) if self.is_list else pa.string()
+        return pa.list_(leaf) if self.item_path is not None else leaf
+
+
+class SkillLists(NamedTuple):
+    """Row i's skills are vocabulary[codes[offsets[i]:offsets[i + 1]]]"""
+    offsets: np.ndarray
+    codes: np.ndarray
+    vocabulary: List[str]
+
+
+def flat_columns(example: Dict[str, Any], path: Tuple[str, ...] = ()) -> List[Column]:
+    """Flatten a template: dict leaves become columns, lists of dicts become one list column per item leaf"""
+    columns = []
+    for key, value in example.items():
+        key_path = path + (key,)
+        if isinstance(value, dict):
+            columns.extend(flat_columns(value, key_path))
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            for item in flat_columns(value[0]):
+                columns.append(Column(".".join(key_path + item.path), key_path, item.path, item.is_list))
+        else:
+            columns.append(Column(".".join(key_path), key_path, None, isinstance(value, list)))
+    return columns
+
+
+def _get(obj: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        obj = obj.get(key) if isinstance(obj, dict) else None
+    return obj
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _texts(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [_text(v) for v in value]
+    return [value] if isinstance(value, str) and value else []
+
+
+def _set(obj: Dict[str, Any], path: Tuple[str, ...], value: Any):
+    for key in path[:-1]:
+        obj = obj.setdefault(key, {})
+    obj[path[-1]] = value
+
+
+def skill_list(record: Dict[str, Any]) -> List[str]:
+    """The skills evaluator scores for record, so the skill_list column matches evaluator(record)"""
+    return resume_skills_of(record)
+
+
+class ParsedStore:
+    """Append-only Parquet store of parsed documents, one typed column per template leaf.
+
+    Every append writes a new part file, so readers never see a partial batch.
+    Reads go through pyarrow.dataset, which prunes columns and pushes filters
+    down to row groups.
+    """
+
+    def __init__(self, directory: str, example: Dict[str, Any] = RESUME_EXAMPLE,
+                 row_group_size: int = 64 * 1024, compression: str = "zstd"):
+        self.directory = directory
+        self.columns = flat_columns(example)
+        self.has_skills = "skills" in example
+        self.row_group_size = row_group_size
+        self.compression = compression
+        fields = [pa.field(ID_COLUMN, pa.string()), pa.field(RAW_TEXT_COLUMN, pa.string())]
+        fields += [pa.field(column.name, column.type) for column in self.columns]
+        if self.has_skills:
+            fields.append(pa.field(SKILL_LIST_COLUMN, pa.list_(pa.string())))
+        self.schema = pa.schema(fields)
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def resumes(cls, directory: str, **kwargs) -> "ParsedStore":
+        return cls(directory, RESUME_EXAMPLE, **kwargs)
+
+    @classmethod
+    def jobs(cls, directory: str, **kwargs) -> "ParsedStore":
+        return cls(directory, JOB_EXAMPLE, **kwargs)
+
+    # Writing
+
+    def _column_values(self, column: Column, records: List[Dict[str, Any]]) -> List[Any]:
+        leaf = _texts if column.is_list else _text
+        if column.item_path is None:
+            return [leaf(_get(record, column.path)) for record in records]
+        values = []
+        for record in records:
+            items = _get(record, column.path)
+            items = [item for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+            values.append([leaf(_get(item, column.item_path)) for item in items])
+        return values
+
+    def to_table(self, records: Sequence[Dict[str, Any]], ids: Optional[Sequence[str]] = None) -> pa.Table:
+        records = list(records)
+        if ids is None:
+            ids = [_text(record.get(ID_COLUMN)) for record in records]
+        data = {
+            ID_COLUMN: [_text(i) for i in ids],
+            RAW_TEXT_COLUMN: [record.get(RAW_TEXT_COLUMN) for record in records]
+        }
+        for column in self.columns:
+            data[column.name] = self._column_values(column, records)
+        if self.has_skills:
+            data[SKILL_LIST_COLUMN] = [skill_list(record) for record in records]
+        return pa.Table.from_pydict(data, schema=self.schema)
+
+    def append(self, records: Sequence[Dict[str, Any]], ids: Optional[Sequence[str]] = None) -> str:
+        """Write one batch as a new part file and return its path"""
+        table = self.to_table(records, ids)
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        path = os.path.join(self.directory, name)
+        # Dot-prefixed files are ignored by pyarrow.dataset until the rename
+        tmp_path = os.path.join(self.directory, f".{name}.tmp")
+        pq.write_table(table, tmp_path, row_group_size=self.row_group_size, compression=self.compression)
+        os.replace(tmp_path, path)
+        return path
+
+    # Reading
+
+    def parts(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "part-*.parquet")))
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(self.parts(), format="parquet", schema=self.schema)
+
+    def expand_columns(self, columns: Optional[Iterable[str]]) -> Optional[List[str]]:
+        """Resolve "skills.*" or "skills" to every column under that prefix"""
+        if columns is None:
+            return None
+        names = self.schema.names
+        expanded = []
+        for column in columns:
+            prefix = column[:-2] if column.endswith(".*") else column
+            matches = [name for name in names if name == prefix or name.startswith(prefix + ".")]
+            if not matches:
+                raise ValueError(f"Unknown column: {column}")
+            expanded.extend(name for name in matches if name not in expanded)
+        return expanded
+
+    @staticmethod
+    def _filter(filter: Optional[pc.Expression], where: Optional[Dict[str, Any]]) -> Optional[pc.Expression]:
+        for name, value in (where or {}).items():
+            condition = pc.field(name).isin(value) if isinstance(value, (list, tuple, set)) else pc.field(name) == value
+            filter = condition if filter is None else filter & condition
+        return filter
+
+    def read(self, columns: Optional[Iterable[str]] = None, filter: Optional[pc.Expression] = None,
+             where: Optional[Dict[str, Any]] = None) -> pa.Table:
+        """Read only the requested columns of rows matching filter / where equality conditions"""
+        columns = self.expand_columns(columns)
+        if not self.parts():
+            return self.schema.empty_table().select(columns) if columns else self.schema.empty_table()
+        return self.dataset().to_table(columns=columns, filter=self._filter(filter, where))
+
+    def unflatten(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {}
+        for name in (ID_COLUMN, RAW_TEXT_COLUMN, SKILL_LIST_COLUMN):
+            if name in row:
+                record[name] = row[name]
+        for column in self.columns:
+            if column.name not in row:
+                continue
+            value = row[column.name]
+            if column.item_path is None:
+                _set(record, column.path, value)
+                continue
+            items = _get(record, column.path)
+            if not isinstance(items, list):
+                items = [{} for _ in value or []]
+                _set(record, column.path, items)
+            for item, item_value in zip(items, value or []):
+                _set(item, column.item_path, item_value)
+        return record
+
+    def records(self, columns: Optional[Iterable[str]] = None, filter: Optional[pc.Expression] = None,
+                where: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Nested dicts rebuilt from whichever columns were read, one batch at a time"""
+        columns = self.expand_columns(columns)
+        if not self.parts():
+            return
+        scanner = self.dataset().scanner(columns=columns, filter=self._filter(filter, where))
+        for batch in scanner.to_batches():
+            for row in batch.to_pylist():
+                yield self.unflatten(row)
+
+    def skill_lists(self, table: pa.Table) -> SkillLists:
+        """Skill lists of a table read with SKILL_LIST_COLUMN, as numpy views over the Arrow buffers"""
+        skills = table.column(SKILL_LIST_COLUMN).combine_chunks()
+        encoded = pc.dictionary_encode(skills.values)
+        return SkillLists(
+            offsets=skills.offsets.to_numpy(),
+            codes=encoded.indices.to_numpy(zero_copy_only=False),
+            vocabulary=encoded.dictionary.to_pylist()
+        )
+
+    def evaluator_inputs(self, filter: Optional[pc.Expression] = None,
+                         where: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], SkillLists]:
+        """Resumes for evaluator_many plus their skills, read together so rows line up"""
+        columns = [ID_COLUMN, RAW_TEXT_COLUMN, SKILL_LIST_COLUMN] + self.expand_columns(["experience"])
+        table = self.read(columns, filter, where)
+        rows = table.drop_columns([SKILL_LIST_COLUMN]).to_pylist()
+        resumes = []
+        for row in rows:
+            resume = self.unflatten(row)
+            resume[RAW_TEXT_COLUMN] = resume.get(RAW_TEXT_COLUMN) or ""
+            resumes.append(resume)
+        return resumes, self.skill_lists(table)
+
+    def __len__(self) -> int:
+        return self.dataset().count_rows() if self.parts() else 0
+
+
+def import_json(json_dir: str, store: ParsedStore, batch_size: int = 5000, pattern: str = "*.json") -> int:
+    """Append every JSON file under json_dir to the store, batch_size files per part"""
+    paths = sorted(glob.glob(os.path.join(json_dir, "**", pattern), recursive=True))
+    for start in range(0, len(paths), batch_size):
+        records, ids = [], []
+        for path in paths[start:start + batch_size]:
+            with open(path, "r", encoding="utf-8") as f:
+                records.append(json.load(f))
+            ids.append(os.path.relpath(path, json_dir))
+        store.append(records, ids)
+    return len(paths)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Import parsed JSON files into a Parquet store")
+    arg_parser.add_argument("json_dir")
+    arg_parser.add_argument("store_dir")
+    arg_parser.add_argument("--kind", choices=["resume", "job"], default="resume")
+    arg_parser.add_argument("--batch-size", type=int, default=5000)
+    args = arg_parser.parse_args()
+
+    store = ParsedStore.resumes(args.store_dir) if args.kind == "resume" else ParsedStore.jobs(args.store_dir)
+    count = import_json(args.json_dir, store, args.batch_size)
+    print(f"Imported {count} files into {args.store_dir} ({len(store)} rows)")
+
+
+if __name__ == "__main__":
+    main()
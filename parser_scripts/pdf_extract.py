@@ -0,0 +1,71 @@
+import mmap
+from concurrent.futures import Executor
+from typing import List, Optional, Tuple
+
+import PyPDF2
+
+# Default extraction budget for bulk runs: a resume longer than this is an outlier
+# (a thesis, a portfolio), and its tail only slows the parse down
+BULK_MAX_PAGES = 10
+BULK_MAX_CHARS = 40000
+PAGES_PER_TASK = 4
+
+
+def _page_texts(pdf_path: str, start: int = 0, stop: Optional[int] = None,
+                max_chars: Optional[int] = None) -> Tuple[List[str], int]:
+    """Extract pages [start, stop) through a read-only memory map; return (texts, page count)"""
+    with open(pdf_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pdf_reader = PyPDF2.PdfReader(mapped)
+            total = len(pdf_reader.pages)
+            stop = total if stop is None else min(stop, total)
+            texts = []
+            size = 0
+            for number in range(start, stop):
+                text = pdf_reader.pages[number].extract_text() or ""
+                texts.append(text)
+                size += len(text)
+                if max_chars is not None and size >= max_chars:
+                    break
+            return texts, total
+
+
+def _join(texts: List[str], max_chars: Optional[int]) -> str:
+    text = "\n".join(texts)
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text.strip()
+
+
+def extract_pdf_text(pdf_path: str, max_pages: Optional[int] = None,
+                     max_chars: Optional[int] = None) -> str:
+    """Extract a PDF's text, stopping after max_pages pages or max_chars characters"""
+    texts, _ = _page_texts(pdf_path, 0, max_pages, max_chars)
+    return _join(texts, max_chars)
+
+
+def _extract_range(args: Tuple[str, int, Optional[int], Optional[int]]) -> Tuple[List[str], int]:
+    pdf_path, start, stop, max_chars = args
+    return _page_texts(pdf_path, start, stop, max_chars)
+
+
+def extract_pdf_text_split(pdf_path: str, executor: Executor, max_pages: Optional[int] = None,
+                           max_chars: Optional[int] = None, pages_per_task: int = PAGES_PER_TASK) -> str:
+    """extract_pdf_text with the pages spread over executor (a process pool) in page-range tasks.
+
+    The first pages_per_task pages are one task, which also reports the page
+    count; the rest of the document, up to max_pages, is split into further
+    tasks that run in parallel and are joined once, in page order. Ranges
+    after the first only extract what is left of max_chars.
+    """
+    head_stop = pages_per_task if max_pages is None else min(pages_per_task, max_pages)
+    texts, total = executor.submit(_extract_range, (pdf_path, 0, head_stop, max_chars)).result()
+    remaining = None if max_chars is None else max_chars - sum(len(text) for text in texts)
+    limit = total if max_pages is None else min(total, max_pages)
+    if remaining is not None and remaining <= 0:
+        return _join(texts, max_chars)
+    tails = [executor.submit(_extract_range, (pdf_path, start, min(start + pages_per_task, limit), remaining))
+             for start in range(head_stop, limit, pages_per_task)]
+    for tail in tails:
+        texts += tail.result()[0]
+    return _join(texts, max_chars)
@@ -1,36 +1,24 @@
 import requests
+import copy
 import json
+import os
 import re
-import PyPDF2
 import sys
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Sequence, Union
 
-class ResumeParser:
-    def __init__(self, ollama_url: str = "http://localhost:11434", model: str = "llama3.2:3b"):
-        self.ollama_url = ollama_url
-        self.model = model
-        
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF file"""
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
-    
-    def create_parsing_prompt(self, resume_text: str) -> str:
-        """Create the AI prompt for resume parsing"""
-        return f"""
-You are an expert resume parser. Your job is to carefully read through this resume text and extract ALL information present. Read EVERY word carefully and don't miss anything.
+from parser_scripts.fast_extract import fast_extract
+from parser_scripts.json_schema import schema_from_example
+from parser_scripts.ollama_client import OllamaClient, SectionCallback, make_client
+from parser_scripts.pdf_extract import extract_pdf_text
+from parser_scripts.parse_cache import ParseCache, cached_parse, default_cache
+from parser_scripts.resume_sections import SECTION_FIELDS, split_sections
+from utils.dedup import Deduplicator
+from utils.instrumentation import ollama_fields, stage
 
-RESUME TEXT TO ANALYZE:
-{resume_text}
-
-Extract information and return ONLY a valid JSON object in this exact format:
-
-{{
-    "personal_info": {{
+# Example JSON shown to the model; list fields hold one example item
+RESUME_EXAMPLE = {
+    "personal_info": {
         "name": "",
         "email": "",
         "phone": "",
@@ -38,17 +26,17 @@ Extract information and return ONLY a valid JSON object in this exact format:
         "linkedin": "",
         "github": "",
         "portfolio": ""
-    }},
+    },
     "professional_summary": "",
-    "skills": {{
+    "skills": {
         "programming_languages": [],
         "frameworks_libraries": [],
         "tools_technologies": [],
         "databases": [],
         "other_technical_skills": []
-    }},
+    },
     "experience": [
-        {{
+        {
             "job_title": "",
             "company": "",
             "location": "",
@@ -56,95 +44,171 @@ Extract information and return ONLY a valid JSON object in this exact format:
             "end_date": "",
             "responsibilities": [],
             "achievements": []
-        }}
+        }
     ],
     "education": [
-        {{
+        {
             "degree": "",
             "field": "",
             "institution": "",
             "location": "",
             "graduation_date": "",
             "gpa": ""
-        }}
+        }
     ],
     "projects": [
-        {{
+        {
             "name": "",
             "description": "",
             "technologies": [],
             "github_link": "",
             "live_demo": ""
-        }}
+        }
     ],
     "certifications": [
-        {{
+        {
             "name": "",
             "issuer": "",
             "date": ""
-        }}
+        }
     ],
     "honors_achievements": [
-        {{
+        {
             "title": "",
             "description": "",
             "date": "",
             "issuer": ""
-        }}
+        }
     ]
-}}
-
-DETAILED EXTRACTION INSTRUCTIONS:
+}
 
-PERSONAL INFORMATION - Look for:
+# Extraction guide for each resume section, in prompt order
+RESUME_GUIDES = {
+    "contact": """PERSONAL INFORMATION - Look for:
 - Full name (usually at the top, might be in large font)
 - Email address (contains @ symbol)
 - Phone number (any format with numbers, parentheses, dashes)
 - Address/Location (city, state, zip code)
 - LinkedIn profile (linkedin.com/in/username or just username)
 - GitHub profile (github.com/username or just username)
-- Portfolio website or personal website
-
-SKILLS - Categorize carefully:
+- Portfolio website or personal website""",
+    "skills": """SKILLS - Categorize carefully:
 Programming Languages: Python, Java, JavaScript, C++, C#, Go, Ruby, PHP, Swift, Kotlin, Scala, R, MATLAB, etc.
 Frameworks/Libraries: React, Angular, Vue.js, Django, Flask, Spring Boot, Express.js, Node.js, Bootstrap, jQuery, TensorFlow, PyTorch, etc.
 Tools/Technologies: Git, Docker, Kubernetes, Jenkins, AWS, Azure, Google Cloud, VS Code, IntelliJ, Eclipse, JIRA, etc.
 Databases: MySQL, PostgreSQL, MongoDB, Redis, Oracle, SQL Server, SQLite, etc.
-Other Technical Skills: Machine Learning, Data Science, DevOps, Agile, Scrum, etc.
-
-EXPERIENCE - For each job:
+Other Technical Skills: Machine Learning, Data Science, DevOps, Agile, Scrum, etc.""",
+    "experience": """EXPERIENCE - For each job:
 - Job title exactly as written
 - Company name
 - Location (city, state)
 - Start date and end date (if current job, note "Present")
 - Bullet points describing responsibilities
-- Any achievements or accomplishments mentioned
-
-EDUCATION - For each degree:
+- Any achievements or accomplishments mentioned""",
+    "education": """EDUCATION - For each degree:
 - Degree type (Bachelor's, Master's, PhD, etc.)
 - Field of study/Major
 - School/University name
 - Location of school
 - Graduation date or date range
-- GPA if mentioned
-
-PROJECTS - Look for:
+- GPA if mentioned""",
+    "projects": """PROJECTS - Look for:
 - Project names
 - Project descriptions
 - Technologies/languages used
 - GitHub links or demo links
-- Both personal and professional projects
-
-CERTIFICATIONS - Find:
+- Both personal and professional projects""",
+    "certifications": """CERTIFICATIONS - Find:
 - Certificate names
 - Issuing organization
-- Date received or expiration date
-
-AWARDS/HONORS - Extract:
+- Date received or expiration date""",
+    "honors": """AWARDS/HONORS - Extract:
 - Award names
 - Descriptions
 - Dates received
-- Issuing organization
+- Issuing organization"""
+}
+
+class ResumeParser:
+    # Bump whenever the prompt changes so cached parses are not reused
+    PROMPT_VERSION = "1"
+    GENERATION_OPTIONS = {
+        "temperature": 0.1,
+        "top_p": 0.9
+    }
+
+    def __init__(self, ollama_url: Union[str, Sequence[str]] = "http://localhost:11434",
+                 model: str = "llama3.2:3b",
+                 cache: Optional[ParseCache] = None, bypass_cache: bool = False,
+                 stream: bool = False, on_section: Optional[SectionCallback] = None,
+                 client: Optional[OllamaClient] = None,
+                 max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                 section_split: bool = False, fast_path: Optional[str] = None,
+                 structured: bool = True):
+        self.ollama_url = ollama_url
+        self.model = model
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        self.stream = stream
+        self.on_section = on_section
+        self.client = client or make_client(ollama_url)
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.section_split = section_split
+        if fast_path not in (None, "prefill", "no_llm"):
+            raise ValueError(f"Unknown fast_path mode: {fast_path}")
+        self.fast_path = fast_path
+        self.structured = structured
+        
+    def prompt_version(self, mode: str = "") -> str:
+        """Cache version covering the prompt template and every option that changes it"""
+        parts = [self.PROMPT_VERSION, mode]
+        if self.fast_path == "prefill":
+            parts.append("prefill")
+        if self.structured:
+            parts.append("schema")
+        return "-".join(part for part in parts if part)
+
+    def extract_text_from_pdf(self, pdf_path: str) -> str:
+        """Extract text from PDF file, honouring the page cap and character budget"""
+        return extract_pdf_text(pdf_path, self.max_pages, self.max_chars)
+    
+    def prompt_example(self, prefilled: Optional[Dict[str, Any]] = None):
+        """Example JSON and extraction guides to request, minus fields already prefilled"""
+        example = copy.deepcopy(RESUME_EXAMPLE)
+        guides = dict(RESUME_GUIDES)
+        if prefilled:
+            for field in prefilled.get("personal_info", {}):
+                example["personal_info"].pop(field, None)
+            if any(prefilled.get("skills", {}).values()):
+                del example["skills"]
+                del guides["skills"]
+        return example, guides
+
+    def output_format(self, example: Dict[str, Any]) -> str:
+        """Prompt lines describing the expected JSON; the schema carries it when structured"""
+        if self.structured:
+            return "Extract information and return ONLY a valid JSON object following the provided schema."
+        return f"""Extract information and return ONLY a valid JSON object in this exact format:
+
+{json.dumps(example, indent=4)}"""
+
+    def create_parsing_prompt(self, resume_text: str, prefilled: Optional[Dict[str, Any]] = None) -> str:
+        """Create the AI prompt for resume parsing, leaving out fields already prefilled"""
+        example, guides = self.prompt_example(prefilled)
+        output_format = self.output_format(example)
+        guides = "\n\n".join(guides.values())
+        return f"""
+You are an expert resume parser. Your job is to carefully read through this resume text and extract ALL information present. Read EVERY word carefully and don't miss anything.
+
+RESUME TEXT TO ANALYZE:
+{resume_text}
+
+{output_format}
+
+DETAILED EXTRACTION INSTRUCTIONS:
+
+{guides}
 
 CRITICAL RULES:
 1. READ EVERY SINGLE WORD in the resume text
@@ -160,43 +224,112 @@ CRITICAL RULES:
 Be extremely thorough and don't miss any information!"""
 
     def parse_with_ai(self, resume_text: str) -> Dict[str, Any]:
-        """Parse resume text using AI"""
-        prompt = self.create_parsing_prompt(resume_text)
-        
+        """Parse resume text using AI, reusing a cached result for identical input"""
+        key = ParseCache.make_key(self.model, self.prompt_version(), resume_text, self.GENERATION_OPTIONS)
+        return cached_parse(self.cache, key, lambda: self._parse_with_ai(resume_text), self.bypass_cache)
+
+    def _parse_with_ai(self, resume_text: str) -> Dict[str, Any]:
+        prefilled = None
+        if self.fast_path == "prefill":
+            with stage("resume.fast_extract"):
+                prefilled = fast_extract(resume_text)
+        with stage("resume.prompt") as span:
+            prompt = self.create_parsing_prompt(resume_text, prefilled)
+            span.set(chars=len(prompt))
+        parsed_data = self.generate_json(prompt, self.prompt_example(prefilled)[0])
+        with stage("resume.post_process"):
+            if prefilled:
+                parsed_data = self.merge_prefilled(parsed_data, prefilled)
+            parsed_data = self.post_process_data(parsed_data)
+        return parsed_data
+
+    def merge_prefilled(self, data: Dict[str, Any], prefilled: Dict[str, Any]) -> Dict[str, Any]:
+        """Overlay rule-based fields onto the model output"""
+        personal_info = data.get("personal_info")
+        personal_info = dict(personal_info) if isinstance(personal_info, dict) else {}
+        personal_info.update(prefilled.get("personal_info", {}))
+        data["personal_info"] = personal_info
+        if any(prefilled.get("skills", {}).values()):
+            data["skills"] = prefilled["skills"]
+        return data
+
+    def generate_json(self, prompt: str, example: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run one prompt through the model and recover the JSON object it returns"""
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,
-                        "top_p": 0.9
-                    }
-                },
-                timeout=200
-            )
-            
-            if response.status_code != 200:
-                raise ValueError(f"HTTP {response.status_code}: {response.text}")
-            
-            result = response.json()
-            ai_response = result.get("response", "")
+            with stage("resume.llm") as span:
+                result = self.client.generate(
+                    self.model,
+                    prompt,
+                    self.GENERATION_OPTIONS,
+                    timeout=200,
+                    stream=self.stream,
+                    on_section=self.on_section,
+                    format=schema_from_example(example) if self.structured and example else None
+                )
+                ai_response = result.get("response", "")
+                span.set(chars=len(ai_response), **ollama_fields(result))
             
             if not ai_response.strip():
                 raise ValueError("Empty response from AI")
             
-            parsed_data = self.extract_json_from_response(ai_response)
+            with stage("resume.json_recovery"):
+                parsed_data = self.extract_json_from_response(ai_response)
             
             if not parsed_data:
                 raise ValueError("Failed to extract valid JSON from AI response")
             
-            parsed_data = self.post_process_data(parsed_data)
             return parsed_data
                 
         except requests.exceptions.RequestException as e:
-            raise ValueError(f"Failed to connect to Ollama: {e}")
+            raise ValueError(f"Ollama request failed: {e}") from e
+
+    def section_example(self, section: str) -> Dict[str, Any]:
+        return {field: RESUME_EXAMPLE[field] for field in SECTION_FIELDS[section]}
+
+    def create_section_prompt(self, section: str, section_text: str) -> str:
+        """Create a smaller prompt covering a single resume section"""
+        output_format = self.output_format(self.section_example(section))
+        return f"""
+You are an expert resume parser. Below is one section of a resume. Read EVERY word carefully and extract ALL information it contains.
+
+RESUME SECTION TO ANALYZE:
+{section_text}
+
+{output_format}
+
+DETAILED EXTRACTION INSTRUCTIONS:
+
+{RESUME_GUIDES[section]}
+
+Extract information EXACTLY as written. Return ONLY the JSON object, no explanation or additional text."""
+
+    def parse_sections_with_ai(self, resume_text: str) -> Dict[str, Any]:
+        """Parse each resume section with its own prompt, all sections concurrently"""
+        key = ParseCache.make_key(self.model, self.prompt_version("sections"), resume_text,
+                                  self.GENERATION_OPTIONS)
+        return cached_parse(self.cache, key, lambda: self._parse_sections_with_ai(resume_text),
+                            self.bypass_cache)
+
+    def _parse_sections_with_ai(self, resume_text: str) -> Dict[str, Any]:
+        sections = split_sections(resume_text)
+        if len(sections) < 2:
+            # No recognisable headings; one full prompt does better than one giant "section"
+            return self._parse_with_ai(resume_text)
+
+        with ThreadPoolExecutor(max_workers=len(sections)) as pool:
+            futures = {
+                section: pool.submit(self.generate_json, self.create_section_prompt(section, text),
+                                     self.section_example(section))
+                for section, text in sections.items()
+            }
+            merged = {}
+            for section, future in futures.items():
+                data = future.result()
+                for field in SECTION_FIELDS[section]:
+                    if field in data:
+                        merged[field] = data[field]
+
+        return self.post_process_data(merged)
     
     def extract_json_from_response(self, ai_response: str) -> Dict[str, Any]:
         """Extract JSON from AI response using multiple methods"""
@@ -306,13 +439,24 @@ Be extremely thorough and don't miss any information!"""
     
     def parse_resume(self, pdf_path: str) -> Dict[str, Any]:
         """Complete pipeline: PDF -> Text -> Parsed JSON"""
-        resume_text = self.extract_text_from_pdf(pdf_path)
-        
+        with stage("resume.pdf_extract") as span:
+            resume_text = self.extract_text_from_pdf(pdf_path)
+            span.set(bytes=os.path.getsize(pdf_path), chars=len(resume_text))
+        return self.parse_text(resume_text)
+
+    def parse_text(self, resume_text: str) -> Dict[str, Any]:
+        """Parse already extracted resume text"""
         if len(resume_text.strip()) < 50:
             raise ValueError("Extracted text is too short. PDF might be image-based or corrupted.")
         
-        parsed_data = self.parse_with_ai(resume_text)
-        return parsed_data
+        with stage("resume.parse", chars=len(resume_text)):
+            if self.fast_path == "no_llm":
+                # Triage mode: regexes and the skill lexicon only, no model call
+                return self.post_process_data(fast_extract(resume_text))
+            if self.section_split:
+                return self.parse_sections_with_ai(resume_text)
+            parsed_data = self.parse_with_ai(resume_text)
+            return parsed_data
 
 def main():
     if len(sys.argv) != 2:
@@ -320,7 +464,7 @@ def main():
         sys.exit(1)
     
     pdf_file = sys.argv[1]
-    parser = ResumeParser()
+    parser = ResumeParser(cache=default_cache())
     
     try:
         result = parser.parse_resume(pdf_file)
@@ -356,6 +500,15 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
 
-def parse_resume_file(pdf_path: str) -> Dict[str, Any]:
-    parser = ResumeParser()
-    return parser.parse_resume(pdf_path)
+def parse_resume_file(pdf_path: str, use_cache: bool = True, dedup: Optional[Deduplicator] = None,
+                      ollama_url: Union[str, Sequence[str]] = "http://localhost:11434",
+                      client: Optional[OllamaClient] = None) -> Dict[str, Any]:
+    """Parse a resume PDF; with dedup, near copies of resumes it has seen reuse their parse.
+
+    A list of URLs shares one process-wide pool across calls; pass client to
+    use a client or pool of your own instead.
+    """
+    parser = ResumeParser(ollama_url=ollama_url, cache=default_cache() if use_cache else None, client=client)
+    if dedup is None:
+        return parser.parse_resume(pdf_path)
+    return dedup.run(parser.extract_text_from_pdf(pdf_path), parser.parse_text)
@@ -0,0 +1,91 @@
+import re
+from typing import Dict
+
+# Top-level resume fields each section is responsible for
+SECTION_FIELDS = {
+    "contact": ["personal_info", "professional_summary"],
+    "skills": ["skills"],
+    "experience": ["experience"],
+    "education": ["education"],
+    "projects": ["projects"],
+    "certifications": ["certifications"],
+    "honors": ["honors_achievements"]
+}
+
+SECTION_HEADINGS = {
+    "contact": [
+        "contact", "contact information", "contact info", "personal information", "personal details",
+        "summary", "professional summary", "profile", "professional profile", "objective",
+        "career objective", "about", "about me"
+    ],
+    "skills": [
+        "skills", "technical skills", "core skills", "key skills", "core competencies", "competencies",
+        "technologies", "technical proficiencies", "skills and tools", "tools and technologies",
+        "skills and technologies"
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history", "internships",
+        "experience and internships"
+    ],
+    "education": [
+        "education", "academic background", "education and training", "academics", "qualifications",
+        "academic qualifications"
+    ],
+    "projects": [
+        "projects", "personal projects", "academic projects", "selected projects", "key projects",
+        "side projects", "project experience"
+    ],
+    "certifications": [
+        "certifications", "certificates", "certification", "licenses and certifications",
+        "certifications and licenses", "licenses", "courses and certifications"
+    ],
+    "honors": [
+        "honors", "awards", "honors and awards", "awards and honors", "achievements", "accomplishments",
+        "awards and achievements", "honors and achievements"
+    ]
+}
+
+
+def _normalize_heading(line: str) -> str:
+    line = line.lower().replace("&", " and ")
+    line = re.sub(r"[^a-z ]+", " ", line)
+    return " ".join(line.split())
+
+
+HEADING_LOOKUP = {
+    _normalize_heading(heading): section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+
+def heading_section(line: str) -> str:
+    """Return the section a heading line opens, or '' if the line is not a heading"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40:
+        return ""
+    return HEADING_LOOKUP.get(_normalize_heading(stripped), "")
+
+
+def split_sections(resume_text: str) -> Dict[str, str]:
+    """Split resume text into sections by recognising heading lines in one pass.
+
+    Text before the first heading is treated as contact information. Repeated
+    headings for the same section are concatenated.
+    """
+    sections: Dict[str, list] = {"contact": []}
+    current = "contact"
+    for line in resume_text.splitlines():
+        section = heading_section(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+
+    return {
+        section: "\n".join(lines).strip()
+        for section, lines in sections.items()
+        if "\n".join(lines).strip()
+    }
@@ -0,0 +1,223 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _jsonable(value):
+    # evaluator results hold matched skills as sets
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class Claim(NamedTuple):
+    id: str
+    path: str
+    stage: str
+    attempts: int
+
+
+class Ledger:
+    """Durable SQLite record of every document's pipeline stage, retries and stage outputs.
+
+    A document sits at one stage at a time: pending until a worker claims it,
+    running while claimed, and moved to the next stage only once that stage's
+    output is committed. After a crash, recover() puts running documents back
+    to pending, so a new run picks up exactly where the last one stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                updated REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outputs (
+                id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (id, stage)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_due ON documents (status, next_attempt)")
+        self._conn.commit()
+
+    def add(self, documents: Iterable[Tuple[str, str]], first_stage: str) -> int:
+        """Register (id, path) pairs at first_stage; ids already in the ledger keep their progress"""
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO documents (id, path, stage, status, updated) VALUES (?, ?, ?, ?, ?)",
+                [(doc_id, path, first_stage, PENDING, now) for doc_id, path in documents]
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def recover(self) -> int:
+        """Return documents left running by a crashed run to pending"""
+        with self._lock:
+            count = self._conn.execute(
+                "UPDATE documents SET status = ?, updated = ? WHERE status = ?", (PENDING, time.time(), RUNNING)
+            ).rowcount
+            self._conn.commit()
+            return count
+
+    def retry_failed(self, stages: Optional[Sequence[str]] = None) -> int:
+        """Give documents that ran out of attempts a fresh set, optionally only at some stages"""
+        query = "UPDATE documents SET status = ?, attempts = 0, next_attempt = 0, updated = ? WHERE status = ?"
+        params: List[Any] = [PENDING, time.time(), FAILED]
+        if stages:
+            query += f" AND stage IN ({', '.join('?' for _ in stages)})"
+            params += list(stages)
+        with self._lock:
+            count = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+            return count
+
+    def claim(self, limit: int, stages: Optional[Sequence[str]] = None) -> List[Claim]:
+        """Mark up to limit due pending documents running and return them, later stages first"""
+        now = time.time()
+        query = "SELECT id, path, stage, attempts FROM documents WHERE status = ? AND next_attempt <= ?"
+        params: List[Any] = [PENDING, now]
+        if stages:
+            query += f" AND stage IN ({', '.join('?' for _ in stages)})"
+            params += list(stages)
+            order = " ".join(f"WHEN ? THEN {rank}" for rank in range(len(stages)))
+            query += f" ORDER BY CASE stage {order} END DESC, rowid"
+            params += list(stages)
+        else:
+            query += " ORDER BY rowid"
+        query += " LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            claims = [Claim(*row) for row in self._conn.execute(query, params)]
+            self._conn.executemany(
+                "UPDATE documents SET status = ?, updated = ? WHERE id = ?",
+                [(RUNNING, now, claim.id) for claim in claims]
+            )
+            self._conn.commit()
+        return claims
+
+    def advance(self, doc_id: str, stage: str, output: Any, next_stage: Optional[str]):
+        """Commit a stage's output and move the document on (to done when next_stage is None)"""
+        self.advance_many([(doc_id, output)], stage, next_stage)
+
+    def advance_many(self, items: Sequence[Tuple[str, Any]], stage: str, next_stage: Optional[str]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO outputs (id, stage, value, created) VALUES (?, ?, ?, ?)",
+                [(doc_id, stage, json.dumps(output, ensure_ascii=False, default=_jsonable), now) for doc_id, output in items]
+            )
+            if next_stage is None:
+                self._conn.executemany(
+                    "UPDATE documents SET status = ?, attempts = 0, error = NULL, updated = ? WHERE id = ?",
+                    [(DONE, now, doc_id) for doc_id, _ in items]
+                )
+            else:
+                # Still claimed by this run: the next stage's worker already holds it
+                self._conn.executemany(
+                    "UPDATE documents SET stage = ?, attempts = 0, error = NULL, updated = ? WHERE id = ?",
+                    [(next_stage, now, doc_id) for doc_id, _ in items]
+                )
+            self._conn.commit()
+
+    def release(self, doc_ids: Iterable[str]):
+        """Hand claimed documents back as pending at their current stage"""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE documents SET status = ?, updated = ? WHERE id = ? AND status = ?",
+                [(PENDING, time.time(), doc_id, RUNNING) for doc_id in doc_ids]
+            )
+            self._conn.commit()
+
+    def fail(self, doc_id: str, error: str, max_attempts: int, backoff: float, max_backoff: float) -> bool:
+        """Record a failed attempt; reschedule with exponential backoff, or give up after max_attempts.
+
+        Returns True when the document will be retried.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM documents WHERE id = ?", (doc_id,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            retry = attempts < max_attempts
+            delay = min(backoff * 2 ** (attempts - 1), max_backoff)
+            self._conn.execute(
+                "UPDATE documents SET status = ?, attempts = ?, next_attempt = ?, error = ?, updated = ? WHERE id = ?",
+                (PENDING if retry else FAILED, attempts, now + delay if retry else 0, error, now, doc_id)
+            )
+            self._conn.commit()
+        return retry
+
+    def output(self, doc_id: str, stage: str) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM outputs WHERE id = ? AND stage = ?", (doc_id, stage)).fetchone()
+        if row is None:
+            raise KeyError(f"No {stage} output for {doc_id}")
+        return json.loads(row[0])
+
+    def outputs(self, stage: str) -> Iterator[Tuple[str, Any]]:
+        """(id, output) for every document that finished stage"""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, value FROM outputs WHERE stage = ? ORDER BY id", (stage,)).fetchall()
+        for doc_id, value in rows:
+            yield doc_id, json.loads(value)
+
+    def failures(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, path, stage, attempts, error FROM documents WHERE status = ? ORDER BY id", (FAILED,)
+            ).fetchall()
+        return [dict(zip(("id", "path", "stage", "attempts", "error"), row)) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Documents per "stage/status", plus "done" and "failed" totals"""
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, status, COUNT(*) FROM documents GROUP BY stage, status").fetchall()
+        counts: Dict[str, int] = {}
+        for stage, status, count in rows:
+            key = status if status == DONE else f"{stage}/{status}"
+            counts[key] = counts.get(key, 0) + count
+        counts.setdefault(DONE, 0)
+        counts[FAILED] = sum(count for stage, status, count in rows if status == FAILED)
+        return counts
+
+    def unfinished(self, stages: Optional[Sequence[str]] = None) -> Tuple[int, Optional[float]]:
+        """Documents still pending or running, and the earliest time a pending one is due"""
+        query = ("SELECT COUNT(*), MIN(CASE WHEN status = ? THEN next_attempt END) FROM documents "
+                 "WHERE status IN (?, ?)")
+        params: List[Any] = [PENDING, PENDING, RUNNING]
+        if stages:
+            query += f" AND stage IN ({', '.join('?' for _ in stages)})"
+            params += list(stages)
+        with self._lock:
+            count, due = self._conn.execute(query, params).fetchone()
+        return count, due
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,297 @@
+import argparse
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from evaluator.eval import evaluator_many
+from evaluator.incremental import scoring_job, scoring_resume
+from parser_scripts.job_parse import job_parser_from_file
+from parser_scripts.ollama_client import OllamaClient
+from parser_scripts.parse_cache import default_cache
+from parser_scripts.pdf_extract import BULK_MAX_CHARS, BULK_MAX_PAGES, extract_pdf_text, extract_pdf_text_split
+from parser_scripts.resume_parser import ResumeParser
+from pipeline.ledger import Claim, Ledger
+from utils.dedup import Deduplicator
+from utils.instrumentation import stage
+
+STAGES = ("extract", "parse", "score")
+
+# A claimed document plus the outputs of the stages it has already passed
+Item = Tuple[Claim, Dict[str, Any]]
+
+
+class PipelineRunner:
+    """Bulk extract -> parse -> score over a durable ledger.
+
+    Each stage is a pool of worker threads fed by a bounded queue, so a slow
+    stage holds the ones before it back instead of piling up work in memory.
+    Every stage output is committed to the ledger before the document moves
+    on; failures are retried with exponential backoff up to max_attempts.
+    Without jobs the pipeline stops after parsing. With a Deduplicator, each
+    group of duplicate resumes, including copies of ones parsed in earlier
+    runs on the same ledger, goes to the LLM once.
+    """
+
+    def __init__(self, ledger: Ledger, parser: Optional[ResumeParser] = None,
+                 jobs: Optional[Dict[str, Dict[str, Any]]] = None, extract_workers: int = 2,
+                 parse_workers: int = 4, score_batch_size: int = 32, queue_size: Optional[int] = None,
+                 max_attempts: int = 3, backoff: float = 5.0, max_backoff: float = 300.0,
+                 poll_interval: float = 0.2, processes: Optional[int] = None,
+                 dedup: Optional[Deduplicator] = None):
+        self.ledger = ledger
+        self.parser = parser or ResumeParser(cache=default_cache(), client=OllamaClient.pooled(pool_size=parse_workers),
+                                             max_pages=BULK_MAX_PAGES, max_chars=BULK_MAX_CHARS)
+        self.jobs = {job_id: scoring_job(job) for job_id, job in (jobs or {}).items()}
+        self.stages = STAGES if self.jobs else STAGES[:2]
+        self.workers = {"extract": extract_workers, "parse": parse_workers, "score": 1}
+        self.batch_sizes = {"extract": 1, "parse": 1, "score": score_batch_size}
+        self.queues: Dict[str, "queue.Queue[Optional[Item]]"] = {
+            name: queue.Queue(maxsize=queue_size or 2 * self.workers[name] * self.batch_sizes[name])
+            for name in self.stages
+        }
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.processes = processes
+        self.dedup = dedup
+        self._dedup_seeded = False
+        self._extract_pool: Optional[ProcessPoolExecutor] = None
+        self._stop = threading.Event()
+
+    def add_paths(self, paths: Sequence[str], root: Optional[str] = None) -> int:
+        """Register documents, keyed by path relative to root; returns how many were new"""
+        return self.ledger.add([(os.path.relpath(path, root) if root else path, path) for path in paths],
+                               self.stages[0])
+
+    def add_directory(self, path: str, pattern: str = "*.pdf") -> int:
+        return self.add_paths(sorted(glob.glob(os.path.join(path, "**", pattern), recursive=True)), path)
+
+    # Stages
+
+    def extract(self, claim: Claim, state: Dict[str, Any]) -> str:
+        if self._extract_pool is not None:
+            return extract_pdf_text_split(claim.path, self._extract_pool, self.parser.max_pages, self.parser.max_chars)
+        return extract_pdf_text(claim.path, self.parser.max_pages, self.parser.max_chars)
+
+    def parse(self, claim: Claim, state: Dict[str, Any]) -> Dict[str, Any]:
+        if self.dedup is not None:
+            return self.dedup.run(state["extract"], self.parser.parse_text)
+        return self.parser.parse_text(state["extract"])
+
+    def score(self, items: List[Item]) -> List[Dict[str, Any]]:
+        """One evaluator_many call for a batch of resumes against every job"""
+        job_ids = list(self.jobs)
+        resumes = [scoring_resume(state["parse"], state["extract"]) for _, state in items]
+        results = evaluator_many(resumes, [self.jobs[job_id] for job_id in job_ids])["results"]
+        return [dict(zip(job_ids, row)) for row in results]
+
+    def _run_stage(self, name: str, items: List[Item]) -> List[Tuple[Item, Any, Optional[Exception]]]:
+        if name == "score":
+            try:
+                return list(zip(items, self.score(items), [None] * len(items)))
+            except Exception as e:
+                if len(items) == 1:
+                    return [(items[0], None, e)]
+            # One bad resume fails the whole batch; score each on its own so only that one is charged
+            run: Callable[[Claim, Dict[str, Any]], Any] = lambda claim, state: self.score([(claim, state)])[0]
+        else:
+            run = getattr(self, name)
+        done = []
+        for item in items:
+            try:
+                done.append((item, run(*item), None))
+            except Exception as e:
+                done.append((item, None, e))
+        return done
+
+    # Workers
+
+    def _worker(self, name: str):
+        inbox = self.queues[name]
+        index = self.stages.index(name)
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        closing = False
+        while not closing:
+            item = inbox.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_sizes[name]:
+                try:
+                    item = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            if self._stop.is_set():
+                # Stopping: hand queued documents back untouched for the next run
+                self.ledger.release([claim.id for claim, _ in batch])
+                continue
+            with stage(f"pipeline.{name}", docs=len(batch)):
+                done = self._run_stage(name, batch)
+            succeeded = [(claim, state, output) for (claim, state), output, error in done if error is None]
+            for (claim, _), _, error in done:
+                if error is not None:
+                    self.ledger.fail(claim.id, f"{type(error).__name__}: {error}", self.max_attempts,
+                                     self.backoff, self.max_backoff)
+            if not succeeded:
+                continue
+            try:
+                self.ledger.advance_many([(claim.id, output) for claim, _, output in succeeded], name, next_stage)
+            except Exception as e:
+                # e.g. an output that cannot be stored; counts as a failed attempt like any other
+                for claim, _, _ in succeeded:
+                    self.ledger.fail(claim.id, f"{type(e).__name__}: {e}", self.max_attempts, self.backoff,
+                                     self.max_backoff)
+                continue
+            if next_stage is not None:
+                for claim, state, output in succeeded:
+                    self.queues[next_stage].put((claim._replace(stage=next_stage), dict(state, **{name: output})))
+
+    def _state(self, claim: Claim) -> Dict[str, Any]:
+        """Outputs of the stages a resumed document already finished, read back from the ledger"""
+        return {name: self.ledger.output(claim.id, name) for name in self.stages[:self.stages.index(claim.stage)]}
+
+    def _seed_dedup(self):
+        """Let resumes parsed by earlier runs on this ledger count as originals"""
+        if self.dedup is None or self._dedup_seeded:
+            return
+        for doc_id, parsed in self.ledger.outputs("parse"):
+            try:
+                self.dedup.remember(self.ledger.output(doc_id, "extract"), parsed)
+            except KeyError:
+                continue
+        self._dedup_seeded = True
+
+    def _feed(self):
+        while not self._stop.is_set():
+            claims = self.ledger.claim(max(q.maxsize for q in self.queues.values()), self.stages)
+            if not claims:
+                count, due = self.ledger.unfinished(self.stages)
+                if not count:
+                    break
+                # Everything left is in flight or waiting out a backoff
+                wait = self.poll_interval if due is None else min(max(due - time.time(), 0.0), self.poll_interval)
+                self._stop.wait(wait or self.poll_interval / 10)
+                continue
+            for claim in claims:
+                self.queues[claim.stage].put((claim, self._state(claim)))
+
+    def run(self) -> Dict[str, int]:
+        """Process every unfinished document in the ledger and return the ledger counts.
+
+        Assumes it is the only runner on this ledger: documents a previous run
+        left running are treated as interrupted and redone from their stage.
+        """
+        self._stop.clear()
+        self.ledger.recover()
+        self._seed_dedup()
+        if self.processes:
+            self._extract_pool = ProcessPoolExecutor(max_workers=self.processes)
+        threads = {
+            name: [threading.Thread(target=self._worker, args=(name,), name=f"pipeline-{name}-{i}", daemon=True)
+                   for i in range(self.workers[name])]
+            for name in self.stages
+        }
+        for pool in threads.values():
+            for thread in pool:
+                thread.start()
+        try:
+            self._feed()
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            # Close stages in order, so no worker is left putting into a queue nobody reads
+            for name in self.stages:
+                for _ in threads[name]:
+                    self.queues[name].put(None)
+                for thread in threads[name]:
+                    thread.join()
+            if self._extract_pool is not None:
+                self._extract_pool.shutdown()
+                self._extract_pool = None
+        return self.ledger.counts()
+
+    def stop(self):
+        """Finish the documents being worked on and return the rest to pending"""
+        self._stop.set()
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """Parsed resume and, when scored, per-job results for every finished document"""
+        results: Dict[str, Dict[str, Any]] = {}
+        for doc_id, parsed in self.ledger.outputs("parse"):
+            results[doc_id] = {"parsed": parsed}
+        if "score" in self.stages:
+            for doc_id, scores in self.ledger.outputs("score"):
+                results.setdefault(doc_id, {})["scores"] = scores
+        return results
+
+
+def load_jobs(path: str) -> Dict[str, Dict[str, Any]]:
+    """Jobs keyed by file name: .json files as already parsed, .txt files through the job parser"""
+    paths = [path] if os.path.isfile(path) else sorted(glob.glob(os.path.join(path, "*.txt")) +
+                                                       glob.glob(os.path.join(path, "*.json")))
+    jobs = {}
+    for job_path in paths:
+        if job_path.endswith(".json"):
+            with open(job_path, "r", encoding="utf-8") as f:
+                jobs[os.path.basename(job_path)] = json.load(f)
+        else:
+            jobs[os.path.basename(job_path)] = job_parser_from_file(job_path)
+    return jobs
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Resumable bulk PDF -> parse -> score pipeline")
+    arg_parser.add_argument("resumes", help="Directory of resume PDFs")
+    arg_parser.add_argument("--ledger", default="pipeline.sqlite3", help="SQLite job ledger; reuse it to resume a run")
+    arg_parser.add_argument("--jobs", help="Job description .txt/.json file or directory to score against")
+    arg_parser.add_argument("--pattern", default="*.pdf")
+    arg_parser.add_argument("--extract-workers", type=int, default=2)
+    arg_parser.add_argument("--parse-workers", type=int, default=4)
+    arg_parser.add_argument("--processes", type=int, help="Extract PDFs on a process pool of this size")
+    arg_parser.add_argument("--score-batch-size", type=int, default=32)
+    arg_parser.add_argument("--max-attempts", type=int, default=3)
+    arg_parser.add_argument("--backoff", type=float, default=5.0, help="Seconds before the first retry, doubling after")
+    arg_parser.add_argument("--retry-failed", action="store_true", help="Retry documents that failed in earlier runs")
+    arg_parser.add_argument("--export", help="Write parsed resumes and scores as JSON lines")
+    arg_parser.add_argument("--dedup-threshold", type=float,
+                            help="Parse near-duplicate resumes once: minimum shingle similarity, e.g. 0.9")
+    args = arg_parser.parse_args()
+
+    ledger = Ledger(args.ledger)
+    runner = PipelineRunner(ledger, jobs=load_jobs(args.jobs) if args.jobs else None,
+                            extract_workers=args.extract_workers, parse_workers=args.parse_workers,
+                            score_batch_size=args.score_batch_size, max_attempts=args.max_attempts,
+                            backoff=args.backoff, processes=args.processes,
+                            dedup=Deduplicator(args.dedup_threshold) if args.dedup_threshold else None)
+    added = runner.add_directory(args.resumes, args.pattern)
+    if args.retry_failed:
+        ledger.retry_failed()
+    print(f"Added {added} new documents")
+    counts = runner.run()
+    print(json.dumps(counts, indent=2))
+    if runner.dedup is not None:
+        dedup = runner.dedup.stats()
+        print(f"Duplicates: {dedup['exact']} exact, {dedup['near']} near of {dedup['documents']} parsed "
+              f"({dedup['dedup_ratio']:.1%} of LLM parses skipped)")
+    for failure in ledger.failures():
+        print(f"Failed at {failure['stage']} after {failure['attempts']} attempts: {failure['id']}: {failure['error']}")
+    if args.export:
+        with open(args.export, "w", encoding="utf-8") as f:
+            for doc_id, result in runner.results().items():
+                f.write(json.dumps(dict(result, id=doc_id), ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
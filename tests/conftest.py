@@ -0,0 +1,30 @@
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embedding_cache import DEFAULT_MODEL, model_key  # noqa: E402
+from utils.model_registry import registry  # noqa: E402
+
+DIM = 256
+
+
+class BagOfWordsModel:
+    """Stand-in sentence encoder: hashed bag of lowercased words, so equal texts score 1 and unrelated ones near 0"""
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, **kwargs):
+        vectors = np.zeros((len(sentences), DIM), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            for word in str(sentence).lower().split():
+                vectors[row, int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % DIM] += 1.0
+        return vectors
+
+
+@pytest.fixture
+def fake_model():
+    registry.register(model_key(DEFAULT_MODEL), BagOfWordsModel)
+    return registry.get(model_key(DEFAULT_MODEL))
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from evaluator.eval import assign_matches
+
+pytest.importorskip("scipy")
+
+
+def test_hungarian_prefers_more_matches_over_higher_similarity():
+    # Seven matches at 0.7 (the diagonal) against six perfect ones that leave the last requirement out
+    sim = np.zeros((7, 7), dtype=np.float32)
+    np.fill_diagonal(sim, 0.7)
+    for i in range(6):
+        sim[i, i + 1] = 1.0
+    pairs = assign_matches(sim, threshold=0.7, assignment="hungarian")
+    assert pairs == [(i, i) for i in range(7)]
+
+
+def test_hungarian_breaks_count_ties_by_similarity():
+    sim = np.array([[0.9, 0.75], [0.8, 0.0]], dtype=np.float32)
+    assert assign_matches(sim, 0.7, "hungarian") == [(0, 1), (1, 0)]
+    sim = np.array([[0.95, 0.75]], dtype=np.float32)
+    assert assign_matches(sim, 0.7, "hungarian") == [(0, 0)]
+
+
+def test_greedy_walks_requirements_in_order():
+    sim = np.array([[0.9, 0.8], [0.95, 0.0]], dtype=np.float32)
+    assert assign_matches(sim, 0.7, "greedy") == [(0, 0)]
+
+
+def test_unknown_assignment_mode():
+    with pytest.raises(ValueError):
+        assign_matches(np.ones((1, 1)), 0.7, "random")
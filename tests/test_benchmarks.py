@@ -0,0 +1,29 @@
+import json
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.run import run_worker
+from evaluator.eval import evaluator
+from evaluator.incremental import scoring_job, scoring_resume
+
+
+def test_corpus_pairs_share_skills(tmp_path, fake_model):
+    manifest = generate_corpus(str(tmp_path), count=4, sizes=["small", "medium"])
+    for entry in manifest.values():
+        for resume, job in zip(entry["resumes"], entry["jobs"]):
+            result = evaluator(scoring_resume(resume["data"], resume["text"]), scoring_job(job["data"]))
+            assert result["skills"]["matched_skills"]
+            assert result["components"]["skill_match_score"] > 0
+
+
+def test_scenarios_run_against_fake_ollama_on_a_free_port(tmp_path, fake_model):
+    generate_corpus(str(tmp_path), count=2, sizes=["small"])
+    manifest_path = str(tmp_path / "manifest.json")
+    with FakeOllama(port=0) as fake:
+        assert not fake.url.endswith(":11434")
+        for scenario in ("parse_resume", "parse_job", "evaluator", "end_to_end"):
+            raw = run_worker(scenario, manifest_path, "small", docs=2, warmup=0, ollama_url=fake.url)
+            assert len(raw["latencies"]) == 2
+        assert fake.requests >= 6
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        assert json.load(f)["small"]["resumes"][0]["text"]
@@ -0,0 +1,126 @@
+import os
+import random
+import threading
+
+import pytest
+
+from conftest import DIM
+from evaluator.candidate_index import FIELDS, CandidateIndex, IVFBackend
+
+TOPICS = {
+    "backend": ["python", "django", "postgres", "docker", "kafka", "redis"],
+    "frontend": ["react", "typescript", "css", "graphql", "webpack", "figma"],
+    "data": ["spark", "airflow", "pandas", "sql", "dbt", "snowflake"],
+    "devops": ["kubernetes", "terraform", "aws", "prometheus", "ansible", "linux"],
+}
+
+
+def resume(topic, rng=None):
+    words = TOPICS[topic]
+    if rng:
+        words = rng.sample(words, 4)
+    return {"raw_text": f"engineer working with {' '.join(words)}",
+            "experience": [{"description": f"built systems in {words[0]} and {words[1]}"}],
+            "skills": {"tools": list(words)}}
+
+
+def job(topic):
+    words = TOPICS[topic]
+    return {"responsibilities": [f"build systems in {words[0]} and {words[1]}"], "requirements": words[:3]}
+
+
+@pytest.fixture
+def index(fake_model, tmp_path):
+    index = CandidateIndex(str(tmp_path / "index"))
+    index.add({f"{topic}-{n}": resume(topic) for topic in TOPICS for n in range(2)})
+    return index
+
+
+def test_search_ranks_matching_candidates_first(index):
+    assert index.dim == DIM
+    assert index.vectors.shape[1] == DIM * len(FIELDS)
+    hits = index.search(job("data"), k=3)
+    assert {resume_id for resume_id, _ in hits[:2]} == {"data-0", "data-1"}
+    assert hits[0][1] >= hits[1][1] >= hits[2][1]
+    assert index.search(job("data"), k=0) == []
+
+
+def test_add_replaces_and_remove_tombstones(index):
+    index.add({"data-0": resume("frontend")})
+    assert len(index) == 8 and index.count == 9
+    assert [resume_id for resume_id, _ in index.search(job("data"), k=1)] == ["data-1"]
+
+    index.remove(["data-1", "unknown"])
+    assert "data-1" not in index and len(index) == 7
+    assert all(resume_id != "data-1" for resume_id, _ in index.search(job("data"), k=8))
+
+
+def test_compact_and_reopen_keep_results(index, fake_model):
+    index.remove(["backend-0", "devops-1"])
+    before = index.search(job("devops"), k=6)
+    size = os.path.getsize(index.vectors_path)
+
+    reopened = CandidateIndex(index.directory)
+    assert len(reopened) == 6 and reopened.dim == DIM
+    assert reopened.search(job("devops"), k=6) == before
+
+    reopened.compact()
+    assert reopened.count == 6 and os.path.getsize(reopened.vectors_path) < size
+    assert reopened.search(job("devops"), k=6) == before
+    assert CandidateIndex(index.directory).search(job("devops"), k=6) == before
+
+
+def test_dimension_mismatch_is_rejected(index, tmp_path):
+    with pytest.raises(ValueError):
+        CandidateIndex(str(tmp_path / "pinned"), dim=384).add({"a": resume("data")})
+    # An index built with another model is not written to or queried with this one
+    index.dim = 384
+    with pytest.raises(ValueError):
+        index.add({"a": resume("data")})
+    with pytest.raises(ValueError):
+        index.search(job("data"))
+    assert "a" not in index
+
+
+def test_ivf_with_every_list_probed_matches_exact(fake_model, tmp_path):
+    rng = random.Random(0)
+    resumes = {f"r{n}": resume(rng.choice(list(TOPICS)), rng) for n in range(300)}
+    exact = CandidateIndex(str(tmp_path / "exact"))
+    exact.add(resumes)
+    ivf = CandidateIndex(str(tmp_path / "ivf"), backend=IVFBackend(nlist=8, nprobe=8, min_train_size=100))
+    ivf.add(resumes)
+    assert ivf.backend.centroids is not None
+    assert sum(len(rows) for rows in ivf.backend.lists) == 300
+
+    for topic in TOPICS:
+        assert ivf.search(job(topic), k=10) == exact.search(job(topic), k=10)
+
+    # Reopened with the saved centroids, probing fewer lists still finds the best score for a clear query
+    narrow = CandidateIndex(ivf.directory, backend=IVFBackend(nlist=8, nprobe=2))
+    assert narrow.backend.centroids is not None
+    for topic in TOPICS:
+        hits = narrow.search(job(topic), k=5)
+        assert hits and hits[0][1] == pytest.approx(exact.search(job(topic), k=1)[0][1])
+
+
+def test_concurrent_writers_and_readers(index):
+    errors = []
+
+    def write(worker):
+        try:
+            for n in range(10):
+                index.add({f"w{worker}-{n}": resume("backend")})
+                index.remove([f"w{worker}-{n - 1}"])
+                index.search(job("backend"), k=5)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(index) == 8 + 4 and index.count == 8 + 40
+    assert sorted(CandidateIndex(index.directory).rows) == sorted(index.rows)
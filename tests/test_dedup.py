@@ -0,0 +1,150 @@
+import random
+import threading
+import time
+
+import pytest
+
+from utils.dedup import DedupParser, Deduplicator, DuplicateIndex, lsh_bands, shingles
+
+WORDS = ("python docker kubernetes pipelines services clusters built shipped wrote ran data team led "
+         "migrated latency reduced monitoring backend api design review").split()
+
+
+def document(seed, length=200):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def near_copy(text, edits=3):
+    words = text.split()
+    for position in range(0, len(words), len(words) // edits)[:edits]:
+        words[position] = "changed"
+    return " ".join(words)
+
+
+def test_shingles_normalize_case_and_whitespace():
+    assert shingles("A b  C d", size=2) == ["a b", "b c", "c d"]
+    assert shingles("short text", size=5) == ["short text"]
+
+
+def test_lsh_bands_fit_the_permutations():
+    bands, rows = lsh_bands(0.9, 128)
+    assert bands * rows <= 128
+    # A looser threshold lets texts collide on shorter bands
+    assert lsh_bands(0.5, 128)[1] < rows
+
+
+def test_index_exact_near_and_remove():
+    index = DuplicateIndex(threshold=0.8)
+    original, other = document(1), document(2)
+    index.add("original", original)
+    index.add("other", other)
+
+    exact = index.query("  " + original.replace(" ", "\n") + " ")
+    assert exact.key == "original" and exact.exact and exact.similarity == 1.0
+    near = index.query(near_copy(original))
+    assert near.key == "original" and not near.exact and 0.8 <= near.similarity < 1.0
+    assert index.query(document(3)) is None
+
+    index.remove("original")
+    assert "original" not in index and len(index) == 1
+    assert index.query(original) is None
+    assert all(key == "other" for buckets in index._buckets for bucket in buckets.values() for key in bucket)
+
+
+def test_index_rejects_bad_threshold():
+    with pytest.raises(ValueError):
+        DuplicateIndex(threshold=0.0)
+
+
+def test_deduplicator_computes_once_per_group():
+    dedup = Deduplicator(threshold=0.8)
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return {"words": len(text.split()), "skills": ["python"]}
+
+    original = document(1)
+    first = dedup.run(original, compute)
+    first["skills"].append("mutated by the caller")
+    assert dedup.run(original, compute) == {"words": 200, "skills": ["python"]}
+    assert dedup.run(near_copy(original), compute)["skills"] == ["python"]
+    dedup.run(document(2), compute)
+
+    assert len(calls) == 2
+    assert dedup.stats() == {"documents": 4, "unique": 2, "exact": 1, "near": 1, "dedup_ratio": 0.5,
+                             "threshold": 0.8}
+
+
+def test_failed_compute_is_forgotten_and_not_counted():
+    dedup = Deduplicator()
+    text = document(1)
+
+    def fail(_):
+        raise RuntimeError("parse failed")
+
+    with pytest.raises(RuntimeError):
+        dedup.run(text, fail)
+    assert dedup.stats()["documents"] == 0 and len(dedup.index) == 0
+
+    assert dedup.run(text, lambda _: "parsed") == "parsed"
+    assert dedup.stats()["documents"] == 1 and dedup.stats()["unique"] == 1
+
+
+def test_waiters_rerun_when_the_first_copy_fails():
+    dedup = Deduplicator()
+    text = document(1)
+    started, release = threading.Event(), threading.Event()
+    results, errors = [], []
+
+    def slow_failure(_):
+        started.set()
+        release.wait(5)
+        raise RuntimeError("parse failed")
+
+    def first():
+        try:
+            dedup.run(text, slow_failure)
+        except RuntimeError as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=first)
+    owner.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(dedup.run(text, lambda _: "parsed")))
+    waiter.start()
+    deadline = time.time() + 5
+    while dedup.stats()["exact"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert len(errors) == 1 and results == ["parsed"]
+    assert dedup.stats() == {"documents": 1, "unique": 1, "exact": 0, "near": 0, "dedup_ratio": 0.0,
+                             "threshold": dedup.threshold}
+
+
+def test_remember_seeds_earlier_results():
+    dedup = Deduplicator()
+    text = document(1)
+    dedup.remember(text, {"name": "earlier"})
+    assert dedup.run(text, lambda _: pytest.fail("should reuse the remembered parse")) == {"name": "earlier"}
+
+
+def test_dedup_parser_wraps_parse_text():
+    class Parser:
+        max_pages = 2
+        max_chars = 1000
+        calls = 0
+
+        def parse_text(self, text):
+            self.calls += 1
+            return {"text": text[:10]}
+
+    parser = DedupParser(Parser(), threshold=0.8)
+    text = document(1)
+    assert parser.parse_text(text) == parser.parse_text(near_copy(text))
+    assert parser.parser.calls == 1 and parser.max_pages == 2 and parser.max_chars == 1000
+    assert parser.stats()["near"] == 1
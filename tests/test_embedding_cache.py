@@ -0,0 +1,63 @@
+import numpy as np
+
+from utils.embedding_cache import DiskTier, EmbeddingCache
+
+
+def _vector(seed, dim=8):
+    return np.random.default_rng(seed).normal(size=dim).astype(np.float32)
+
+
+def test_disk_tier_round_trip(tmp_path):
+    tier = DiskTier(str(tmp_path), capacity=4)
+    tier.put("a", _vector(1))
+    tier.flush()
+    reopened = DiskTier(str(tmp_path), capacity=4)
+    np.testing.assert_allclose(reopened.get("a"), _vector(1), atol=1e-2)
+
+
+def test_stale_index_after_wraparound_misses_instead_of_returning_wrong_vector(tmp_path):
+    tier = DiskTier(str(tmp_path), capacity=2)
+    tier.put("a", _vector(1))
+    tier.put("b", _vector(2))
+    tier.flush()
+    # The FIFO wraps and overwrites a's slot, then the process dies before the next flush
+    tier.put("c", _vector(3))
+    tier.vectors.flush()
+    tier.tags.flush()
+
+    reopened = DiskTier(str(tmp_path), capacity=2)
+    assert reopened.get("a") is None
+    np.testing.assert_allclose(reopened.get("b"), _vector(2), atol=1e-2)
+
+
+def test_slot_reused_by_another_process_is_a_miss(tmp_path):
+    first = DiskTier(str(tmp_path), capacity=2)
+    first.put("a", _vector(1))
+    first.flush()
+    second = DiskTier(str(tmp_path), capacity=2)
+    second.put("x", _vector(5))
+    second.put("y", _vector(6))
+    assert first.get("a") is None
+    np.testing.assert_allclose(second.get("y"), _vector(6), atol=1e-2)
+
+
+def test_index_without_slot_digests_is_ignored(tmp_path):
+    tier = DiskTier(str(tmp_path), capacity=2)
+    tier.put("a", _vector(1))
+    tier.flush()
+    (tmp_path / "slots.sha1").unlink()
+    assert DiskTier(str(tmp_path), capacity=2).get("a") is None
+
+
+def test_embedding_cache_encodes_each_text_once(tmp_path):
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.stack([_vector(len(text)) for text in texts])
+
+    cache = EmbeddingCache("test-model", cache_dir=str(tmp_path))
+    cache.encode(["python", "java", "python"], encode)
+    cache.encode(["  python ", "go"], encode)
+    assert calls == [["python", "java"], ["go"]]
+    assert cache.stats()["misses"] == 3
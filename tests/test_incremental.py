@@ -0,0 +1,113 @@
+import pytest
+
+from evaluator.eval import evaluator
+from evaluator.incremental import IncrementalScorer, item_key
+from parser_scripts.job_des_parser import parse_requirements
+
+RESUMES = {
+    "a": {"skills": {"programming_languages": ["python"], "tools": ["docker"]},
+          "raw_text": "built data pipelines in python and shipped docker images"},
+    "b": {"skills": {"programming_languages": ["Python", "go"]},
+          "raw_text": "wrote go services and python scripts for monitoring"},
+    "c": {"skills": {"tools": ["kubernetes"]}, "raw_text": "ran kubernetes clusters"}
+}
+JOB = {"requirements": ["python programming", "python", "docker"],
+       "responsibilities": ["built data pipelines in python", "ran kubernetes clusters"]}
+
+
+def _assert_matches_full_rescore(scorer, job):
+    for candidate_id, resume in RESUMES.items():
+        expected = evaluator(resume, job, scorer.assignment)
+        got = scorer.result(candidate_id)
+        assert got["skills"]["matched_skills"] == expected["skills"]["matched_skills"]
+        assert sorted(got["skills"]["missing_skills"]) == sorted(expected["skills"]["missing_skills"])
+        assert got["experience"]["matched_experience"] == expected["experience"]["matched_experience"]
+        assert got["final_score"] == expected["final_score"]
+
+
+@pytest.fixture
+def scorer(fake_model):
+    scorer = IncrementalScorer(JOB)
+    scorer.add_candidates(RESUMES)
+    return scorer
+
+
+def test_initial_results_match_evaluator(scorer):
+    _assert_matches_full_rescore(scorer, JOB)
+
+
+def test_item_key_ignores_whitespace_but_not_case():
+    assert item_key("Python  3") == item_key(" Python 3 ")
+    assert item_key("Python") != item_key("python")
+
+
+def test_case_only_edit_is_a_change(scorer):
+    job = dict(JOB, requirements=["python programming", "Python", "docker"])
+    delta = scorer.update_job(job)
+    assert delta.added["requirements"] == ["Python"]
+    assert delta.removed["requirements"] == ["python"]
+    _assert_matches_full_rescore(scorer, job)
+
+
+def test_reorder_rescores_greedy_assignment(scorer):
+    job = dict(JOB, requirements=["python", "python programming", "docker"])
+    delta = scorer.update_job(job)
+    assert delta.reordered and not delta.added["requirements"]
+    assert delta.rescored == 2
+    assert "python" in scorer.result("a")["skills"]["matched_skills"]
+    _assert_matches_full_rescore(scorer, job)
+
+
+def test_add_remove_and_candidate_replacement(scorer):
+    job = dict(JOB, requirements=["docker", "kubernetes"], responsibilities=["wrote go services"])
+    delta = scorer.update_job(job)
+    assert delta.encoded == 2
+    _assert_matches_full_rescore(scorer, job)
+    RESUMES["c"] = {"skills": {"tools": ["docker"]}, "raw_text": "wrote go services"}
+    try:
+        scorer.add_candidates({"c": RESUMES["c"]})
+        _assert_matches_full_rescore(scorer, job)
+    finally:
+        RESUMES["c"] = {"skills": {"tools": ["kubernetes"]}, "raw_text": "ran kubernetes clusters"}
+
+
+JOB_TEXT = """Platform Engineer
+
+Responsibilities:
+- Run kubernetes clusters
+- Build data pipelines in python
+
+Requirements:
+- 5+ years with Kubernetes and Terraform
+- Python scripting and Docker images
+- Monitoring with Prometheus and Grafana dashboards
+"""
+
+
+def test_requirement_edit_matches_full_reparse(fake_model):
+    job = {"requirements": parse_requirements(JOB_TEXT),
+           "responsibilities": ["run kubernetes clusters", "build data pipelines in python"]}
+    assert job["requirements"]
+    scorer = IncrementalScorer(job, job_text=JOB_TEXT)
+    scorer.add_candidates(RESUMES)
+
+    edited = JOB_TEXT.replace("- 5+ years with Kubernetes and Terraform", "- 3+ years with Go services and Ansible")
+    delta = scorer.update_job_text(edited)
+    assert not delta.reparsed
+    full = dict(job, requirements=parse_requirements(edited))
+    assert scorer.requirements == full["requirements"]
+    assert all(" with " not in item for item in scorer.requirements)
+    _assert_matches_full_rescore(scorer, full)
+
+
+def test_requirement_edit_of_llm_parse_needs_a_reparse(fake_model):
+    job = {"requirements": {"required_skills": ["Kubernetes", "Terraform", "Python"]},
+           "responsibilities": ["run kubernetes clusters"]}
+    scorer = IncrementalScorer(job, job_text=JOB_TEXT)
+    edited = JOB_TEXT.replace("Terraform", "Ansible")
+    with pytest.raises(ValueError):
+        scorer.update_job_text(edited)
+    reparsed = {"requirements": {"required_skills": ["Kubernetes", "Ansible", "Python"]},
+                "responsibilities": ["run kubernetes clusters"]}
+    delta = scorer.update_job_text(edited, parse=lambda text: reparsed)
+    assert delta.reparsed and delta.added["requirements"] == ["Ansible"]
@@ -0,0 +1,138 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils import instrumentation
+from utils.instrumentation import Histogram, HistogramRegistry, JsonlSink, emit, ollama_fields, stage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def no_sinks(monkeypatch):
+    """Each test starts without sinks, whatever RESUMYAY_TRACE says"""
+    monkeypatch.setattr(instrumentation, "_sinks", [])
+
+
+@pytest.fixture
+def events():
+    events = []
+    instrumentation.add_sink(events.append)
+    return events
+
+
+def test_stage_is_a_shared_noop_without_sinks():
+    assert not instrumentation.enabled()
+    span = stage("resume.llm", chars=10)
+    assert span is stage("job.llm") and not isinstance(span, instrumentation.Span)
+    with span as entered:
+        entered.set(tokens=5)
+    emit("batch", size=3)
+    with pytest.raises(KeyError):
+        with stage("resume.json"):
+            raise KeyError("response")
+
+
+def test_stage_records_duration_fields_and_errors(events):
+    with stage("resume.llm", model="3b") as span:
+        span.set(tokens=12)
+    with pytest.raises(ValueError):
+        with stage("resume.json"):
+            raise ValueError("no JSON")
+    emit("embed.batch", size=64)
+
+    llm, failed, batch = events
+    assert llm["stage"] == "resume.llm" and llm["model"] == "3b" and llm["tokens"] == 12
+    assert llm["seconds"] >= 0 and "error" not in llm
+    assert failed["error"] == "ValueError"
+    assert batch == {"stage": "embed.batch", "ts": batch["ts"], "size": 64}
+
+    instrumentation.remove_sink(events.append)
+    assert not instrumentation.enabled()
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((1, 2, 4))
+    assert histogram.quantile(0.5) == 0.0
+    for value in (0.5, 1, 1.5, 3, 10):
+        histogram.observe(value)
+    # A value on a bound falls in that bucket (le is inclusive); 10 overflows
+    assert histogram.counts == [2, 1, 1, 1]
+    assert (histogram.count, histogram.sum) == (5, 16.0)
+    assert histogram.quantile(0.2) == pytest.approx(0.5)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(0.7) == pytest.approx(3.0)
+    assert histogram.quantile(1.0) == 4
+
+
+def test_registry_summary_and_prometheus_text():
+    registry = HistogramRegistry(namespace="test")
+    registry({"stage": "pdf", "ts": 1.0, "seconds": 0.02, "chars": 3000, "cached": True, "model": "3b"})
+    registry({"stage": "pdf", "ts": 2.0, "seconds": 0.2, "chars": 5, "error": "ValueError"})
+    registry({"stage": "llm", "ts": 3.0, "seconds": 1.5})
+
+    summary = registry.summary()
+    assert set(summary) == {"pdf", "llm"} and set(summary["pdf"]) == {"seconds", "chars"}
+    assert summary["pdf"]["seconds"]["count"] == 2
+    assert summary["pdf"]["seconds"]["mean"] == pytest.approx(0.11)
+
+    lines = registry.prometheus_text().splitlines()
+    assert lines.count("# TYPE test_stage_seconds histogram") == 1
+    assert "# TYPE test_stage_chars histogram" in lines
+    assert 'test_stage_seconds_bucket{stage="pdf",le="0.01"} 0' in lines
+    assert 'test_stage_seconds_bucket{stage="pdf",le="0.025"} 1' in lines
+    assert 'test_stage_seconds_bucket{stage="pdf",le="0.25"} 2' in lines
+    assert 'test_stage_seconds_bucket{stage="pdf",le="+Inf"} 2' in lines
+    assert 'test_stage_seconds_count{stage="llm"} 1' in lines
+    assert 'test_stage_chars_bucket{stage="pdf",le="4096"} 2' in lines
+    assert 'test_stage_chars_sum{stage="pdf"} 3005.0' in lines
+    assert lines[-2:] == ["# TYPE test_stage_errors_total counter", 'test_stage_errors_total{stage="pdf"} 1']
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in lines if line.startswith('test_stage_chars_bucket{stage="pdf"')]
+    assert buckets == sorted(buckets)
+
+    registry.clear()
+    assert registry.prometheus_text() == "\n"
+
+
+def test_histograms_installs_one_process_wide_sink():
+    registry = instrumentation.histograms()
+    assert instrumentation.histograms() is registry and instrumentation._sinks == [registry]
+    registry.clear()
+    with stage("score"):
+        pass
+    assert registry.summary()["score"]["seconds"]["count"] == 1
+    registry.clear()
+
+
+def test_jsonl_sink_appends_one_line_per_event(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    sink = JsonlSink(path)
+    sink({"stage": "a", "seconds": 0.5})
+    sink({"stage": "b", "path": tmp_path})
+    sink.close()
+    with open(path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f]
+    assert events == [{"stage": "a", "seconds": 0.5}, {"stage": "b", "path": str(tmp_path)}]
+
+
+def test_resumyay_trace_writes_jsonl(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    script = ("from utils.instrumentation import emit, stage\n"
+              "with stage('resume.llm', tokens=7):\n"
+              "    pass\n"
+              "emit('embed.batch', size=3)\n")
+    env = dict(os.environ, RESUMYAY_TRACE=str(path))
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True, timeout=60)
+    events = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [event["stage"] for event in events] == ["resume.llm", "embed.batch"]
+    assert events[0]["tokens"] == 7 and events[0]["seconds"] >= 0 and events[1]["size"] == 3
+
+
+def test_ollama_fields():
+    result = {"eval_count": 100, "prompt_eval_count": 40, "eval_duration": 2e9, "prompt_eval_duration": 5e8}
+    assert ollama_fields(result) == {"tokens": 100, "prompt_tokens": 40, "eval_seconds": 2.0,
+                                     "tokens_per_second": 50.0, "prompt_eval_seconds": 0.5}
+    assert ollama_fields({"response": "{}"}) == {}
@@ -0,0 +1,70 @@
+import itertools
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from parser_scripts.job_des_parser import _max_sum, _normalized, extract_keywords, extract_keywords_many  # noqa: E402
+from utils.embedding_cache import encode  # noqa: E402
+
+DOCS = [
+    "python and docker experience, kubernetes clusters, postgres databases and aws cloud services",
+    "",
+    "strong communication skills with product managers, sql reporting and python scripting",
+    "the and of to",
+    "react frontend work with typescript, graphql apis and css design systems",
+]
+
+
+@pytest.mark.parametrize("diversity", ["maxsum", "mmr", "top_n"])
+def test_batched_keywords_match_one_document_at_a_time(fake_model, diversity):
+    batched = extract_keywords_many(DOCS, top_n=4, diversity=diversity)
+    assert batched == [extract_keywords(doc, top_n=4, diversity=diversity) for doc in DOCS]
+    assert batched[1] == [] and batched[3] == []
+    assert all(len(keywords) == 4 for keywords in (batched[0], batched[2], batched[4]))
+
+
+def test_max_sum_picks_the_least_similar_combination():
+    rng = np.random.default_rng(0)
+    emb = _normalized(rng.normal(size=(12, 8)))
+    doc_sim = emb @ _normalized(rng.normal(size=(1, 8)))[0]
+    candidate_sim = emb @ emb.T
+
+    pool = np.argsort(doc_sim)[-8:]
+    best = min(itertools.combinations(pool, 3),
+               key=lambda combo: sum(candidate_sim[i, j] for i in combo for j in combo if i != j))
+    assert sorted(_max_sum(doc_sim, candidate_sim, 3, 8, block=7)) == sorted(int(i) for i in best)
+    with pytest.raises(ValueError):
+        _max_sum(doc_sim, candidate_sim, 5, 4)
+
+
+def test_top_n_ranks_by_document_similarity(fake_model):
+    keywords = extract_keywords(DOCS[0], top_n=5, diversity="top_n")
+    doc_emb = _normalized(encode([DOCS[0]]))[0]
+    sims = _normalized(encode(keywords)) @ doc_emb
+    assert list(sims) == sorted(sims, reverse=True)
+
+
+def _similarities(doc, keywords):
+    emb = _normalized(encode(keywords))
+    return emb @ _normalized(encode([doc]))[0], emb @ emb.T
+
+
+def test_mmr_trades_relevance_for_diversity(fake_model):
+    doc = DOCS[0]
+    relevant = extract_keywords(doc, top_n=5, diversity="top_n")
+    # With no diversity weight MMR is relevance ranking; equally similar phrases may swap
+    plain = extract_keywords_many([doc], top_n=5, diversity="mmr", mmr_diversity=0.0)[0]
+    assert np.allclose(_similarities(doc, plain)[0], _similarities(doc, relevant)[0])
+
+    diverse = extract_keywords(doc, top_n=5, diversity="mmr")
+    assert diverse[0] in relevant
+    overlap = [sim[np.triu_indices(5, 1)].sum() for sim in
+               (_similarities(doc, diverse)[1], _similarities(doc, relevant)[1])]
+    assert overlap[0] < overlap[1]
+
+
+def test_unknown_diversity_is_rejected():
+    with pytest.raises(ValueError):
+        extract_keywords_many(DOCS, diversity="random")
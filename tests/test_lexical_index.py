@@ -0,0 +1,90 @@
+import re
+
+import pytest
+
+from evaluator.lexical_index import LexicalIndex
+
+
+class WordIndex(LexicalIndex):
+    """LexicalIndex with lowercased words as terms, so the tests do not need spaCy"""
+
+    def _keywords(self, texts):
+        return [re.findall(r"[a-z0-9]+", text.lower()) for text in texts]
+
+
+def resume(text, *skills):
+    return {"raw_text": text, "skills": {"technical_skills": list(skills)}}
+
+
+JOB = {"requirements": ["kubernetes"], "responsibilities": ["operate clusters"]}
+
+
+def _assert_consistent(index):
+    live = {row: resume_id for row, resume_id in enumerate(index.ids) if resume_id is not None}
+    assert live == {row: resume_id for resume_id, row in index.rows.items()}
+    assert set(index.resumes) == set(index.rows)
+    assert set(index._free) == set(range(len(index.ids))) - set(live)
+    for term, posting in index.postings.items():
+        assert posting and set(posting) <= set(live)
+        for row in posting:
+            assert term in index._terms[row]
+    for row in live:
+        assert all(row in index.postings[term] for term in index._terms[row])
+    assert index._total_length == pytest.approx(sum(index._lengths[row] for row in live))
+
+
+@pytest.fixture
+def index():
+    index = WordIndex()
+    index.add(["a", "b", "c"], [resume("ran kubernetes clusters for years", "kubernetes"),
+                                resume("wrote python services", "python"),
+                                resume("some kubernetes on the side")])
+    return index
+
+
+def test_shortlist_ranks_by_bm25_and_drops_unrelated(index):
+    shortlist = index.shortlist(JOB)
+    assert [resume_id for resume_id, _ in shortlist] == ["a", "c"]
+    assert shortlist[0][1] > shortlist[1][1] > 0
+
+
+def test_readding_an_id_replaces_it(index):
+    index.add(["b"], [resume("ran kubernetes clusters", "kubernetes")])
+    _assert_consistent(index)
+    assert len(index) == 3
+    assert "b" in dict(index.shortlist(JOB))
+
+
+def test_remove_frees_the_row_for_reuse(index):
+    index.remove(["a", "missing"])
+    _assert_consistent(index)
+    assert "a" not in index and len(index) == 2
+    assert [resume_id for resume_id, _ in index.shortlist(JOB)] == ["c"]
+    index.add(["d"], [resume("kubernetes", "kubernetes")])
+    _assert_consistent(index)
+    assert len(index.ids) == 3
+
+
+def test_duplicate_ids_in_one_add_keep_the_last(index):
+    index.add(["d", "d"], [resume("wrote python services", "python"), resume("ran kubernetes clusters", "kubernetes")])
+    _assert_consistent(index)
+    assert len(index) == 4
+    ranked = [resume_id for resume_id, _ in index.shortlist(JOB)]
+    assert ranked.count("d") == 1
+    assert index.resumes["d"]["skills"]["technical_skills"] == ["kubernetes"]
+
+    index.remove(["d"])
+    _assert_consistent(index)
+    assert "d" not in [resume_id for resume_id, _ in index.shortlist(JOB)]
+
+
+def test_rank_scores_only_the_shortlist(index, fake_model):
+    ranked = index.rank([JOB])[0]
+    assert {entry["id"] for entry in ranked} == {"a", "c"}
+    assert ranked[0]["result"]["final_score"] >= ranked[-1]["result"]["final_score"]
+    assert "kubernetes" in ranked[0]["result"]["skills"]["matched_skills"]
+
+
+def test_mismatched_lengths_are_rejected(index):
+    with pytest.raises(ValueError):
+        index.add(["x", "y"], [resume("text")])
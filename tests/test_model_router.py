@@ -0,0 +1,132 @@
+import copy
+import json
+import random
+from collections import Counter
+
+import pytest
+import requests
+
+from benchmarks.fake_ollama import FakeOllama
+from parser_scripts.model_router import ModelRouter, request_failure, score_confidence
+from parser_scripts.ollama_client import OllamaPool
+from utils.synthetic import synthetic_resume
+
+DEAD_URL = "http://127.0.0.1:1"
+TIERS = ["tiny", "small", "large"]
+
+LINES, GOOD = synthetic_resume(random.Random(3), "medium")
+TEXT = "\n".join(LINES)
+# Drops the email and experience the text plainly has
+POOR = copy.deepcopy(GOOD)
+POOR["personal_info"]["email"] = ""
+POOR["experience"] = []
+
+
+@pytest.fixture
+def ollama():
+    """Fake Ollama answering per model: tiny is poor, small is good, large is not JSON"""
+    answers = {"tiny": json.dumps(POOR), "small": json.dumps(GOOD), "large": "I cannot parse this resume."}
+    calls = Counter()
+
+    def respond(request):
+        calls[request["model"]] += 1
+        return answers[request["model"]]
+
+    with FakeOllama(responder=respond) as fake:
+        fake.answers, fake.calls = answers, calls
+        yield fake
+
+
+def test_confidence_penalises_fields_the_text_shows():
+    template = ModelRouter(TIERS, client=object()).template
+    good = score_confidence(GOOD, TEXT, template)
+    poor = score_confidence(POOR, TEXT, template)
+    assert good.score > 0.9
+    assert {"missing_email", "missing_experience"} <= set(poor.reasons)
+    assert poor.score == pytest.approx(good.score - 0.6, abs=1e-3)
+    wrong = copy.deepcopy(GOOD)
+    wrong["personal_info"]["email"] = "someone.else@example.com"
+    assert "unknown_email" in score_confidence(wrong, TEXT, template).reasons
+
+
+def test_low_confidence_escalates_to_the_next_tier(ollama):
+    router = ModelRouter(TIERS, ollama_url=ollama.url)
+    routed = router.route(TEXT)
+    assert routed.model == "small" and routed.tried == ["tiny", "small"]
+    assert routed.confidence.score >= router.threshold
+    assert routed.data["personal_info"]["email"] == GOOD["personal_info"]["email"]
+    assert ollama.calls == {"tiny": 1, "small": 1}
+
+
+def test_result_at_threshold_is_accepted(ollama):
+    poor = ModelRouter(TIERS[:1], threshold=0.0, ollama_url=ollama.url).route(TEXT).confidence.score
+    routed = ModelRouter(TIERS, threshold=poor, ollama_url=ollama.url).route(TEXT)
+    assert routed.model == "tiny" and routed.tried == ["tiny"]
+
+
+def test_most_confident_result_when_no_tier_is_confident(ollama):
+    router = ModelRouter(TIERS, threshold=0.999, ollama_url=ollama.url)
+    routed = router.route(TEXT)
+    assert routed.model == "small" and routed.tried == TIERS
+
+    ollama.answers.update(tiny="nope", small="nope")
+    with pytest.raises(ValueError):
+        router.route(TEXT)
+
+
+def test_stats_report_hit_rates(ollama):
+    router = ModelRouter(TIERS, ollama_url=ollama.url)
+    for _ in range(2):
+        router.route(TEXT)
+    ollama.answers["small"] = "nope"
+    router.route(TEXT)
+
+    stats = router.stats()
+    assert stats["documents"] == 3
+    tiny, small, large = stats["tiers"]
+    assert (tiny["attempts"], tiny["escalated"], tiny["hit_rate"]) == (3, 3, 0.0)
+    assert (small["attempts"], small["accepted"], small["failed"]) == (3, 2, 1)
+    assert small["hit_rate"] == pytest.approx(2 / 3) and small["share"] == pytest.approx(2 / 3)
+    assert (large["attempts"], large["failed"], large["share"]) == (1, 1, 0.0)
+
+
+@pytest.mark.parametrize("client", ["single", "pool", "http_error"])
+def test_request_failures_are_raised_not_escalated(ollama, client):
+    if client == "single":
+        router = ModelRouter(TIERS, ollama_url=DEAD_URL)
+    elif client == "pool":
+        pool = OllamaPool([DEAD_URL, DEAD_URL + "/"], health_interval=None, hedge=False)
+        router = ModelRouter(TIERS, client=pool)
+    else:
+        # Reaches the server but gets a 404 for every generate call
+        router = ModelRouter(TIERS, ollama_url=ollama.url + "/missing")
+    try:
+        with pytest.raises(ValueError) as raised:
+            router.route(TEXT)
+    finally:
+        if client == "pool":
+            pool.close()
+    assert request_failure(raised.value)
+    stats = router.stats()
+    assert stats["documents"] == 0 and all(tier["attempts"] == 0 for tier in stats["tiers"])
+    assert sum(ollama.calls.values()) == 0
+
+
+def test_request_failure_follows_the_exception_chain():
+    def wrapped(error):
+        try:
+            raise error
+        except Exception as e:
+            try:
+                raise ValueError("Ollama request failed") from e
+            except ValueError as outer:
+                try:
+                    raise ValueError("section failed")
+                except ValueError as last:
+                    assert last.__context__ is outer
+                    return last
+
+    assert request_failure(wrapped(requests.exceptions.ReadTimeout("timed out")))
+    assert request_failure(requests.exceptions.ConnectionError("refused"))
+    assert not request_failure(wrapped(KeyError("response")))
+    assert not request_failure(ValueError("Failed to extract valid JSON from AI response"))
@@ -0,0 +1,190 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from benchmarks.fake_ollama import FakeOllama
+from parser_scripts.job_parse import job_parser_from_text
+from parser_scripts.ollama_client import OllamaPool, close_pools, make_client
+
+# Nothing listens on port 1, so connections are refused straight away
+DEAD_URL = "http://127.0.0.1:1"
+MODEL = "llama3.2:3b"
+JOB_TEXT = ("Backend Engineer at Acme. We need five years of Python and Docker experience, "
+            "and you will run Kubernetes clusters for the platform team.")
+
+
+def generate(pool, prompt="Parse resume"):
+    return pool.generate(MODEL, prompt, {"temperature": 0.1}, timeout=10)
+
+
+@pytest.fixture
+def fakes():
+    started = []
+
+    def start(**kwargs):
+        fake = FakeOllama(**kwargs).start()
+        # A failing responder drops the connection; keep its traceback out of the test output
+        fake.server.handle_error = lambda request, address: None
+        started.append(fake)
+        return fake
+
+    yield start
+    for fake in started:
+        fake.stop()
+
+
+@pytest.fixture
+def pools():
+    opened = []
+
+    def open_pool(urls, **kwargs):
+        pool = OllamaPool(urls, health_interval=None, **kwargs)
+        opened.append(pool)
+        return pool
+
+    yield open_pool
+    for pool in opened:
+        pool.close()
+
+
+def test_failed_request_is_retried_elsewhere_and_the_endpoint_ejected(fakes, pools):
+    live = fakes(responder=lambda request: "ok")
+    pool = pools([DEAD_URL, live.url], hedge=False, eject_after=1)
+
+    assert [generate(pool)["response"] for _ in range(3)] == ["ok"] * 3
+    dead, alive = pool.stats()["endpoints"]
+    assert not dead["healthy"] and dead["errors"] == 1
+    assert alive["healthy"] and alive["requests"] == 3 and live.requests == 3
+
+
+def test_endpoint_stays_in_until_eject_after_consecutive_failures(fakes, pools):
+    failing = {"on": True}
+
+    def respond(request):
+        if failing["on"]:
+            raise RuntimeError("model crashed")
+        return "ok"
+
+    flaky = fakes(responder=respond)
+    pool = pools([flaky.url], hedge=False, retries=0, eject_after=2, eject_seconds=0.2)
+    endpoint = pool.endpoints[0]
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        generate(pool)
+    assert endpoint.healthy
+    with pytest.raises(requests.exceptions.ConnectionError):
+        generate(pool)
+    assert not endpoint.healthy
+
+    # Half-open: once eject_seconds pass, a successful trial request re-admits the endpoint
+    failing["on"] = False
+    assert generate(pool)["response"] == "ok"
+    assert endpoint.healthy and endpoint.failures == 0
+
+
+def test_health_check_ejects_and_readmits(fakes, pools):
+    live = fakes()
+    pool = pools([DEAD_URL, live.url])
+    dead, alive = pool.endpoints
+
+    assert not pool.check(dead) and not dead.healthy
+    alive.healthy = False
+    assert pool.check(alive) and alive.healthy
+
+
+def test_no_live_endpoint_raises(pools):
+    pool = pools([DEAD_URL, DEAD_URL + "/"], hedge=False, retries=3)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        generate(pool)
+    # Below eject_after, endpoints that already failed are tried again once every one has been
+    assert sum(endpoint["errors"] for endpoint in pool.stats()["endpoints"]) == 4
+
+
+def test_slow_request_is_hedged_on_another_endpoint(fakes, pools):
+    slow = fakes(latency=2.0, responder=lambda request: "slow")
+    fast = fakes(responder=lambda request: "fast")
+    pool = pools([slow.url, fast.url], hedge_after=0.05)
+
+    started = time.monotonic()
+    assert generate(pool)["response"] == "fast"
+    assert time.monotonic() - started < 1.0
+    stats = pool.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert [endpoint["requests"] for endpoint in stats["endpoints"]] == [1, 1]
+
+
+def test_no_hedge_without_enough_latency_history(fakes, pools):
+    server = fakes(responder=lambda request: "ok")
+    pool = pools([server.url, server.url + "/"])
+    generate(pool)
+    assert pool.stats()["hedges"] == 0
+
+
+def test_least_outstanding_spreads_concurrent_requests(fakes, pools):
+    servers = [fakes(latency=0.05, responder=lambda request: "ok") for _ in range(2)]
+    pool = pools([server.url for server in servers], max_concurrency=2, hedge=False)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda index: generate(pool, f"Parse resume {index}"), range(8)))
+
+    per_endpoint = [endpoint["requests"] for endpoint in pool.stats()["endpoints"]]
+    assert sum(per_endpoint) == 8 and min(per_endpoint) >= 3
+    assert all(endpoint["outstanding"] == 0 for endpoint in pool.stats()["endpoints"])
+
+
+def test_concurrency_cap_per_endpoint(fakes, pools):
+    peak, current, lock = [0], [0], threading.Lock()
+
+    def respond(request):
+        with lock:
+            current[0] += 1
+            peak[0] = max(peak[0], current[0])
+        time.sleep(0.05)
+        with lock:
+            current[0] -= 1
+        return "ok"
+
+    server = fakes(responder=respond)
+    pool = pools([server.url], max_concurrency=2, hedge=False)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(lambda index: generate(pool), range(6)))
+    assert peak[0] == 2
+
+
+def test_invalid_configuration_is_rejected():
+    with pytest.raises(ValueError):
+        OllamaPool([])
+    with pytest.raises(ValueError):
+        OllamaPool([DEAD_URL], strategy="random")
+
+
+def _health_threads():
+    return sum(thread.name == "ollama-pool-health" and thread.is_alive() for thread in threading.enumerate())
+
+
+def test_url_list_calls_share_one_pool(fakes):
+    servers = [fakes(), fakes()]
+    urls = [server.url for server in servers]
+    before = _health_threads()
+    try:
+        for _ in range(4):
+            assert job_parser_from_text(JOB_TEXT, use_cache=False, ollama_url=urls)["job_info"]["title"]
+        pool = make_client(urls)
+        assert make_client([url + "/" for url in urls]) is pool
+        assert make_client(urls, max_concurrency=1) is not pool
+        assert _health_threads() == before + 2
+        # Load and latency state carries over from call to call
+        assert sum(endpoint["requests"] for endpoint in pool.stats()["endpoints"]) == 4
+    finally:
+        close_pools()
+    assert pool.closed and make_client(urls) is not pool
+    close_pools()
+
+
+def test_explicit_client_is_used(fakes, pools):
+    server = fakes()
+    pool = pools([server.url])
+    job_parser_from_text(JOB_TEXT, use_cache=False, ollama_url=[DEAD_URL], client=pool)
+    assert pool.stats()["endpoints"][0]["requests"] == 1
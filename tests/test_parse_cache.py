@@ -0,0 +1,141 @@
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fake_ollama import FakeOllama
+from parser_scripts import parse_cache
+from parser_scripts.parse_cache import ParseCache, cached_parse
+from parser_scripts.resume_parser import ResumeParser
+from utils.synthetic import synthetic_resume
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache module"""
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(parse_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def open_cache(tmp_path, **kwargs):
+    return ParseCache(str(tmp_path / "cache" / "parse.sqlite3"), **kwargs)
+
+
+def keys(cache):
+    return sorted(key for key, in cache._conn.execute("SELECT key FROM parse_cache"))
+
+
+def test_round_trip_survives_reopen(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.put("a", {"name": "Ada Lovelace", "skills": ["python"]})
+    assert cache.get("a") == {"name": "Ada Lovelace", "skills": ["python"]}
+    assert cache.get("b") is None
+    cache.close()
+
+    reopened = open_cache(tmp_path)
+    assert reopened.get("a") == {"name": "Ada Lovelace", "skills": ["python"]}
+    assert reopened.stats()["entries"] == 1
+    reopened.close()
+
+
+def test_key_covers_model_prompt_version_and_options():
+    key = ParseCache.make_key("llama3.2:3b", "1", "Ada  Lovelace\n python", {"temperature": 0.1})
+    assert key == ParseCache.make_key("llama3.2:3b", "1", "Ada Lovelace python", {"temperature": 0.1})
+    assert key != ParseCache.make_key("llama3.2:1b", "1", "Ada Lovelace python", {"temperature": 0.1})
+    assert key != ParseCache.make_key("llama3.2:3b", "2", "Ada Lovelace python", {"temperature": 0.1})
+    assert key != ParseCache.make_key("llama3.2:3b", "1", "Ada Lovelace python", {"temperature": 0.2})
+
+
+def test_entries_older_than_max_age_miss_and_are_deleted(tmp_path, clock):
+    cache = open_cache(tmp_path, max_age=60)
+    cache.put("old", {"n": 1})
+    clock.now += 30
+    cache.put("new", {"n": 2})
+    # Reading refreshes the LRU order, not the age
+    assert cache.get("old") == {"n": 1}
+
+    clock.now += 31
+    assert cache.get("old") is None
+    assert keys(cache) == ["new"]
+    clock.now += 30
+    cache.evict()
+    assert keys(cache) == []
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_entry_limit_evicts_least_recently_used(tmp_path, clock):
+    cache = open_cache(tmp_path, max_entries=3, evict_every=1)
+    for key in "abc":
+        clock.now += 1
+        cache.put(key, {"key": key})
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.put("d", {"key": "d"})
+    assert keys(cache) == ["a", "c", "d"]
+    cache.close()
+
+
+def test_size_limit_evicts_until_under_budget(tmp_path, clock):
+    value = {"text": "x" * 100}
+    size = len(json.dumps(value))
+    cache = open_cache(tmp_path, max_bytes=size * 2 + 10, evict_every=4)
+    for key in "abcd":
+        clock.now += 1
+        cache.put(key, value)
+    assert keys(cache) == ["c", "d"]
+    assert cache.stats()["bytes"] == size * 2
+
+    # Between eviction passes the cache may run over its limits
+    for key in "efg":
+        clock.now += 1
+        cache.put(key, value)
+    assert cache.stats()["entries"] == 5
+    cache.evict()
+    assert keys(cache) == ["f", "g"]
+    cache.close()
+
+
+def test_cached_parse_and_bypass(tmp_path):
+    cache = open_cache(tmp_path)
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert cached_parse(cache, "k", parse) == {"n": 1}
+    assert cached_parse(cache, "k", parse) == {"n": 1}
+    # Bypassing re-parses and refreshes the stored result
+    assert cached_parse(cache, "k", parse, bypass=True) == {"n": 2}
+    assert cached_parse(cache, "k", parse) == {"n": 2}
+    assert cached_parse(None, "k", parse) == {"n": 3}
+    cache.close()
+
+
+def test_prompt_version_change_invalidates_parses(tmp_path):
+    lines, data = synthetic_resume(random.Random(5), "small")
+    text = "\n".join(lines)
+    cache = open_cache(tmp_path)
+
+    with FakeOllama(responder=lambda request: json.dumps(data)) as fake:
+        parser = ResumeParser(ollama_url=fake.url, cache=cache)
+        first = parser.parse_with_ai(text)
+        assert parser.parse_with_ai(text) == first and fake.requests == 1
+
+        # Options folded into the prompt version get their own entries too
+        ResumeParser(ollama_url=fake.url, cache=cache, structured=False).parse_with_ai(text)
+        assert fake.requests == 2
+
+        class BumpedParser(ResumeParser):
+            PROMPT_VERSION = "2"
+
+        bumped = BumpedParser(ollama_url=fake.url, cache=cache)
+        assert bumped.parse_with_ai(text) == first and fake.requests == 3
+        bumped.parse_with_ai(text)
+        assert fake.requests == 3
+    assert cache.stats()["entries"] == 3
+    cache.close()
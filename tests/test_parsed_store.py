@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from evaluator.eval import evaluator, evaluator_many, resume_skills_of  # noqa: E402
+from parser_scripts.parsed_store import ParsedStore, skill_list  # noqa: E402
+
+RESUME = {
+    "personal_info": {"name": "Alex Kim", "email": "alex@example.com"},
+    "skills": {
+        "technical_skills": ["machine learning"],
+        "programming_languages": ["python", "sql"],
+        "frameworks": ["django"],
+        "tools": ["docker"],
+        "databases": ["postgresql"]
+    },
+    "experience": [{"job_title": "engineer", "company": "acme",
+                    "responsibilities": ["built a rest api in django"]}],
+    "raw_text": "alex kim engineer at acme built a rest api in django"
+}
+JOB = {"requirements": ["python", "docker", "kubernetes"], "responsibilities": ["built a rest api in django"]}
+
+
+def test_skill_list_matches_evaluator_skills():
+    assert skill_list(RESUME) == resume_skills_of(RESUME) == [
+        "machine learning", "python", "sql", "django", "docker", "postgresql"]
+
+
+def test_store_inputs_score_like_evaluator(tmp_path, fake_model):
+    store = ParsedStore.resumes(str(tmp_path / "resumes"))
+    store.append([RESUME], ids=["alex"])
+    resumes, skills = store.evaluator_inputs()
+    stored = evaluator_many(resumes, [JOB], resume_skills=skills)["results"][0][0]
+    live = evaluator(RESUME, JOB)
+    assert stored["skills"]["matched_skills"] == live["skills"]["matched_skills"] == {"python", "docker"}
+    assert stored["final_score"] == live["final_score"]
@@ -0,0 +1,74 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from benchmarks.corpus import LINES_PER_PAGE, write_pdf
+from parser_scripts.bulk import parse_directory
+from parser_scripts.pdf_extract import extract_pdf_text, extract_pdf_text_split
+
+PAGES = 11
+
+
+def page_lines(page):
+    return [f"page {page} line {line}" for line in range(LINES_PER_PAGE)]
+
+
+@pytest.fixture(scope="module")
+def long_pdf(tmp_path_factory):
+    path = tmp_path_factory.mktemp("pdfs") / "long.pdf"
+    write_pdf(str(path), [line for page in range(PAGES) for line in page_lines(page)])
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def processes():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+def page_order(text):
+    order = []
+    # A char budget can cut the last line short
+    for page in map(int, re.findall(r"^page (\d+) line", text, re.MULTILINE)):
+        if not order or order[-1] != page:
+            order.append(page)
+    return order
+
+
+def test_serial_extraction_honours_caps(long_pdf):
+    assert page_order(extract_pdf_text(long_pdf)) == list(range(PAGES))
+    assert page_order(extract_pdf_text(long_pdf, max_pages=3)) == [0, 1, 2]
+    capped = extract_pdf_text(long_pdf, max_chars=500)
+    assert len(capped) <= 500 and capped.startswith("page 0 line 0")
+
+
+def test_split_extraction_matches_serial_in_page_order(long_pdf, processes):
+    full = extract_pdf_text(long_pdf)
+    assert extract_pdf_text_split(long_pdf, processes, pages_per_task=2) == full
+    assert page_order(extract_pdf_text_split(long_pdf, processes, max_pages=7, pages_per_task=3)) == list(range(7))
+
+
+def test_split_extraction_honours_char_budget(long_pdf, processes):
+    budget = len(extract_pdf_text(long_pdf, max_pages=3)) + 100
+    text = extract_pdf_text_split(long_pdf, processes, max_chars=budget, pages_per_task=2)
+    assert text == extract_pdf_text(long_pdf, max_chars=budget)
+    assert len(text) <= budget and page_order(text) == [0, 1, 2, 3]
+    # A budget the first range already fills needs no further tasks
+    assert extract_pdf_text_split(long_pdf, processes, max_chars=200, pages_per_task=2) == \
+        extract_pdf_text(long_pdf, max_chars=200)
+
+
+def test_bulk_parse_fans_pages_out_on_processes(tmp_path):
+    write_pdf(str(tmp_path / "short.pdf"), page_lines(0))
+    write_pdf(str(tmp_path / "long.pdf"), [line for page in range(PAGES) for line in page_lines(page)])
+
+    class Parser:
+        max_pages = 5
+        max_chars = None
+
+        def parse_text(self, text):
+            return {"pages": page_order(text)}
+
+    results = parse_directory(str(tmp_path), parser=Parser(), processes=2)
+    assert [result.data for result in results] == [{"pages": [0, 1, 2, 3, 4]}, {"pages": [0]}]
@@ -0,0 +1,144 @@
+import time
+
+import pytest
+
+from pipeline import runner as runner_module
+from pipeline.ledger import Ledger
+from pipeline.runner import PipelineRunner
+
+JOBS = {"backend": {"requirements": ["python", "docker"], "responsibilities": ["built data pipelines"]}}
+
+
+@pytest.fixture
+def ledger():
+    ledger = Ledger(":memory:")
+    yield ledger
+    ledger.close()
+
+
+class FakeParser:
+    """Parses "skill: x" lines; a text containing "parse-fails" fails its first `failures` attempts"""
+
+    max_pages = None
+    max_chars = None
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    def parse_text(self, text):
+        self.calls += 1
+        if "parse-fails" in text and self.failures:
+            self.failures -= 1
+            raise RuntimeError("model returned garbage")
+        skills = [line.split(":", 1)[1].strip() for line in text.splitlines() if line.startswith("skill:")]
+        return {"skills": {"technical_skills": skills}, "experience": []}
+
+
+class FailingScoreRunner(PipelineRunner):
+    """Scoring blows up for the whole batch whenever it holds a resume whose text contains "score-fails" """
+
+    def score(self, items):
+        if any("score-fails" in state["extract"] for _, state in items):
+            raise ValueError("cannot score this resume")
+        return super().score(items)
+
+
+@pytest.fixture
+def documents(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner_module, "extract_pdf_text",
+                        lambda path, max_pages=None, max_chars=None: open(path, encoding="utf-8").read())
+
+    def write(texts):
+        for name, text in texts.items():
+            (tmp_path / f"{name}.pdf").write_text(text, encoding="utf-8")
+        return str(tmp_path)
+
+    return write
+
+
+def test_claim_advance_and_counts(ledger):
+    assert ledger.add([("a", "a.pdf"), ("b", "b.pdf")], "extract") == 2
+    assert ledger.add([("a", "a.pdf"), ("c", "c.pdf")], "extract") == 1
+
+    first = ledger.claim(1, ["extract", "parse"])
+    assert [claim.id for claim in first] == ["a"]
+    ledger.advance("a", "extract", "text of a", "parse")
+    ledger.release(["a"])
+    # Later stages are claimed first, so documents in flight finish before new ones start
+    claims = ledger.claim(10, ["extract", "parse"])
+    assert [(claim.id, claim.stage) for claim in claims] == [("a", "parse"), ("b", "extract"), ("c", "extract")]
+    assert ledger.claim(10) == []
+
+    ledger.advance("a", "parse", {"skills": {"python"}}, None)
+    assert ledger.output("a", "parse") == {"skills": ["python"]}
+    assert dict(ledger.outputs("extract")) == {"a": "text of a"}
+    with pytest.raises(KeyError):
+        ledger.output("b", "extract")
+    assert ledger.counts() == {"done": 1, "extract/running": 2, "failed": 0}
+    assert ledger.unfinished() == (2, None)
+
+
+def test_fail_backs_off_then_gives_up(ledger):
+    ledger.add([("a", "a.pdf")], "extract")
+    ledger.claim(1)
+    before = time.time()
+    assert ledger.fail("a", "boom", max_attempts=2, backoff=60.0, max_backoff=300.0)
+    assert ledger.claim(1) == []
+    count, due = ledger.unfinished()
+    assert count == 1 and due >= before + 60.0
+
+    assert not ledger.fail("a", "boom again", max_attempts=2, backoff=60.0, max_backoff=300.0)
+    assert ledger.failures() == [{"id": "a", "path": "a.pdf", "stage": "extract", "attempts": 2,
+                                  "error": "boom again"}]
+    assert ledger.counts()["failed"] == 1
+
+    assert ledger.retry_failed(["parse"]) == 0
+    assert ledger.retry_failed() == 1
+    assert [claim.attempts for claim in ledger.claim(1)] == [0]
+
+
+def test_recover_returns_running_documents(ledger):
+    ledger.add([("a", "a.pdf"), ("b", "b.pdf")], "extract")
+    ledger.claim(10)
+    assert ledger.recover() == 2
+    assert len(ledger.claim(10)) == 2
+
+
+def test_run_extracts_parses_and_scores(ledger, documents, fake_model):
+    root = documents({"alice": "skill: python\nskill: docker", "bob": "skill: java"})
+    parser = FakeParser()
+    runner = PipelineRunner(ledger, parser=parser, jobs=JOBS, poll_interval=0.01)
+    assert runner.add_directory(root) == 2
+
+    assert runner.run() == {"done": 2, "failed": 0}
+    results = runner.results()
+    assert results["alice.pdf"]["parsed"]["skills"]["technical_skills"] == ["python", "docker"]
+    alice = results["alice.pdf"]["scores"]["backend"]
+    assert sorted(alice["skills"]["matched_skills"]) == ["docker", "python"]
+    assert alice["final_score"] > results["bob.pdf"]["scores"]["backend"]["final_score"]
+
+    # Nothing is redone on a second run over the same ledger
+    assert runner.run() == {"done": 2, "failed": 0}
+    assert parser.calls == 2
+
+
+def test_failed_parse_is_retried(ledger, documents):
+    root = documents({"alice": "skill: python parse-fails", "bob": "skill: java"})
+    runner = PipelineRunner(ledger, parser=FakeParser(failures=1), backoff=0.0, poll_interval=0.01)
+    runner.add_directory(root)
+    assert runner.run() == {"done": 2, "failed": 0}
+
+
+def test_bad_resume_fails_alone_in_its_score_batch(ledger, documents, fake_model):
+    texts = {f"r{i}": "skill: python" for i in range(5)}
+    texts["r2"] += "\nscore-fails"
+    root = documents(texts)
+    runner = FailingScoreRunner(ledger, parser=FakeParser(), jobs=JOBS, score_batch_size=8, max_attempts=1,
+                                poll_interval=0.01)
+    runner.add_directory(root)
+
+    assert runner.run() == {"done": 4, "score/failed": 1, "failed": 1}
+    [failure] = ledger.failures()
+    assert failure["id"] == "r2.pdf" and failure["error"] == "ValueError: cannot score this resume"
+    assert set(runner.results()) == set(f"{name}.pdf" for name in texts)
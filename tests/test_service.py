@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from conftest import DIM
+from evaluator.service import ScoringService
+
+RESUME = {"skills": {"programming_languages": ["python"], "tools": ["docker"]},
+          "raw_text": "built data pipelines in python and shipped docker images"}
+JOB = {"requirements": ["python", "docker"], "responsibilities": ["built data pipelines in python"]}
+
+
+@pytest.fixture
+def service(fake_model):
+    service = ScoringService(max_wait_ms=50.0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), service.handler())
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    service.url = f"http://{host}:{port}"
+    yield service
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def test_concurrent_requests_share_encode_batches(service):
+    def embed(index):
+        return requests.post(f"{service.url}/embed", json={"texts": [f"text number {index}", "python"]}, timeout=10)
+
+    def score(index):
+        return requests.post(f"{service.url}/score", json={"resume": RESUME, "job": JOB}, timeout=10)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        embedded = list(executor.map(embed, range(16)))
+        scored = list(executor.map(score, range(8)))
+
+    assert all(response.status_code == 200 for response in embedded + scored)
+    embeddings = embedded[0].json()["embeddings"]
+    assert len(embeddings) == 2 and len(embeddings[0]) == DIM
+    result = scored[0].json()
+    assert sorted(result["skills"]["matched_skills"]) == ["docker", "python"]
+    assert service.batcher.requests >= 16
+    assert service.batcher.batches < service.batcher.requests
+
+
+@pytest.mark.parametrize("body", [b"[]", b'"x"', b"42", b"{not json"])
+def test_non_object_bodies_are_rejected(service, body):
+    for path in ("/score", "/embed"):
+        response = requests.post(f"{service.url}{path}", data=body, timeout=10,
+                                 headers={"Content-Type": "application/json"})
+        assert response.status_code == 400
+        assert "error" in response.json()
+
+
+def test_bad_requests_and_unknown_routes(service):
+    assert requests.post(f"{service.url}/embed", json={"texts": "python"}, timeout=10).status_code == 400
+    assert requests.post(f"{service.url}/score", json={"resume": RESUME}, timeout=10).status_code == 400
+    assert requests.get(f"{service.url}/nowhere", timeout=10).status_code == 404
+    assert requests.get(f"{service.url}/health", timeout=10).json()["status"] == "ok"
+
+
+def test_metrics_type_cumulative_counts_as_counters(service):
+    requests.post(f"{service.url}/embed", json={"texts": ["python", "python"]}, timeout=10)
+    text = requests.get(f"{service.url}/metrics", timeout=10).text
+    assert "# TYPE resumyay_embedding_cache_hits_total counter" in text
+    assert "# TYPE resumyay_embedding_cache_misses_total counter" in text
+    assert "# TYPE resumyay_embedding_cache_memory_entries gauge" in text
+    assert "resumyay_embedding_cache_hits gauge" not in text
+    assert "resumyay_batcher_batches_total 1" in text
@@ -0,0 +1,278 @@
+import copy
+import hashlib
+import threading
+import zlib
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from utils.embedding_cache import normalize_text
+from utils.instrumentation import stage
+
+# Estimated Jaccard similarity of word shingles above which two texts count as copies
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class Match(NamedTuple):
+    key: Hashable
+    similarity: float
+    exact: bool
+
+
+def content_hash(text: str) -> str:
+    """Key shared by texts that differ only in whitespace or unicode normalization"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> List[str]:
+    """Overlapping runs of size lowercased words; a shorter text is one shingle"""
+    words = normalize_text(text).lower().split()
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def lsh_bands(threshold: float, num_perm: int, false_positive_weight: float = 0.1) -> Tuple[int, int]:
+    """(bands, rows) for num_perm hashes minimising the weighted rate of spurious and missed candidates.
+
+    Spurious candidates only cost a signature comparison while a missed
+    duplicate costs an LLM call, so misses weigh more by default.
+    """
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        below = np.linspace(0.0, threshold, 101)
+        above = np.linspace(threshold, 1.0, 101)
+        false_positive = np.trapz(1 - (1 - below ** rows) ** bands, below)
+        false_negative = np.trapz((1 - above ** rows) ** bands, above)
+        error = false_positive_weight * false_positive + (1 - false_positive_weight) * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, with num_perm universal hash permutations"""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.array([zlib.crc32(shingle.encode("utf-8")) for shingle in set(shingles(text, self.shingle_size))],
+                          dtype=np.uint64)
+        # uint64 products wrap; the permutation stays a good hash family after the mod and mask
+        permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class DuplicateIndex:
+    """Exact-hash and MinHash LSH index answering "have we seen this text, or a near copy of it?"
+
+    Texts equal after whitespace normalization match exactly. Otherwise
+    signatures are split into bands, texts sharing any band are candidates,
+    and the most similar candidate at or above threshold is the match.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self._exact: Dict[str, Hashable] = {}
+        self._hashes: Dict[Hashable, str] = {}
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._hashes
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def query(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[Match]:
+        """The indexed text this one duplicates, or None"""
+        key = self._exact.get(content_hash(text))
+        if key is not None:
+            return Match(key, 1.0, True)
+        if signature is None:
+            signature = self.hasher.signature(text)
+        candidates = {candidate for band, band_key in enumerate(self._band_keys(signature))
+                      for candidate in self._buckets[band].get(band_key, ())}
+        best: Optional[Match] = None
+        for candidate in candidates:
+            score = similarity(signature, self._signatures[candidate])
+            if score >= self.threshold and (best is None or score > best.similarity):
+                best = Match(candidate, score, False)
+        return best
+
+    def add(self, key: Hashable, text: str, signature: Optional[np.ndarray] = None):
+        if key in self._hashes:
+            self.remove(key)
+        if signature is None:
+            signature = self.hasher.signature(text)
+        digest = content_hash(text)
+        self._exact.setdefault(digest, key)
+        self._hashes[key] = digest
+        self._signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def remove(self, key: Hashable):
+        digest = self._hashes.pop(key, None)
+        if digest is None:
+            return
+        if self._exact.get(digest) == key:
+            del self._exact[digest]
+        signature = self._signatures.pop(key)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band][band_key]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band][band_key]
+
+
+class Deduplicator:
+    """Runs an expensive step (an LLM parse) once per group of duplicate texts and reuses its result.
+
+    A duplicate of a text still being processed waits for that result instead
+    of starting its own. If the first copy fails, it is forgotten and the
+    waiting copies run the step themselves.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 shingle_size: int = DEFAULT_SHINGLE_SIZE):
+        self.index = DuplicateIndex(threshold, num_perm, shingle_size)
+        self.documents = 0
+        self.exact = 0
+        self.near = 0
+        self._results: Dict[int, Future] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    @property
+    def threshold(self) -> float:
+        return self.index.threshold
+
+    def _register(self, text: str, signature: np.ndarray) -> Tuple[int, Future]:
+        key = self._next_key
+        self._next_key += 1
+        future: Future = Future()
+        self._results[key] = future
+        self.index.add(key, text, signature)
+        return key, future
+
+    def remember(self, text: str, result: Any):
+        """Record an already computed result, e.g. one from an earlier run"""
+        signature = self.index.hasher.signature(text)
+        with self._lock:
+            _, future = self._register(text, signature)
+        future.set_result(result)
+
+    def run(self, text: str, compute: Callable[[str], Any]) -> Any:
+        """compute(text), or a copy of the result for an earlier duplicate of text"""
+        with stage("dedup.lookup", chars=len(text)) as span:
+            signature = self.index.hasher.signature(text)
+            with self._lock:
+                self.documents += 1
+                match = self.index.query(text, signature)
+                if match is None:
+                    key, future = self._register(text, signature)
+                elif match.exact:
+                    self.exact += 1
+                    future = self._results[match.key]
+                else:
+                    self.near += 1
+                    future = self._results[match.key]
+            span.set(duplicate=match is not None, similarity=match.similarity if match else None)
+
+        if match is None:
+            try:
+                result = compute(text)
+            except BaseException as e:
+                with self._lock:
+                    self.index.remove(key)
+                    del self._results[key]
+                    self.documents -= 1
+                future.set_exception(e)
+                raise
+            # Kept apart from the caller's copy, which it is free to modify
+            future.set_result(copy.deepcopy(result))
+            return result
+
+        try:
+            return copy.deepcopy(future.result())
+        except Exception:
+            # The copy we were waiting for failed; this one is not a duplicate after all
+            with self._lock:
+                if match.exact:
+                    self.exact -= 1
+                else:
+                    self.near -= 1
+                self.documents -= 1
+            return self.run(text, compute)
+
+    def stats(self) -> Dict[str, Any]:
+        """Documents seen, exact and near-duplicate hits, and the share of work skipped"""
+        with self._lock:
+            duplicates = self.exact + self.near
+            return {
+                "documents": self.documents,
+                "unique": self.documents - duplicates,
+                "exact": self.exact,
+                "near": self.near,
+                "dedup_ratio": duplicates / self.documents if self.documents else 0.0,
+                "threshold": self.threshold
+            }
+
+
+class DedupParser:
+    """Drop-in wrapper that parses each group of duplicate documents once.
+
+    Wraps a ResumeParser, ModelRouter or JobDescriptionParser; near copies
+    get the parse of the first copy seen, exactly as it was returned.
+    """
+
+    def __init__(self, parser: Any, deduplicator: Optional[Deduplicator] = None,
+                 threshold: float = DEFAULT_THRESHOLD):
+        self.parser = parser
+        self.deduplicator = deduplicator or Deduplicator(threshold)
+
+    @property
+    def max_pages(self) -> Optional[int]:
+        return self.parser.max_pages
+
+    @property
+    def max_chars(self) -> Optional[int]:
+        return self.parser.max_chars
+
+    def parse_text(self, text: str) -> Dict[str, Any]:
+        return self.deduplicator.run(text, self.parser.parse_text)
+
+    def parse_resume(self, pdf_path: str) -> Dict[str, Any]:
+        return self.parse_text(self.parser.extract_text_from_pdf(pdf_path))
+
+    def parse_job_description(self, job_description: str) -> Dict[str, Any]:
+        return self.deduplicator.run(job_description, self.parser.parse_job_description)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.deduplicator.stats()
@@ -0,0 +1,56 @@
+import os
+from typing import Any, Callable, Dict
+
+# fp32: SentenceTransformer as shipped. int8: torch dynamic quantization of every
+# Linear layer. onnx: ONNX Runtime through sentence-transformers' onnx backend.
+DEFAULT_BACKEND = "fp32"
+
+
+def load_fp32(model_name: str) -> Any:
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def load_int8(model_name: str) -> Any:
+    import torch
+    model = load_fp32(model_name)
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_onnx(model_name: str) -> Any:
+    from sentence_transformers import SentenceTransformer
+    model_kwargs = {}
+    # e.g. onnx/model_qint8_avx512_vnni.onnx for a pre-quantized export
+    if os.environ.get("RESUMYAY_ONNX_FILE"):
+        model_kwargs["file_name"] = os.environ["RESUMYAY_ONNX_FILE"]
+    try:
+        return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+    except ImportError as e:
+        raise ImportError("The onnx embedding backend needs ONNX Runtime: pip install 'optimum[onnxruntime]'") from e
+
+
+BACKENDS: Dict[str, Callable[[str], Any]] = {
+    "fp32": load_fp32,
+    "int8": load_int8,
+    "onnx": load_onnx
+}
+
+_backend = os.environ.get("RESUMYAY_EMBEDDING_BACKEND", DEFAULT_BACKEND)
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_backend(name: str):
+    """Choose the backend for models loaded from now on (RESUMYAY_EMBEDDING_BACKEND sets the default)"""
+    global _backend
+    check_backend(name)
+    _backend = name
+
+
+def check_backend(name: str) -> str:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name} (expected one of {', '.join(BACKENDS)})")
+    return name
@@ -0,0 +1,283 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.embedding_backends import BACKENDS, DEFAULT_BACKEND, check_backend, get_backend
+from utils.instrumentation import stage
+from utils.model_registry import registry
+
+DEFAULT_MODEL = "all-MiniLM-L12-v2"
+
+
+def normalize_text(text) -> str:
+    """Collapse whitespace and unicode variants so equal texts share a key"""
+    return unicodedata.normalize("NFC", " ".join(str(text).split()))
+
+
+def text_key(model_name: str, text: str) -> str:
+    """Content address of a (model, normalized text) pair"""
+    return hashlib.sha1(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class DiskTier:
+    """Memory-mapped float16 vectors plus a JSON key index, evicted FIFO.
+
+    Each slot also records a digest of the key it holds, written after its
+    vector, and get() checks it. An index.json older than the vectors (a crash
+    between flushes, or another process reusing the slot) then reads as a miss
+    rather than another text's embedding.
+    """
+
+    def __init__(self, directory: str, capacity: int = 1_000_000):
+        self.directory = directory
+        self.capacity = capacity
+        self.index_path = os.path.join(directory, "index.json")
+        self.vectors_path = os.path.join(directory, "vectors.f16")
+        self.tags_path = os.path.join(directory, "slots.sha1")
+        self.dim = None
+        self.next_slot = 0
+        self.slots: Dict[str, int] = {}
+        self.slot_keys: List[Optional[str]] = []
+        self.vectors = None
+        self.tags = None
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        paths = (self.index_path, self.vectors_path, self.tags_path)
+        if not all(os.path.exists(path) for path in paths):
+            # Nothing to verify the vectors against (or nothing saved yet): start empty
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.capacity = index["capacity"]
+        self._open(index["dim"], mode="r+")
+        self.next_slot = index["next_slot"]
+        for key, slot in index["slots"].items():
+            if self._holds(slot, key):
+                self.slots[key] = slot
+                self.slot_keys[slot] = key
+
+    def _open(self, dim: int, mode: str = "w+"):
+        self.dim = dim
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode=mode,
+                                 shape=(self.capacity, dim))
+        self.tags = np.memmap(self.tags_path, dtype=np.uint8, mode=mode, shape=(self.capacity, 20))
+        self.slot_keys = [None] * self.capacity
+
+    @staticmethod
+    def _tag(key: str) -> np.ndarray:
+        return np.frombuffer(hashlib.sha1(key.encode("utf-8")).digest(), dtype=np.uint8)
+
+    def _holds(self, slot: int, key: str) -> bool:
+        return bool(np.array_equal(self.tags[slot], self._tag(key)))
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+        # Checked again after the read, so a slot rewritten meanwhile is not returned half-updated
+        held = self._holds(slot, key)
+        vector = np.array(self.vectors[slot], dtype=np.float32)
+        if not (held and self._holds(slot, key)):
+            del self.slots[key]
+            self.slot_keys[slot] = None
+            return None
+        return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        if self.vectors is None:
+            self._open(vector.shape[-1])
+        if key in self.slots:
+            return
+        slot = self.next_slot % self.capacity
+        evicted = self.slot_keys[slot]
+        if evicted is not None:
+            del self.slots[evicted]
+        # Invalidate the slot before overwriting it, and only claim it once the vector is in place
+        self.tags[slot] = 0
+        self.vectors[slot] = vector
+        self.tags[slot] = self._tag(key)
+        self.slots[key] = slot
+        self.slot_keys[slot] = key
+        self.next_slot = slot + 1
+
+    def flush(self):
+        if self.vectors is None:
+            return
+        self.vectors.flush()
+        self.tags.flush()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "next_slot": self.next_slot,
+                "slots": self.slots
+            }, f)
+        os.replace(tmp_path, self.index_path)
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with an LRU memory tier and optional disk tier"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_entries: int = 50_000,
+                 cache_dir: Optional[str] = None, disk_capacity: int = 1_000_000,
+                 flush_every: int = 1024):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.disk = DiskTier(os.path.join(cache_dir, model_name.replace("/", "_")),
+                             disk_capacity) if cache_dir else None
+        self.flush_every = flush_every
+        self.pending = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.disk is not None:
+            atexit.register(self.flush)
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        vector = self.memory.get(key)
+        if vector is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return vector
+        if self.disk is not None:
+            vector = self.disk.get(key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.disk_hits += 1
+                return vector
+        return None
+
+    def encode(self, texts: Union[str, Sequence[str]],
+               encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return embeddings for texts, calling encode_fn once for all misses"""
+        if isinstance(texts, str):
+            return self.encode([texts], encode_fn)[0]
+
+        normalized = [normalize_text(t) for t in texts]
+        keys = [text_key(self.model_name, t) for t in normalized]
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+
+        with self._lock:
+            for key, text in zip(keys, normalized):
+                if key in found or key in missing:
+                    continue
+                vector = self._lookup(key)
+                if vector is None:
+                    missing[key] = text
+                else:
+                    found[key] = vector
+            self.misses += len(missing)
+
+        if missing:
+            encoded = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            with self._lock:
+                for key, vector in zip(missing, encoded):
+                    found[key] = vector
+                    self._remember(key, vector)
+                    if self.disk is not None:
+                        self.disk.put(key, vector)
+                        self.pending += 1
+                if self.disk is not None and self.pending >= self.flush_every:
+                    self.disk.flush()
+                    self.pending = 0
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk.slots) if self.disk is not None else 0
+        }
+
+    def flush(self):
+        """Persist the disk tier index"""
+        if self.disk is None:
+            return
+        with self._lock:
+            self.disk.flush()
+            self.pending = 0
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _sentence_transformer_loader(model_name: str, backend: str = DEFAULT_BACKEND):
+    def load():
+        return BACKENDS[backend](model_name)
+    return load
+
+
+def _variant(model_name: str, backend: Optional[str]) -> Tuple[str, str]:
+    """(backend, name) where name tells backends apart and is plain for fp32"""
+    backend = check_backend(backend or get_backend())
+    return backend, model_name if backend == DEFAULT_BACKEND else f"{model_name}@{backend}"
+
+
+def model_key(model_name: str, backend: Optional[str] = None) -> str:
+    return f"sentence-transformer/{_variant(model_name, backend)[1]}"
+
+
+def get_model(model_name: str = DEFAULT_MODEL, backend: Optional[str] = None):
+    backend, _ = _variant(model_name, backend)
+    key = model_key(model_name, backend)
+    if not registry.is_registered(key):
+        registry.register(key, _sentence_transformer_loader(model_name, backend))
+    return registry.get(key)
+
+
+registry.register(model_key(DEFAULT_MODEL, DEFAULT_BACKEND), _sentence_transformer_loader(DEFAULT_MODEL))
+
+
+def get_embedding_cache(model_name: str = DEFAULT_MODEL, backend: Optional[str] = None) -> EmbeddingCache:
+    """Process-wide cache per model and backend; set RESUMYAY_EMBEDDING_CACHE_DIR to enable the disk tier"""
+    name = _variant(model_name, backend)[1]
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = EmbeddingCache(
+                name,
+                max_entries=int(os.environ.get("RESUMYAY_EMBEDDING_CACHE_SIZE", 50_000)),
+                cache_dir=os.environ.get("RESUMYAY_EMBEDDING_CACHE_DIR")
+            )
+        return _caches[name]
+
+
+def encode(texts: Union[str, Sequence[str]], model_name: str = DEFAULT_MODEL,
+           batch_size: int = 64, backend: Optional[str] = None) -> np.ndarray:
+    """Encode texts with the shared model, serving repeats from the cache"""
+    backend, _ = _variant(model_name, backend)
+
+    def encode_batch(batch):
+        with stage("embedding.model", batch_size=len(batch)):
+            return get_model(model_name, backend).encode(batch, batch_size=batch_size, convert_to_numpy=True)
+
+    with stage("embedding.encode", texts=1 if isinstance(texts, str) else len(texts)):
+        return get_embedding_cache(model_name, backend).encode(texts, encode_batch)
@@ -0,0 +1,241 @@
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, IO, List, Optional, Sequence, Tuple, Union
+
+# A sink receives one event dict per finished stage: {"stage", "ts", "seconds", ...}
+Sink = Callable[[Dict[str, Any]], None]
+
+_sinks: List[Sink] = []
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+SIZE_BUCKETS = tuple(4 ** n for n in range(13))
+
+
+def add_sink(sink: Sink) -> Sink:
+    if sink not in _sinks:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: Sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def clear_sinks():
+    _sinks.clear()
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def _dispatch(event: Dict[str, Any]):
+    for sink in list(_sinks):
+        sink(event)
+
+
+class Span:
+    """Times one pipeline stage; numeric fields set on it are recorded with the duration"""
+
+    __slots__ = ("name", "fields", "started")
+
+    def __init__(self, name: str, fields: Dict[str, Any]):
+        self.name = name
+        self.fields = fields
+        self.started = 0.0
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event = {"stage": self.name, "ts": time.time(), "seconds": time.perf_counter() - self.started}
+        event.update(self.fields)
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        _dispatch(event)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **fields):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def stage(name: str, **fields) -> Union[Span, _NoopSpan]:
+    """Context manager timing a stage; a shared no-op when no sink is installed"""
+    if not _sinks:
+        return _NOOP
+    return Span(name, fields)
+
+
+def emit(name: str, **fields):
+    """Record an untimed event, e.g. a batch size"""
+    if _sinks:
+        event = {"stage": name, "ts": time.time()}
+        event.update(fields)
+        _dispatch(event)
+
+
+def ollama_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Token counts and timings from an Ollama generate response"""
+    fields = {}
+    if "eval_count" in result:
+        fields["tokens"] = result["eval_count"]
+    if "prompt_eval_count" in result:
+        fields["prompt_tokens"] = result["prompt_eval_count"]
+    if result.get("eval_duration"):
+        fields["eval_seconds"] = result["eval_duration"] / 1e9
+        if "eval_count" in result:
+            fields["tokens_per_second"] = result["eval_count"] / fields["eval_seconds"]
+    if result.get("prompt_eval_duration"):
+        fields["prompt_eval_seconds"] = result["prompt_eval_duration"] / 1e9
+    return fields
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class HistogramRegistry:
+    """In-process sink keeping a histogram per (metric, stage) and an error count per stage"""
+
+    def __init__(self, namespace: str = "resumyay"):
+        self.namespace = namespace
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Dict[str, Any]):
+        stage_name = event["stage"]
+        with self._lock:
+            if "error" in event:
+                self.errors[stage_name] = self.errors.get(stage_name, 0) + 1
+            for metric, value in event.items():
+                if metric in ("stage", "ts") or isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                histogram = self.histograms.get((metric, stage_name))
+                if histogram is None:
+                    buckets = DURATION_BUCKETS if metric.endswith("seconds") else SIZE_BUCKETS
+                    histogram = self.histograms[(metric, stage_name)] = Histogram(buckets)
+                histogram.observe(value)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{stage: {metric: {count, sum, mean, p50, p95}}}"""
+        out: Dict[str, Dict[str, Dict[str, float]]] = {}
+        with self._lock:
+            for (metric, stage_name), histogram in sorted(self.histograms.items(), key=lambda item: item[0][::-1]):
+                out.setdefault(stage_name, {})[metric] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95)
+                }
+        return out
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition (version 0.0.4) of every histogram"""
+        lines = []
+        with self._lock:
+            by_metric: Dict[str, List[Tuple[str, Histogram]]] = {}
+            for (metric, stage_name), histogram in sorted(self.histograms.items()):
+                by_metric.setdefault(metric, []).append((stage_name, histogram))
+            for metric, series in by_metric.items():
+                name = f"{self.namespace}_stage_{metric}"
+                lines.append(f"# TYPE {name} histogram")
+                for stage_name, histogram in series:
+                    label = f'stage="{stage_name}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+            if self.errors:
+                name = f"{self.namespace}_stage_errors_total"
+                lines.append(f"# TYPE {name} counter")
+                for stage_name, count in sorted(self.errors.items()):
+                    lines.append(f'{name}{{stage="{stage_name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self.histograms.clear()
+            self.errors.clear()
+
+
+class JsonlSink:
+    """Append every event as one JSON line to a file path or open stream"""
+
+    def __init__(self, target: Union[str, IO[str]]):
+        self._owns = isinstance(target, str)
+        self.stream = open(target, "a", encoding="utf-8") if self._owns else target
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Dict[str, Any]):
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def close(self):
+        if self._owns:
+            self.stream.close()
+
+
+_registry: Optional[HistogramRegistry] = None
+
+
+def histograms() -> HistogramRegistry:
+    """Install (once) and return the process-wide histogram registry sink"""
+    global _registry
+    if _registry is None:
+        _registry = HistogramRegistry()
+    add_sink(_registry)
+    return _registry
+
+
+if os.environ.get("RESUMYAY_TRACE"):
+    add_sink(JsonlSink(os.environ["RESUMYAY_TRACE"]))
@@ -0,0 +1,66 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Loads each registered model once, on first use, and records load times"""
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.load_times: Dict[str, float] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Register a loader; a model that is already loaded keeps its instance"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._loaders
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is None:
+                start = time.perf_counter()
+                model = self._loaders[name]()
+                elapsed = time.perf_counter() - start
+                self.load_times[name] = elapsed
+                self._models[name] = model
+                logger.info("Loaded %s in %.2fs", name, elapsed)
+        return model
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Load the given (default: all registered) models now and return their load times"""
+        names = list(self._loaders) if names is None else list(names)
+        for name in names:
+            self.get(name)
+        return {name: self.load_times.get(name, 0.0) for name in names}
+
+
+registry = ModelRegistry()
+
+
+def get_model(name: str) -> Any:
+    return registry.get(name)
+
+
+def warmup(names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    return registry.warmup(names)
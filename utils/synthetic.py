@@ -0,0 +1,177 @@
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+# Number of entries per section for each document size
+SIZES = {
+    "small": {"jobs": 1, "projects": 1, "bullets": 2, "skills": 6, "responsibilities": 4},
+    "medium": {"jobs": 3, "projects": 2, "bullets": 4, "skills": 12, "responsibilities": 8},
+    "large": {"jobs": 8, "projects": 5, "bullets": 6, "skills": 24, "responsibilities": 16}
+}
+
+FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Skyler"]
+LAST_NAMES = ["Smith", "Nguyen", "Garcia", "Patel", "Kim", "Johnson", "Okafor", "Silva", "Cohen", "Larsen"]
+CITIES = ["Austin, TX", "Seattle, WA", "Denver, CO", "Boston, MA", "Chicago, IL", "Raleigh, NC"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Machine Learning Engineer",
+          "Full Stack Developer", "Platform Engineer", "Site Reliability Engineer"]
+SKILLS = {
+    "programming_languages": ["Python", "Java", "JavaScript", "TypeScript", "Go", "C++", "SQL", "Rust"],
+    "frameworks_libraries": ["React", "Django", "Flask", "FastAPI", "Spring Boot", "PyTorch", "Pandas"],
+    "tools_technologies": ["Git", "Docker", "Kubernetes", "AWS", "Terraform", "Jenkins", "Linux"],
+    "databases": ["PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch"],
+    "other_technical_skills": ["Machine Learning", "CI/CD", "Microservices", "Agile", "Distributed Systems"]
+}
+VERBS = ["Built", "Designed", "Maintained", "Optimized", "Migrated", "Automated", "Led", "Shipped"]
+OBJECTS = ["a REST API serving 2M requests per day", "the data ingestion pipeline", "CI/CD workflows",
+           "a recommendation service", "internal dashboards", "the billing platform", "search indexing",
+           "a Kubernetes deployment for batch jobs", "monitoring and alerting", "the mobile backend"]
+OUTCOMES = ["cutting latency by 40%", "reducing costs by 25%", "for 12 product teams",
+            "with zero downtime", "improving test coverage to 90%", "ahead of schedule"]
+
+
+def _sentence(rng: random.Random) -> str:
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(OUTCOMES)}"
+
+
+def _skills(rng: random.Random, count: int) -> Dict[str, List[str]]:
+    categories = list(SKILLS)
+    picked = {category: [] for category in categories}
+    for index in range(count):
+        category = categories[index % len(categories)]
+        options = [skill for skill in SKILLS[category] if skill not in picked[category]]
+        if options:
+            picked[category].append(rng.choice(options))
+    return picked
+
+
+def synthetic_resume(rng: random.Random, size: str = "medium") -> Tuple[List[str], Dict[str, Any]]:
+    """Return (text lines, expected parse) for a random resume of the given size"""
+    shape = SIZES[size]
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    handle = name.lower().replace(" ", "")
+    location = rng.choice(CITIES)
+    skills = _skills(rng, shape["skills"])
+
+    data: Dict[str, Any] = {
+        "personal_info": {
+            "name": name,
+            "email": f"{handle}@example.com",
+            "phone": f"(555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+            "location": location,
+            "linkedin": f"linkedin.com/in/{handle}",
+            "github": f"github.com/{handle}",
+            "portfolio": ""
+        },
+        "professional_summary": f"{rng.choice(TITLES)} with {shape['jobs'] * 2} years of experience. "
+                                f"{_sentence(rng)}.",
+        "skills": skills,
+        "experience": [],
+        "education": [{
+            "degree": "Bachelor of Science",
+            "field": "Computer Science",
+            "institution": "State University",
+            "location": location,
+            "graduation_date": "May 2016",
+            "gpa": "3.7"
+        }],
+        "projects": [],
+        "certifications": [],
+        "honors_achievements": []
+    }
+    year = 2024
+    for _ in range(shape["jobs"]):
+        data["experience"].append({
+            "job_title": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "location": rng.choice(CITIES),
+            "start_date": str(year - 2),
+            "end_date": str(year),
+            "responsibilities": [_sentence(rng) for _ in range(shape["bullets"])],
+            "achievements": []
+        })
+        year -= 2
+    for index in range(shape["projects"]):
+        data["projects"].append({
+            "name": f"Project {index + 1}",
+            "description": _sentence(rng),
+            "technologies": rng.sample(SKILLS["programming_languages"], 2),
+            "github_link": f"github.com/{handle}/project{index + 1}",
+            "live_demo": ""
+        })
+
+    info = data["personal_info"]
+    lines = [name, f"{info['email']} | {info['phone']} | {location}", f"{info['linkedin']} | {info['github']}",
+             "", "SUMMARY", data["professional_summary"], "", "SKILLS"]
+    lines += [f"{category.replace('_', ' ').title()}: {', '.join(values)}"
+              for category, values in skills.items() if values]
+    lines += ["", "EXPERIENCE"]
+    for job in data["experience"]:
+        lines.append(f"{job['job_title']} - {job['company']}, {job['location']} ({job['start_date']} - {job['end_date']})")
+        lines += [f"- {item}" for item in job["responsibilities"]]
+    lines += ["", "EDUCATION", "Bachelor of Science in Computer Science, State University, May 2016, GPA 3.7",
+              "", "PROJECTS"]
+    for project in data["projects"]:
+        lines.append(f"{project['name']} ({', '.join(project['technologies'])}): {project['description']}")
+    return lines, data
+
+
+def synthetic_job(rng: random.Random, size: str = "medium",
+                  shared_skills: Optional[Dict[str, List[str]]] = None) -> Tuple[str, Dict[str, Any]]:
+    """Return (text, expected parse) for a random job description of the given size.
+
+    With shared_skills (a resume's skills), about half of each skill category
+    is taken from them, so scoring the pair always matches some skills.
+    """
+    shape = SIZES[size]
+    title = rng.choice(TITLES)
+    company = rng.choice(COMPANIES)
+    skills = _skills(rng, shape["skills"])
+    for category, values in skills.items():
+        common = (shared_skills or {}).get(category, [])[:max(1, len(values) // 2)] if values else []
+        skills[category] = common + [skill for skill in values if skill not in common][:len(values) - len(common)]
+    required = [skill for values in skills.values() for skill in values]
+    responsibilities = [_sentence(rng) for _ in range(shape["responsibilities"])]
+
+    data = {
+        "job_info": {
+            "title": title,
+            "company": company,
+            "location": rng.choice(CITIES),
+            "employment_type": "Full-time",
+            "experience_level": "Mid-level",
+            "salary_range": "",
+            "remote_option": "Hybrid"
+        },
+        "job_summary": f"{company} is hiring a {title} to join the platform team.",
+        "responsibilities": responsibilities,
+        "requirements": {
+            "required_skills": required,
+            "preferred_skills": [],
+            "education": ["Bachelor's degree in Computer Science or related field"],
+            "experience_years": f"{shape['jobs'] + 2}+ years",
+            "certifications": []
+        },
+        "technical_skills": {
+            "programming_languages": skills["programming_languages"],
+            "frameworks_libraries": skills["frameworks_libraries"],
+            "tools_technologies": skills["tools_technologies"],
+            "databases": skills["databases"],
+            "cloud_platforms": [],
+            "other_technical": skills["other_technical_skills"]
+        },
+        "soft_skills": ["Communication", "Teamwork"],
+        "benefits": ["Health insurance", "401(k) matching"],
+        "company_info": {"about_company": "", "company_size": "", "industry": "Technology"}
+    }
+
+    info = data["job_info"]
+    text = "\n".join(
+        [f"{title}", f"{company} - {info['location']} ({info['remote_option']}, {info['employment_type']})", "",
+         data["job_summary"], "", "Responsibilities:"]
+        + [f"- {item}" for item in responsibilities]
+        + ["", "Requirements:", f"- {data['requirements']['experience_years']} of professional experience",
+           f"- {data['requirements']['education'][0]}"]
+        + [f"- Experience with {skill}" for skill in required]
+        + ["", "Benefits:"] + [f"- {item}" for item in data["benefits"]]
+    )
+    return text, data